@@ -1,7 +1,10 @@
 # _*_ coding: utf-8 _*_
 """Cache control API endpoints."""
-from fastapi import APIRouter, Depends, HTTPException, status
-from src.core.dependencies import get_database, get_redis_client
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query, status
+from src.api.services.semantic_response_cache import get_semantic_response_cache
+from src.core.dependencies import get_async_redis_client, get_database, get_redis_client
 from src.config import settings
 from src.database.base import Database
 from src.cache.redis_client import RedisClient
@@ -16,6 +19,11 @@ def get_cache_config():
     return settings
 
 
+def _decode(value):
+    """bytes인 경우만 문자열로 변환"""
+    return value.decode('utf-8') if isinstance(value, bytes) else value
+
+
 @router.get("/cache/status")
 def get_cache_status(
     redis_client: RedisClient = Depends(get_redis_client),
@@ -30,9 +38,9 @@ def get_cache_status(
             "data": {"enabled": False, "message": "Redis not available"}
         }
     
-    # Redis 정보 조회
+    # Redis 정보 조회 (키 수는 DBSIZE - 전체 키 공간을 순회하지 않음)
     info = redis_client.redis_client.info()
-    keys = redis_client.redis_client.keys("*")
+    total_keys = redis_client.redis_client.dbsize()
     
     return {
         "status": "success",
@@ -40,7 +48,7 @@ def get_cache_status(
             "enabled": True,
             "redis_version": info.get("redis_version"),
             "used_memory": info.get("used_memory_human"),
-            "total_keys": len(keys),
+            "total_keys": total_keys,
             "cache_config": {
                 "enabled": cache_config.cache_enabled,
                 "ttl_chat_messages": cache_config.cache_ttl_chat_messages,
@@ -66,13 +74,22 @@ def clear_cache(
             "message": "Redis가 사용할 수 없습니다."
         }
     
-    # 모든 캐시 키 삭제
-    keys = redis_client.redis_client.keys("*")
-    if keys:
-        redis_client.redis_client.delete(*keys)
+    # 모든 캐시 키 삭제 (SCAN으로 나눠 조회하고 UNLINK로 백그라운드 해제 - 다른 클라이언트를 막지 않음)
+    page_size = settings.cache_scan_page_size
+    deleted = 0
+    batch = []
+    for key in redis_client.redis_client.scan_iter(count=page_size):
+        batch.append(key)
+        if len(batch) >= page_size:
+            deleted += redis_client.redis_client.unlink(*batch)
+            batch = []
+    if batch:
+        deleted += redis_client.redis_client.unlink(*batch)
+    
+    if deleted:
         return {
             "status": "success",
-            "message": f"{len(keys)}개의 캐시가 삭제되었습니다."
+            "message": f"{deleted}개의 캐시가 삭제되었습니다."
         }
     else:
         return {
@@ -139,9 +156,18 @@ def get_cache_config(
 @router.get("/cache/keys")
 def get_cache_keys(
     pattern: str = "*",
+    cursor: int = Query(0, ge=0, description="이전 응답의 next_cursor (처음 조회 시 0)"),
+    limit: Optional[int] = Query(None, ge=1, description="한 번에 반환할 최대 키 수"),
     redis_client: RedisClient = Depends(get_redis_client)
 ):
-    """캐시 키 목록 조회"""
+    """
+    캐시 키 목록 조회 (SCAN 커서 기반 페이지 조회)
+    
+    - KEYS 대신 SCAN으로 page_size씩 나눠 조회하여 Redis를 오래 점유하지 않음
+    - 한 요청에서 반환하는 키 수(limit)와 SCAN 호출 수에 상한을 둠
+    - 키별 TYPE/TTL/MEMORY USAGE는 파이프라인 한 번으로 조회
+    - next_cursor가 0이면 마지막 페이지
+    """
     if not redis_client or not redis_client.ping():
         return {
             "status": "error",
@@ -149,31 +175,45 @@ def get_cache_keys(
         }
 
     try:
-        # 패턴에 맞는 키들 조회
-        keys = redis_client.redis_client.keys(pattern)
+        client = redis_client.redis_client
+        page_size = settings.cache_scan_page_size
+        limit = min(limit or page_size, settings.cache_scan_max_keys)
+        
+        # 패턴에 맞는 키를 limit개까지 SCAN (패턴이 드물게 일치해도 호출 수는 상한까지만)
+        keys = []
+        next_cursor = cursor
+        for _ in range(settings.cache_scan_max_calls):
+            next_cursor, page = client.scan(cursor=next_cursor, match=pattern, count=page_size)
+            keys.extend(page)
+            if next_cursor == 0 or len(keys) >= limit:
+                break
+        # SCAN 페이지 중간에서 자르면 남은 키를 건너뛰게 되므로 페이지 단위로 반환 (limit 초과분 포함)
 
-        # 키별 정보 수집
-        key_info = []
+        # 키별 정보를 파이프라인 한 번으로 수집
+        pipe = client.pipeline(transaction=False)
         for key in keys:
-            # 키를 문자열로 변환 (bytes인 경우만 decode)
-            key_str = key.decode('utf-8') if isinstance(key, bytes) else str(key)
-            ttl = redis_client.redis_client.ttl(key)
-
-            # 타입 정보를 문자열로 변환
-            key_type_raw = redis_client.redis_client.type(key)
-            key_type = key_type_raw.decode('utf-8') if isinstance(key_type_raw, bytes) else str(key_type_raw)
+            pipe.type(key)
+            pipe.ttl(key)
+            pipe.memory_usage(key)
+        results = pipe.execute(raise_on_error=False) if keys else []
 
+        key_info = []
+        for index, key in enumerate(keys):
+            key_type, ttl, memory = results[index * 3:index * 3 + 3]
             key_info.append({
-                "key": key_str,
-                "type": key_type,
-                "ttl": ttl if ttl > 0 else "persistent"
+                "key": str(_decode(key)),
+                "type": str(_decode(key_type)),
+                "ttl": ttl if isinstance(ttl, int) and ttl > 0 else "persistent",
+                "memory_bytes": memory if isinstance(memory, int) else None
             })
 
         return {
             "status": "success",
             "data": {
                 "pattern": pattern,
-                "total_keys": len(keys),
+                "cursor": cursor,
+                "next_cursor": next_cursor,
+                "total_keys": len(keys),  # 이번 페이지의 키 수
                 "keys": key_info
             }
         }
@@ -341,3 +381,33 @@ def delete_cache_data(
         raise HandledException(ResponseCode.CACHE_QUERY_ERROR, e=e)
 
 
+
+
+@router.get("/cache/semantic/stats")
+async def get_semantic_cache_stats(
+    async_redis_client=Depends(get_async_redis_client),
+    cache_config=Depends(get_cache_config)
+):
+    """시맨틱 응답 캐시 hit/miss 통계 조회"""
+    semantic_cache = get_semantic_response_cache(async_redis_client)
+    if semantic_cache is None:
+        return {
+            "status": "success",
+            "data": {"enabled": False, "message": "Semantic cache disabled"}
+        }
+    
+    stats = await semantic_cache.get_stats()
+    total = stats["total"]
+    hits = total.get("hit_exact", 0) + total.get("hit_semantic", 0)
+    lookups = hits + total.get("miss", 0)
+    return {
+        "status": "success",
+        "data": {
+            "enabled": True,
+            "threshold": cache_config.semantic_cache_threshold,
+            "ttl_seconds": cache_config.semantic_cache_ttl_seconds,
+            "hit_rate": round(hits / lookups, 4) if lookups else 0.0,
+            "worker": stats["worker"],
+            "total": total
+        }
+    }
@@ -1,16 +1,28 @@
 # _*_ coding: utf-8 _*_
 """LLM Chat REST API endpoints (Redis 기반, 확장 가능)."""
 import asyncio
-import json
 import logging
 
-from fastapi import APIRouter, Depends, Path
+from typing import Optional
+
+from fastapi import APIRouter, Depends, Header, Path, Query, Request
 from fastapi.responses import StreamingResponse
 from pydantic import BaseModel
 from sqlalchemy.orm import Session
 from src.api.services.llm_chat_service import LLMChatService
+from src.api.services.llm_resilience import get_circuit_breaker_states, get_llm_call_metrics
 from src.api.services.program_service import ProgramService
-from src.core.dependencies import get_db, get_llm_chat_service, get_program_service
+from src.api.services.sse_coalescer import SSEChunkCoalescer, encode_sse_event
+from src.api.services.stream_event_log import StreamEventLog, get_stream_event_log
+from src.api.services.stream_heartbeat_scheduler import get_heartbeat_scheduler
+from src.config import settings
+from src.core.dependencies import (
+    get_async_redis_client,
+    get_db,
+    get_llm_chat_service,
+    get_program_service,
+    resolve_user_id,
+)
 from src.types.request.chat_request import (
     CreateChatRequest,
     UserMessageRequest,
@@ -23,17 +35,36 @@ from src.types.response.chat_response import (
     CreateChatResponse,
 )
 from src.types.response.exceptions import HandledException
+from src.types.response.response_code import ResponseCode
 
 logger = logging.getLogger(__name__)
 router = APIRouter(tags=["llm-chat"])
 
+# SSE 응답 공통 헤더
+SSE_HEADERS = {
+    "Cache-Control": "no-cache",
+    "Connection": "keep-alive",
+    "Access-Control-Allow-Origin": "*",
+    "Access-Control-Allow-Headers": "Cache-Control, Last-Event-ID",
+}
+
+# 실행 중인 스트림 task (클라이언트 연결이 끊긴 뒤에도 계속 실행 - GC 방지용 참조)
+_detached_stream_tasks = set()
+
 class GenerateTitleRequest(BaseModel):
     message: str
+    chat_id: Optional[str] = None
+
+async def _replay_stream(event_log, chat_id: str, last_event_id: Optional[str] = None):
+    """이벤트 로그 재전송 + 실시간 tail을 SSE 프레임으로 변환"""
+    async for event_id, event in event_log.replay(chat_id, last_event_id):
+        yield encode_sse_event(event, event_id)
 
 @router.post("/chat/{chat_id}/message", response_model=AIResponse)
-def send_message(
+async def send_message(
     chat_id: str,
     request: UserMessageRequest,
+    http_request: Request,
     llm_chat_service: LLMChatService = Depends(get_llm_chat_service)
 ):
     """사용자 메시지를 전송하고 AI 응답을 받습니다."""
@@ -41,11 +72,13 @@ def send_message(
     
     # Service Layer에서 전파된 HandledException을 그대로 전파
     # Global Exception Handler가 자동으로 처리
-    ai_response = llm_chat_service.send_message_simple(
+    ai_response = await llm_chat_service.send_message_simple(
         chat_id, 
         request.message, 
         request.user_id,
-        request.plc_uuid
+        request.plc_uuid,
+        # 사용자별 동시 생성 제한은 인증된 user_id 기준 (본문 user_id는 SSO 미사용 시에만 사용)
+        admission_user_id=resolve_user_id(http_request, request.user_id),
     )
     
     return AIResponse(
@@ -59,136 +92,244 @@ def send_message(
 async def send_message_stream(
     chat_id: str,
     request: UserMessageRequest,
+    http_request: Request,
     db: Session = Depends(get_db),
     llm_chat_service: LLMChatService = Depends(get_llm_chat_service),
     program_service: ProgramService = Depends(get_program_service),
+    async_redis_client=Depends(get_async_redis_client),
 ):
-    """스트리밍 방식으로 메시지를 전송하고 AI 응답을 받습니다 (SSE)."""
+    """
+    스트리밍 방식으로 메시지를 전송하고 AI 응답을 받습니다 (SSE).
 
-    async def generate_stream():
-        # 청크를 전달하기 위한 큐
-        chunk_queue = asyncio.Queue()
-        stream_active = asyncio.Event()
-        stream_active.set()
+    Redis 사용 시 각 이벤트에 id를 붙여 기록하므로, 연결이 끊기면
+    /chat/{chat_id}/stream/resume 으로 Last-Event-ID 이후 이벤트를 이어받을 수 있습니다.
+    같은 채팅에서 다른 메시지의 응답이 생성 중이면 CHAT_RATE_LIMIT_EXCEEDED로 거절합니다.
+    """
+    # 사용자별 동시 생성 제한은 인증된 user_id 기준 (본문 user_id는 SSO 미사용 시에만 사용)
+    admission_user_id = resolve_user_id(http_request, request.user_id)
+    event_log = get_stream_event_log(async_redis_client)
+    prompt_hash = None
+    if event_log is not None:
+        # 같은 채팅에 같은 프롬프트로 진행 중인 생성이 있으면 LLM을 다시 호출하지 않고 그 스트림에 연결
+        # (다른 프롬프트로 진행 중이면 그 생성의 이벤트 로그를 보존하기 위해 거절)
+        prompt_hash = event_log.prompt_hash(request.message, request.user_id, request.plc_uuid)
+        claim = await event_log.claim(chat_id, prompt_hash)
+        if claim == event_log.BUSY:
+            raise HandledException(
+                ResponseCode.CHAT_RATE_LIMIT_EXCEEDED,
+                msg="이 채팅에서 다른 응답이 생성 중입니다. 완료 후 다시 시도해주세요.",
+            )
+        if claim == event_log.ATTACHED:
+            logger.info(f"Duplicate request attached to in-flight generation: {chat_id}")
+            return StreamingResponse(
+                _replay_stream(event_log, chat_id),
+                media_type="text/event-stream",
+                headers=SSE_HEADERS,
+            )
+
+    # 청크를 전달하기 위한 큐
+    chunk_queue = asyncio.Queue()
+    
+    # AI 스트림 수신 task
+    async def ai_stream_receiver():
+        try:
+            # 사용자 메시지 저장
+            # (첫 메시지면 백그라운드에서 생성된 제목을 chat_title 이벤트로 전달)
+            user_message_id = await llm_chat_service.save_user_message(
+                chat_id, request.message, request.user_id, request.plc_uuid,
+                on_title=chunk_queue.put_nowait,
+            )
+
+            # 사용자 메시지 전송
+            user_message_data = {
+                'type': 'user_message',
+                'message_id': user_message_id,
+                'content': request.message,
+                'user_id': request.user_id,
+                'timestamp': llm_chat_service.get_current_timestamp()
+            }
+            await chunk_queue.put(user_message_data)
+
+            # AI 응답 생성 (스트리밍)
+            async for chunk in llm_chat_service.generate_ai_response_stream(
+                chat_id, request.user_id, request.plc_uuid, admission_user_id=admission_user_id
+            ):
+                await chunk_queue.put(chunk)
+            
+            # 완료 신호
+            await chunk_queue.put(None)
+            
+        except HandledException as e:
+            # HandledException은 스트림으로 전달 (연결 유지)
+            logger.error(f"HandledException in streaming: {str(e)}")
+            from src.types.response.chat_response import StreamErrorResponse
+            error_response = StreamErrorResponse(
+                code=e.code,
+                message=e.message,
+                content=f"메시지 처리 중 오류가 발생했습니다: {e.message}",
+                timestamp=llm_chat_service.get_current_timestamp(),
+                chat_id=chat_id
+            )
+            await chunk_queue.put(error_response.dict())
+            await chunk_queue.put(None)
+        except Exception as e:
+            # 예상치 못한 예외도 스트림으로 전달 (연결 유지)
+            logger.error(f"Unexpected error in streaming: {str(e)}")
+            from src.types.response.chat_response import StreamErrorResponse
+            error_response = StreamErrorResponse(
+                code=-2,  # UNDEFINED_ERROR
+                message='정의되지 않은 오류입니다.',
+                content=f"메시지 처리 중 예상치 못한 오류가 발생했습니다: {str(e)}",
+                timestamp=llm_chat_service.get_current_timestamp(),
+                chat_id=chat_id
+            )
+            await chunk_queue.put(error_response.dict())
+            await chunk_queue.put(None)
+    
+    # 큐의 이벤트를 병합하여 이벤트 로그(재연결용)에 기록하고 연결된 클라이언트에 전달
+    async def relay_events():
+        # 연속된 응답 청크는 짧은 시간/바이트 창 안에서 하나의 SSE 프레임으로 병합
+        coalescer = SSEChunkCoalescer(
+            window_ms=settings.chat_stream_coalesce_window_ms,
+            max_bytes=settings.chat_stream_coalesce_max_bytes,
+        )
         
-        # Heartbeat task (10초마다 전송, Nginx 타임아웃 60초 대비)
-        async def heartbeat_sender():
-            try:
-                elapsed_time = 0
-                heartbeat_messages = {
-                    10: "사용자의 의도를 파악하고 있습니다...",
-                    30: "정확한 답변을 찾기 위해 노력하고 있습니다...",
-                    50: "거의 다 완료되었습니다. 조금만 기다려주세요..."
-                }
-                
-                while stream_active.is_set():
-                    await asyncio.sleep(10)  # 10초마다 heartbeat
-                    elapsed_time += 10
-                    
-                    # 경과 시간에 따라 적절한 메시지 선택
-                    message = None
-                    if elapsed_time in heartbeat_messages:
-                        message = heartbeat_messages[elapsed_time]
+        async def deliver(events):
+            for event in events:
+                event_id = None
+                if event_log is not None:
+                    if event.get('type') != 'heartbeat':
+                        event_id = await event_log.publish(chat_id, event)
                     else:
-                        # 50초 이후에는 계속 마지막 메시지 표시
-                        message = heartbeat_messages[50]
-                    
-                    heartbeat_data = {
-                        'type': 'heartbeat',
-                        'message': message,
-                        'timestamp': llm_chat_service.get_current_timestamp()
-                    }
-                    await chunk_queue.put(heartbeat_data)
-                    logger.debug(f"Sent heartbeat for chat {chat_id} at {elapsed_time}s: {message}")
-            except asyncio.CancelledError:
-                pass
-            except Exception as e:
-                logger.warning(f"Heartbeat sender error: {e}")
+                        # 기록할 이벤트가 없는 대기 구간에도 점유 유지
+                        await event_log.keep_alive(chat_id)
+                if client_state['attached']:
+                    client_queue.put_nowait(encode_sse_event(event, event_id))
         
-        # AI 스트림 수신 task
-        async def ai_stream_receiver():
-            try:
-                # 사용자 메시지 저장
-                user_message_id = llm_chat_service.save_user_message(
-                    chat_id, request.message, request.user_id, request.plc_uuid
-                )
-
-                # 사용자 메시지 전송
-                user_message_data = {
-                    'type': 'user_message',
-                    'message_id': user_message_id,
-                    'content': request.message,
-                    'user_id': request.user_id,
-                    'timestamp': llm_chat_service.get_current_timestamp()
-                }
-                await chunk_queue.put(user_message_data)
-
-                # AI 응답 생성 (스트리밍)
-                async for chunk in llm_chat_service.generate_ai_response_stream(chat_id, request.user_id, request.plc_uuid):
-                    await chunk_queue.put(chunk)
-                
-                # 완료 신호
-                await chunk_queue.put(None)
+        try:
+            while True:
+                flush_timeout = coalescer.time_until_flush()
+                if flush_timeout is None:
+                    chunk = await chunk_queue.get()
+                else:
+                    try:
+                        chunk = await asyncio.wait_for(chunk_queue.get(), timeout=flush_timeout)
+                    except asyncio.TimeoutError:
+                        # 병합 창 만료 - 대기 중인 청크 전송
+                        await deliver([coalescer.flush()])
+                        continue
                 
-            except HandledException as e:
-                # HandledException은 스트림으로 전달 (연결 유지)
-                logger.error(f"HandledException in streaming: {str(e)}")
-                from src.types.response.chat_response import StreamErrorResponse
-                error_response = StreamErrorResponse(
-                    code=e.code,
-                    message=e.message,
-                    content=f"메시지 처리 중 오류가 발생했습니다: {e.message}",
-                    timestamp=llm_chat_service.get_current_timestamp(),
-                    chat_id=chat_id
-                )
-                await chunk_queue.put(error_response.dict())
-                await chunk_queue.put(None)
-            except Exception as e:
-                # 예상치 못한 예외도 스트림으로 전달 (연결 유지)
-                logger.error(f"Unexpected error in streaming: {str(e)}")
-                from src.types.response.chat_response import StreamErrorResponse
-                error_response = StreamErrorResponse(
-                    code=-2,  # UNDEFINED_ERROR
-                    message='정의되지 않은 오류입니다.',
-                    content=f"메시지 처리 중 예상치 못한 오류가 발생했습니다: {str(e)}",
-                    timestamp=llm_chat_service.get_current_timestamp(),
-                    chat_id=chat_id
-                )
-                await chunk_queue.put(error_response.dict())
-                await chunk_queue.put(None)
-        
-        # 두 task를 병렬로 실행
-        heartbeat_task = asyncio.create_task(heartbeat_sender())
+                if chunk is None:  # 완료 신호
+                    pending = coalescer.flush()
+                    if pending is not None:
+                        await deliver([pending])
+                    break
+                await deliver(coalescer.feed(chunk))
+        finally:
+            heartbeat_scheduler.unregister(heartbeat_handle)
+            if event_log is not None:
+                await event_log.finish(chat_id)
+                await event_log.release(chat_id, prompt_hash)
+            client_queue.put_nowait(None)
+    
+    # 클라이언트로 보낼 SSE 프레임 큐 (연결이 끊기면 더 이상 쌓지 않음)
+    client_queue = asyncio.Queue()
+    client_state = {'attached': True}
+    
+    # 생성/중계 task는 응답 본문 시작 전에 실행 - 첫 바이트 전에 연결이 끊겨 본문 generator가
+    # 시작되지 않아도 relay_events의 finally에서 single-flight 점유가 해제됨
+    heartbeat_scheduler = get_heartbeat_scheduler()
+    try:
+        heartbeat_handle = heartbeat_scheduler.register(chat_id, chunk_queue)
         ai_stream_task = asyncio.create_task(ai_stream_receiver())
-        
+        relay_task = asyncio.create_task(relay_events())
+    except BaseException:
+        if event_log is not None:
+            await event_log.release(chat_id, prompt_hash)
+        raise
+    for task in (ai_stream_task, relay_task):
+        _detached_stream_tasks.add(task)
+        task.add_done_callback(_detached_stream_tasks.discard)
+    
+    async def generate_stream():
+        completed = False
         try:
             # 큐에서 받은 데이터를 yield
             while True:
-                chunk = await chunk_queue.get()
-                if chunk is None:  # 완료 신호
+                frame = await client_queue.get()
+                if frame is None:  # 완료 신호
+                    completed = True
                     break
-                yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+                yield frame
         finally:
-            # 리소스 정리
-            stream_active.clear()
-            heartbeat_task.cancel()
-            ai_stream_task.cancel()
-            try:
-                await asyncio.gather(heartbeat_task, ai_stream_task, return_exceptions=True)
-            except Exception as e:
-                logger.warning(f"Task cleanup error: {e}")
+            # 리소스 정리 (heartbeat는 relay_events 종료 시 해제 - 연결이 끊긴 뒤에도 점유 유지에 사용)
+            client_state['attached'] = False
+            if completed or event_log is None:
+                ai_stream_task.cancel()
+                relay_task.cancel()
+                try:
+                    await asyncio.gather(ai_stream_task, relay_task, return_exceptions=True)
+                except Exception as e:
+                    logger.warning(f"Task cleanup error: {e}")
+            else:
+                # 연결이 끊겨도 생성은 계속 진행 - 클라이언트는 재연결 엔드포인트로 이어받음
+                logger.info(f"Client disconnected, generation continues for resume: {chat_id}")
 
     return StreamingResponse(
         generate_stream(),
         media_type="text/event-stream",
-        headers={
-            "Cache-Control": "no-cache",
-            "Connection": "keep-alive",
-            "Access-Control-Allow-Origin": "*",
-            "Access-Control-Allow-Headers": "Cache-Control"
-        }
+        headers=SSE_HEADERS,
+    )
+
+@router.get("/chat/{chat_id}/stream/resume")
+async def resume_message_stream(
+    chat_id: str,
+    last_event_id: Optional[str] = Header(default=None, alias="Last-Event-ID"),
+    last_event_id_query: Optional[str] = Query(
+        default=None, alias="last_event_id", description="Last-Event-ID 헤더를 보낼 수 없는 클라이언트용"
+    ),
+    async_redis_client=Depends(get_async_redis_client),
+):
+    """
+    끊긴 스트림을 이어받습니다 (SSE).
+
+    Last-Event-ID 이후의 이벤트를 재전송하고, 생성이 진행 중이면 이후 이벤트를 이어서 전달합니다.
+    LLM을 다시 호출하지 않습니다.
+    """
+    last_event_id = last_event_id or last_event_id_query
+    if last_event_id and not StreamEventLog.is_valid_event_id(last_event_id):
+        raise HandledException(
+            ResponseCode.INVALID_DATA_FORMAT,
+            msg="Last-Event-ID 형식이 올바르지 않습니다. (<ms>-<seq> 또는 0)",
+        )
+
+    event_log = get_stream_event_log(async_redis_client)
+    if event_log is None or not await event_log.exists(chat_id):
+        raise HandledException(ResponseCode.CHAT_SESSION_NOT_FOUND, msg="이어받을 수 있는 스트림이 없습니다.")
+
+    return StreamingResponse(
+        _replay_stream(event_log, chat_id, last_event_id),
+        media_type="text/event-stream",
+        headers=SSE_HEADERS,
     )
 
+
+@router.get("/chat/llm/metrics", summary="LLM 호출 지표 조회")
+async def get_llm_metrics():
+    """업스트림 LLM 호출 지표 (호출/재시도/타임아웃/헤지 횟수, 첫 청크 지연) 및 회로 차단기 상태 - 워커 단위"""
+    metrics = get_llm_call_metrics().snapshot()
+    for counters in metrics.values():
+        count = counters.get("first_token_seconds_count", 0)
+        if count:
+            counters["first_token_seconds_avg"] = round(counters["first_token_seconds_sum"] / count, 3)
+    return {
+        "status": "success",
+        "data": {
+            "upstreams": metrics,
+            "circuit_breakers": get_circuit_breaker_states(),
+        },
+    }
+
 @router.get(
     "/chat/{chat_id}/history",
     response_model=ConversationHistoryResponse,
@@ -198,6 +339,13 @@ async def send_message_stream(
     
     **파라미터:**
     - `chat_id` (path): 조회할 채팅방의 고유 ID
+    - `before` (query, 선택): 이전 페이지 커서 (이전 응답의 `next_before` 값)
+    - `limit` (query, 선택): 조회할 메시지 수 (기본 50, 최대 100)
+    
+    **페이지네이션:**
+    - `before` 없이 호출하면 가장 최근 메시지 `limit`개를 반환합니다.
+    - 응답의 `next_before`를 `before`로 전달하면 그 이전 메시지를 조회합니다.
+    - `next_before`가 `null`이면 더 이전 메시지가 없습니다.
     
     **조회 우선순위:**
     1. Redis 캐시에서 먼저 조회 (캐시 히트 시 즉시 반환)
@@ -246,7 +394,8 @@ async def send_message_stream(
           "plc_snapshot": null
         },
         ...
-      ]
+      ],
+      "next_before": "msg001"
     }
     ```
     
@@ -290,17 +439,21 @@ async def send_message_stream(
 
     **사용 예시:**
     - `GET /v1/chat/chat001/history`
+    - `GET /v1/chat/chat001/history?before=msg001&limit=50`
     """,
 )
 def get_conversation_history(
     chat_id: str = Path(..., description="채팅방 고유 ID", example="chat001"),
+    before: str = Query(None, description="이전 페이지 커서 (메시지 ID)"),
+    limit: int = Query(50, ge=1, le=100, description="조회할 메시지 수"),
     llm_chat_service: LLMChatService = Depends(get_llm_chat_service)
 ):
     """대화 기록을 조회합니다."""
     # Service Layer에서 전파된 HandledException을 그대로 전파
     # Global Exception Handler가 자동으로 처리
-    history = llm_chat_service.get_conversation_history(chat_id)
-    return ConversationHistoryResponse(history=history)
+    history = llm_chat_service.get_conversation_history(chat_id, before=before, limit=limit)
+    next_before = history[0]["message_id"] if len(history) >= limit else None
+    return ConversationHistoryResponse(history=history, next_before=next_before)
 
 @router.post("/chat/{chat_id}/clear", response_model=ConversationClearedResponse)
 def clear_conversation(
@@ -396,11 +549,14 @@ async def generate_chat_title(
     request: GenerateTitleRequest,
     llm_chat_service: LLMChatService = Depends(get_llm_chat_service)
 ):
-    """메시지를 기반으로 채팅방 제목을 생성합니다."""
+    """
+    메시지를 기반으로 채팅방 제목을 생성합니다.
+    
+    chat_id를 전달하면 임시 제목을 바로 반환하고(pending=true), LLM 제목은 백그라운드에서 생성하여 채팅에 반영합니다.
+    """
     # Service Layer에서 전파된 HandledException을 그대로 전파
     # Global Exception Handler가 자동으로 처리
-    title = await llm_chat_service.generate_chat_title(request.message)
-    return {"title": title}
+    return await llm_chat_service.generate_chat_title(request.message, request.chat_id)
 
 
 
@@ -0,0 +1,169 @@
+# _*_ coding: utf-8 _*_
+"""Chat generation cancellation registry (in-process Event + Redis pub/sub)."""
+import asyncio
+import logging
+import time
+from typing import Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class ChatCancelRegistry:
+    """
+    채팅별 생성 취소 이벤트 레지스트리
+
+    - 스트림 시작 시 chat_id별 asyncio.Event를 등록
+    - cancel() 호출 시 같은 워커의 스트림은 즉시 깨어나고,
+      Redis pub/sub으로 다른 워커에도 취소 신호를 전파
+    - 스트림 루프는 Event 상태만 확인하므로 청크당 I/O가 없음
+    """
+
+    def __init__(self, channel: str):
+        self.channel = channel
+        self._events: Dict[str, asyncio.Event] = {}
+        self._refcounts: Dict[str, int] = {}
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._redis_client = None
+        self._async_redis_client = None
+        self._pubsub = None
+        self._listener = None
+
+    def register(self, chat_id: str) -> asyncio.Event:
+        """
+        스트림 시작 시 취소 Event 등록 (같은 채팅의 진행 중인 스트림은 Event 공유)
+
+        이전 생성에 대한 취소로 이미 설정된 Event는 새 생성에 넘기지 않고 새로 만듦
+        (취소된 스트림은 기존 Event를 계속 참조하므로 영향 없음)
+        """
+        event = self._events.get(chat_id)
+        if event is None or event.is_set():
+            event = asyncio.Event()
+            self._events[chat_id] = event
+        self._refcounts[chat_id] = self._refcounts.get(chat_id, 0) + 1
+        return event
+
+    def unregister(self, chat_id: str):
+        """스트림 종료 시 취소 Event 해제"""
+        count = self._refcounts.get(chat_id, 0) - 1
+        if count > 0:
+            self._refcounts[chat_id] = count
+            return
+        self._refcounts.pop(chat_id, None)
+        self._events.pop(chat_id, None)
+
+    def is_cancelled(self, chat_id: str) -> bool:
+        """로컬 Event 기준 취소 여부 (I/O 없음)"""
+        event = self._events.get(chat_id)
+        return event is not None and event.is_set()
+
+    async def cancel(self, chat_id: str) -> bool:
+        """
+        취소 요청: 로컬 스트림을 즉시 깨우고 다른 워커에 전파
+
+        전파는 비동기 Redis 클라이언트로 발행 (없으면 동기 클라이언트를 executor에서 실행하여 이벤트 루프를 막지 않음)
+
+        Returns:
+            bool: 이 워커에서 실행 중인 스트림이 있었으면 True
+        """
+        found = self._set_local(chat_id)
+
+        try:
+            if self._async_redis_client is not None:
+                await self._async_redis_client.redis_client.publish(self.channel, chat_id)
+            elif self._redis_client is not None:
+                await asyncio.get_running_loop().run_in_executor(
+                    None, self._redis_client.redis_client.publish, self.channel, chat_id
+                )
+        except Exception as e:
+            logger.warning(f"Cancel publish failed for chat {chat_id}: {e}")
+
+        return found
+
+    def _set_local(self, chat_id: str) -> bool:
+        """로컬 Event 설정 (이벤트 루프 스레드에서 호출)"""
+        event = self._events.get(chat_id)
+        if event is None:
+            return False
+        event.set()
+        logger.info(f"Cancel signal delivered to local stream: {chat_id}")
+        return True
+
+    def _on_message(self, message: dict):
+        """pub/sub 수신 핸들러 (리스너 스레드에서 호출)"""
+        chat_id = message.get("data")
+        if not chat_id or self._loop is None:
+            return
+        try:
+            self._loop.call_soon_threadsafe(self._set_local, chat_id)
+        except RuntimeError:
+            # 이벤트 루프가 이미 종료된 경우
+            pass
+
+    def _on_listener_error(self, e, pubsub, thread):
+        """리스너 오류 처리 - 로그만 남기고 재연결 대기"""
+        logger.warning(f"Cancel listener error (retrying): {e}")
+        time.sleep(1.0)
+
+    def start(
+        self,
+        redis_client,
+        loop: Optional[asyncio.AbstractEventLoop] = None,
+        async_redis_client=None,
+    ):
+        """
+        Redis pub/sub 리스너 시작 (앱 시작 시 1회 호출)
+
+        Args:
+            redis_client: 리스너 스레드용 동기 Redis 클라이언트
+            loop: 취소 Event를 설정할 이벤트 루프 (없으면 현재 실행 중인 루프)
+            async_redis_client: cancel()에서 발행에 사용할 비동기 Redis 클라이언트
+        """
+        if redis_client is None or self._listener is not None:
+            return
+
+        self._loop = loop or asyncio.get_running_loop()
+        self._redis_client = redis_client
+        self._async_redis_client = async_redis_client
+        try:
+            self._pubsub = redis_client.redis_client.pubsub(ignore_subscribe_messages=True)
+            self._pubsub.subscribe(**{self.channel: self._on_message})
+            self._listener = self._pubsub.run_in_thread(
+                sleep_time=1.0,
+                daemon=True,
+                exception_handler=self._on_listener_error,
+            )
+            logger.info(f"Cancel listener subscribed: {self.channel}")
+        except Exception as e:
+            logger.warning(f"Cancel listener start failed, local cancellation only: {e}")
+            self._pubsub = None
+            self._listener = None
+
+    def stop(self):
+        """Redis pub/sub 리스너 종료"""
+        if self._listener is not None:
+            try:
+                self._listener.stop()
+            except Exception as e:
+                logger.warning(f"Cancel listener stop failed: {e}")
+            self._listener = None
+        if self._pubsub is not None:
+            try:
+                self._pubsub.close()
+            except Exception:
+                pass
+            self._pubsub = None
+        self._async_redis_client = None
+
+
+# 전역 취소 레지스트리 인스턴스 (워커 프로세스당 1개)
+cancel_registry = None
+
+
+def get_cancel_registry() -> ChatCancelRegistry:
+    """취소 레지스트리 싱글톤 반환"""
+    global cancel_registry
+    if cancel_registry is None:
+        from src.config import settings
+
+        cancel_registry = ChatCancelRegistry(settings.chat_cancel_channel)
+    return cancel_registry
@@ -0,0 +1,115 @@
+# _*_ coding: utf-8 _*_
+"""Per-chat agent request context cache (reviewer_count, site_list)."""
+import json
+import logging
+from typing import Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class ChatContextCache:
+    """
+    채팅별 에이전트 요청 컨텍스트 캐시 (Redis Hash)
+
+    - 키: chat_context:{chat_id} / 필드: reviewer_count, user_id, site_list(JSON)
+    - 메시지마다 실행되던 reviewer_count/사용자 조회를 캐시 hit 시 생략
+    - 응답 완료 시 reviewer_count는 DB와 같은 규칙(검토 노드 있음: +1 최대 2, 없음: 0)으로 Lua 스크립트에서 원자적으로 갱신
+    - 캐시가 없을 때는 갱신하지 않고 다음 조회 시 DB 값으로 채움 (DB가 기준)
+    - site_list는 user_id가 같을 때만 사용하며, 사용자 정보 변경은 TTL 안에 반영됨
+    """
+
+    # 검토 노드가 있으면 HINCRBY 후 2로 제한, 없으면 0 (키가 없으면 아무것도 하지 않음)
+    _RECORD_SCRIPT = """
+    if redis.call('EXISTS', KEYS[1]) == 0 then
+        return -1
+    end
+    local count = 0
+    if ARGV[1] == '1' then
+        count = redis.call('HINCRBY', KEYS[1], 'reviewer_count', 1)
+        if count > 2 then
+            count = 2
+            redis.call('HSET', KEYS[1], 'reviewer_count', count)
+        end
+    else
+        redis.call('HSET', KEYS[1], 'reviewer_count', 0)
+    end
+    redis.call('EXPIRE', KEYS[1], ARGV[2])
+    return count
+    """
+
+    def __init__(self, async_redis_client, ttl_seconds: int = 1800):
+        self.redis = async_redis_client.redis_client
+        self.ttl_seconds = ttl_seconds
+
+    @staticmethod
+    def _key(chat_id: str) -> str:
+        return f"chat_context:{chat_id}"
+
+    async def get(self, chat_id: str, user_id: Optional[str]) -> Tuple[Optional[int], bool, Any]:
+        """
+        캐시된 컨텍스트 조회
+
+        Returns:
+            (reviewer_count, site_list_cached, site_list) - 캐시에 없으면 (None, False, None)
+        """
+        try:
+            data = await self.redis.hgetall(self._key(chat_id))
+        except Exception as e:
+            logger.warning(f"Chat context cache read failed for chat {chat_id}: {e}")
+            return None, False, None
+
+        reviewer_count = int(data["reviewer_count"]) if "reviewer_count" in data else None
+        if user_id and data.get("user_id") == user_id and "site_list" in data:
+            return reviewer_count, True, json.loads(data["site_list"])
+        return reviewer_count, False, None
+
+    async def set(
+        self,
+        chat_id: str,
+        reviewer_count: Optional[int] = None,
+        user_id: Optional[str] = None,
+        site_list: Any = None,
+    ):
+        """DB에서 조회한 컨텍스트 저장"""
+        mapping = {}
+        if reviewer_count is not None:
+            mapping["reviewer_count"] = reviewer_count
+        if user_id:
+            mapping["user_id"] = user_id
+            mapping["site_list"] = json.dumps(site_list, ensure_ascii=False, default=str)
+        if not mapping:
+            return
+        try:
+            pipe = self.redis.pipeline(transaction=True)
+            pipe.hset(self._key(chat_id), mapping=mapping)
+            pipe.expire(self._key(chat_id), self.ttl_seconds)
+            await pipe.execute()
+        except Exception as e:
+            logger.warning(f"Chat context cache write failed for chat {chat_id}: {e}")
+
+    async def record_turn(self, chat_id: str, has_reviewer: bool):
+        """응답 완료 후 reviewer_count 갱신 (DB 갱신과 같은 규칙)"""
+        try:
+            await self.redis.eval(
+                self._RECORD_SCRIPT, 1, self._key(chat_id), "1" if has_reviewer else "0", self.ttl_seconds
+            )
+        except Exception as e:
+            # 갱신 실패 시 오래된 값이 남지 않도록 삭제
+            logger.warning(f"Chat context cache update failed for chat {chat_id}: {e}")
+            await self.invalidate(chat_id)
+
+    async def invalidate(self, chat_id: str):
+        """캐시 삭제"""
+        try:
+            await self.redis.delete(self._key(chat_id))
+        except Exception as e:
+            logger.warning(f"Chat context cache invalidation failed for chat {chat_id}: {e}")
+
+
+def get_chat_context_cache(async_redis_client) -> Optional[ChatContextCache]:
+    """비동기 Redis 클라이언트가 있으면 채팅 컨텍스트 캐시 반환 (없으면 매번 DB 조회)"""
+    if async_redis_client is None:
+        return None
+    from src.config import settings
+
+    return ChatContextCache(async_redis_client, ttl_seconds=settings.chat_context_cache_ttl_seconds)
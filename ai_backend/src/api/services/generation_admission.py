@@ -0,0 +1,223 @@
+# _*_ coding: utf-8 _*_
+"""Admission control for LLM generation (per-user, per-worker, cluster-wide)."""
+import asyncio
+import logging
+import time
+from collections import deque
+from typing import AsyncIterator, Deque, Dict, Optional
+
+from src.types.response.exceptions import HandledException
+from src.types.response.response_code import ResponseCode
+from src.utils import get_current_datetime_iso
+
+logger = logging.getLogger(__name__)
+
+
+class AdmissionTicket:
+    """생성 요청 1건의 대기/실행 상태"""
+
+    __slots__ = ("user_id", "event", "started", "enqueued_at")
+
+    def __init__(self, user_id: str):
+        self.user_id = user_id or "user"
+        self.event = asyncio.Event()
+        self.started = False
+        self.enqueued_at = time.monotonic()
+
+
+class GenerationAdmissionController:
+    """
+    LLM 생성 admission control (워커 프로세스당 1개)
+
+    - 워커 전역 동시 생성 수 제한 (max_concurrent)
+    - 사용자별 동시 생성 수 제한 (max_per_user)
+    - Redis 토큰 버킷으로 클러스터 전체 생성 시작 속도 제한 (bucket_rate=0이면 사용 안 함)
+    - 슬롯이 없으면 실패하지 않고 FIFO로 대기하며 대기 순번을 queued 이벤트로 전달
+    - queue_timeout을 넘기면 CHAT_RATE_LIMIT_EXCEEDED로 종료하여 대기 시간 상한을 보장
+    """
+
+    BUCKET_KEY = "llm_admission:bucket"
+
+    # 토큰 버킷 (Redis 서버 시간 기준) - 허용 시 0, 아니면 다음 토큰까지 대기 ms 반환
+    _BUCKET_SCRIPT = """
+    local rate = tonumber(ARGV[1])
+    local capacity = tonumber(ARGV[2])
+    local t = redis.call('TIME')
+    local now = tonumber(t[1]) * 1000 + math.floor(tonumber(t[2]) / 1000)
+    local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+    local tokens = tonumber(state[1]) or capacity
+    local ts = tonumber(state[2]) or now
+    tokens = math.min(capacity, tokens + (now - ts) * rate / 1000)
+    local wait_ms = 0
+    if tokens >= 1 then
+        tokens = tokens - 1
+    else
+        wait_ms = math.ceil((1 - tokens) * 1000 / rate)
+    end
+    redis.call('HSET', KEYS[1], 'tokens', tokens, 'ts', now)
+    redis.call('PEXPIRE', KEYS[1], math.ceil(capacity * 1000 / rate) + 1000)
+    return wait_ms
+    """
+
+    def __init__(
+        self,
+        max_concurrent: int = 32,
+        max_per_user: int = 2,
+        async_redis_client=None,
+        bucket_rate: float = 0.0,
+        bucket_capacity: int = 20,
+        queue_timeout: float = 120.0,
+        update_interval: float = 2.0,
+    ):
+        self.max_concurrent = max_concurrent
+        self.max_per_user = max_per_user
+        self.redis = async_redis_client.redis_client if async_redis_client is not None else None
+        self.bucket_rate = bucket_rate
+        self.bucket_capacity = bucket_capacity
+        self.queue_timeout = queue_timeout
+        self.update_interval = update_interval
+
+        self._active = 0
+        self._active_by_user: Dict[str, int] = {}
+        self._waiters: Deque[AdmissionTicket] = deque()
+
+    @property
+    def active(self) -> int:
+        """실행 중인 생성 수"""
+        return self._active
+
+    @property
+    def waiting(self) -> int:
+        """대기 중인 요청 수"""
+        return len(self._waiters)
+
+    def _user_has_slot(self, user_id: str) -> bool:
+        return self._active_by_user.get(user_id, 0) < self.max_per_user
+
+    def _position(self, ticket: AdmissionTicket) -> Optional[int]:
+        """
+        대기 순번 (1부터) - 지금 시작할 수 있으면 None
+
+        사용자 제한에 걸린 앞 요청은 건너뛰므로, 한 사용자의 요청이 다른 사용자를 막지 않음
+        """
+        position = 0
+        for waiter in self._waiters:
+            if waiter is ticket:
+                break
+            if self._user_has_slot(waiter.user_id):
+                position += 1
+        free_slots = self.max_concurrent - self._active
+        if position < free_slots and self._user_has_slot(ticket.user_id):
+            return None
+        return max(1, position - free_slots + 1)
+
+    def _wake(self):
+        """대기 중인 요청을 깨워 시작 가능 여부를 다시 확인하게 함"""
+        for waiter in self._waiters:
+            waiter.event.set()
+
+    async def _take_token(self) -> float:
+        """클러스터 토큰 버킷에서 토큰 획득 - 대기해야 할 시간(초) 반환 (0이면 획득)"""
+        if self.redis is None or self.bucket_rate <= 0:
+            return 0.0
+        try:
+            wait_ms = await self.redis.eval(
+                self._BUCKET_SCRIPT, 1, self.BUCKET_KEY, self.bucket_rate, self.bucket_capacity
+            )
+            return int(wait_ms) / 1000.0
+        except Exception as e:
+            # Redis 장애 시 워커 단위 제한만 적용
+            logger.warning(f"Admission token bucket unavailable: {e}")
+            return 0.0
+
+    def _queued_event(self, position: int) -> dict:
+        return {
+            'type': 'queued',
+            'position': position,
+            'message': f"요청이 많아 대기 중입니다. (대기 순번: {position})",
+            'timestamp': get_current_datetime_iso(),
+        }
+
+    async def acquire(self, ticket: AdmissionTicket) -> AsyncIterator[dict]:
+        """
+        실행 슬롯 획득 - 대기하는 동안 queued 이벤트를 yield
+
+        순번이 바뀔 때마다 다시 알림 (연결 유지는 heartbeat 스케줄러가 담당)
+        """
+        self._waiters.append(ticket)
+        deadline = ticket.enqueued_at + self.queue_timeout
+        last_position = None
+        try:
+            while True:
+                position = self._position(ticket)
+                wait = self.update_interval
+                if position is None:
+                    token_wait = await self._take_token()
+                    if not token_wait:
+                        break
+                    # 클러스터 전체 한도 - 토큰이 찰 때까지 대기 (순번은 맨 앞)
+                    position, wait = 1, min(token_wait, self.update_interval)
+
+                if time.monotonic() >= deadline:
+                    raise HandledException(
+                        ResponseCode.CHAT_RATE_LIMIT_EXCEEDED,
+                        msg="요청이 많아 응답을 생성할 수 없습니다. 잠시 후 다시 시도해주세요.",
+                    )
+
+                if position != last_position:
+                    last_position = position
+                    yield self._queued_event(position)
+
+                ticket.event.clear()
+                try:
+                    await asyncio.wait_for(ticket.event.wait(), timeout=wait)
+                except asyncio.TimeoutError:
+                    pass  # 토큰 버킷/대기 시간 상한 재확인
+
+            ticket.started = True
+            self._active += 1
+            self._active_by_user[ticket.user_id] = self._active_by_user.get(ticket.user_id, 0) + 1
+            waited = time.monotonic() - ticket.enqueued_at
+            if waited >= 0.1:
+                logger.info(f"Generation admitted for user {ticket.user_id} after {waited:.1f}s")
+        finally:
+            try:
+                self._waiters.remove(ticket)
+            except ValueError:
+                pass
+            if not ticket.started:
+                self._wake()
+
+    def release(self, ticket: AdmissionTicket):
+        """실행 슬롯 반납 (획득하지 못한 티켓이면 무시)"""
+        if not ticket.started:
+            return
+        ticket.started = False
+        self._active -= 1
+        count = self._active_by_user.get(ticket.user_id, 0) - 1
+        if count > 0:
+            self._active_by_user[ticket.user_id] = count
+        else:
+            self._active_by_user.pop(ticket.user_id, None)
+        self._wake()
+
+
+# 전역 admission controller 인스턴스 (워커 프로세스당 1개)
+admission_controller = None
+
+
+def get_admission_controller(async_redis_client=None) -> GenerationAdmissionController:
+    """admission controller 싱글톤 반환"""
+    global admission_controller
+    if admission_controller is None:
+        from src.config import settings
+
+        admission_controller = GenerationAdmissionController(
+            max_concurrent=settings.chat_admission_max_concurrent,
+            max_per_user=settings.chat_admission_max_per_user,
+            async_redis_client=async_redis_client,
+            bucket_rate=settings.chat_admission_bucket_rate,
+            bucket_capacity=settings.chat_admission_bucket_capacity,
+            queue_timeout=settings.chat_admission_queue_timeout_seconds,
+        )
+    return admission_controller
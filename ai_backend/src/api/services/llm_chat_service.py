@@ -2,64 +2,108 @@
 """LLM Chat Service for handling AI conversations."""
 import asyncio
 import logging
-from datetime import datetime
-from typing import Dict, List, Optional
-from zoneinfo import ZoneInfo
+import time
+from contextlib import aclosing
+from functools import lru_cache
+from typing import Callable, Dict, List, Optional
 
 import tiktoken
 from openai import AsyncOpenAI
 from sqlalchemy.orm import Session
-from src.api.services.llm_provider_factory import BaseLLMProvider, LLMProviderFactory
+from src.api.services.chat_cancel_registry import get_cancel_registry
+from src.api.services.chat_context_cache import get_chat_context_cache
+from src.api.services.generation_admission import AdmissionTicket, get_admission_controller
+from src.api.services.llm_provider_factory import (
+    BaseLLMProvider,
+    CompletionContext,
+    LLMProviderFactory,
+)
+from src.api.services.semantic_response_cache import get_semantic_response_cache
+from src.api.services.stream_message_writer import StreamMessageWriter
+from src.api.services.title_generation_queue import (
+    get_title_generation_queue,
+    heuristic_chat_title,
+    normalize_generated_title,
+)
+from src.config import settings
 from src.database.base import Database
+from src.database.crud.async_chat_crud import AsyncChatCRUD
 from src.database.crud.chat_crud import ChatCRUD
-from src.database.crud.user_crud import UserCRUD
+from src.database.crud.user_crud import AsyncUserCRUD, UserCRUD
 from src.database.models.chat_models import ChatMessage
 from src.types.response.exceptions import HandledException
 from src.types.response.response_code import ResponseCode
+from src.utils import get_current_datetime_iso
 from src.utils.uuid_gen import gen
 
 logger = logging.getLogger(__name__)
 
 
+@lru_cache(maxsize=8)
+def _get_tokenizer(model: str):
+    """모델별 tokenizer 캐시 (프로세스당 1회 로딩)"""
+    return tiktoken.encoding_for_model(model)
+
+
 class LLMChatService:
     """LLM 채팅 서비스를 관리하는 클래스"""
     
-    def __init__(self, db: Session = None, redis_client=None):
+    def __init__(
+        self,
+        db: Session = None,
+        redis_client=None,
+        async_session_factory=None,
+        async_redis_client=None,
+    ):
         # DB 필수 검사
         if db is None:
             raise HandledException(ResponseCode.DATABASE_CONNECTION_ERROR, msg="Database session is required")
         
-        # LLM 제공자 팩토리를 사용하여 제공자 생성
+        # LLM 제공자 (프로세스 단위 공유 - 요청별 상태는 CompletionContext로 전달)
         try:
-            self.llm_provider = LLMProviderFactory.create_provider()
-            logger.info(f"LLM provider initialized: {type(self.llm_provider).__name__}")
+            self.llm_provider = LLMProviderFactory.get_shared_provider()
+            logger.debug(f"LLM provider initialized: {type(self.llm_provider).__name__}")
         except Exception as e:
             logger.error(f"Failed to initialize LLM provider: {e}")
             raise HandledException(ResponseCode.LLM_CONFIG_ERROR, e=e)
         
         self.db = db  # 이제 Session 객체
         self.redis_client = redis_client
-        self.chat_crud = ChatCRUD(db)  # Repository 인스턴스 생성
-        self.user_crud = UserCRUD(db)  # User Repository 인스턴스 생성
-        
-        # LLM 제공자 재생성 (chat_crud, user_crud 전달)
-        try:
-            self.llm_provider = LLMProviderFactory.create_provider(chat_crud=self.chat_crud, user_crud=self.user_crud)
-            logger.info(f"LLM provider re-initialized with chat_crud, user_crud: {type(self.llm_provider).__name__}")
-        except Exception as e:
-            logger.error(f"Failed to re-initialize LLM provider: {e}")
-            # 기존 provider 사용 (ExternalAPIProvider가 아닌 경우)
-        
-        # 취소 상태 관리
-        self.is_cancelled = {}
         
         # 레디스 사용 여부 결정 (로컬: DB만, 운영: 레디스+DB)
         self.use_redis = self._should_use_redis()
         logger.info(f"Cache mode: {'Redis + DB' if self.use_redis else 'DB only'}")
         
+        # Repository 인스턴스 생성 (레디스 사용 시 메시지 저장과 함께 채팅 캐시 갱신)
+        self.chat_crud = ChatCRUD(
+            db,
+            redis_client=redis_client if self.use_redis else None,
+            cache_window=settings.chat_history_cache_window,
+            cache_ttl=settings.cache_ttl_chat_messages,
+        )
+        self.user_crud = UserCRUD(db)  # User Repository 인스턴스 생성
+        
+        # 스트리밍 경로용 비동기 세션 팩토리(asyncpg)와 비동기 Redis 클라이언트
+        # - 이벤트 루프 안에서 DB/Redis I/O가 다른 스트림을 막지 않도록 함
+        self.async_session_factory = async_session_factory
+        self.async_redis_client = async_redis_client if self.use_redis else None
+        
+        # 채팅별 에이전트 요청 컨텍스트 캐시 (reviewer_count, site_list - Redis 미사용 시 None)
+        self.context_cache = get_chat_context_cache(self.async_redis_client)
+        
+        # PLC 질문 시맨틱 응답 캐시 (opt-in, 비활성화 시 None)
+        self.semantic_cache = get_semantic_response_cache(self.async_redis_client)
+        
+        # 생성 admission control (워커 전역/사용자별 동시 생성 수, 클러스터 토큰 버킷)
+        self.admission = get_admission_controller(self.async_redis_client)
+        
+        # 취소 상태 관리 (워커 단위 Event 레지스트리 + Redis pub/sub)
+        self.cancel_registry = get_cancel_registry()
+        self.cancel_check_interval = settings.chat_cancel_check_interval
+        
         # 토큰 관리 설정
         try:
-            self.tokenizer = tiktoken.encoding_for_model(self.llm_provider.model)
+            self.tokenizer = _get_tokenizer(self.llm_provider.model)
             self.max_tokens = 4000  # 안전한 토큰 제한
             self.max_history_tokens = 3000  # 히스토리에 사용할 최대 토큰
         except Exception as e:
@@ -92,6 +136,80 @@ class LLMChatService:
         logger.info("Redis available, using Redis + DB mode")
         return True
     
+    async def _get_provider_context_async(
+        self, chat_crud: AsyncChatCRUD, user_crud: AsyncUserCRUD, chat_id: str, user_id: str = None
+    ) -> CompletionContext:
+        """요청별 제공자 컨텍스트 생성 (채팅 컨텍스트 캐시 우선, 없으면 비동기 세션으로 조회 후 캐시)"""
+        context = CompletionContext(chat_id=chat_id, user_id=user_id)
+        need_chat = bool(chat_id) and self.llm_provider.supports(BaseLLMProvider.CAPABILITY_CHAT_CONTEXT)
+        need_user = bool(user_id) and self.llm_provider.supports(BaseLLMProvider.CAPABILITY_USER_CONTEXT)
+        if not need_chat and not need_user:
+            return context
+        
+        cached_reviewer_count, site_list_cached, cached_site_list = None, False, None
+        if self.context_cache is not None and chat_id:
+            cached_reviewer_count, site_list_cached, cached_site_list = await self.context_cache.get(chat_id, user_id)
+        
+        fetched = {}
+        if need_chat:
+            if cached_reviewer_count is None:
+                cached_reviewer_count = await chat_crud.get_reviewer_count(chat_id)
+                fetched["reviewer_count"] = cached_reviewer_count
+            context.reviewer_count = cached_reviewer_count
+        if need_user:
+            if not site_list_cached:
+                try:
+                    user = await user_crud.get_user(user_id)
+                    cached_site_list = user.site_list if user else None
+                    fetched.update(user_id=user_id, site_list=cached_site_list)
+                except Exception as e:
+                    logger.warning(f"Failed to get site_list for user {user_id}: {e}")
+            if cached_site_list:
+                context.site_list = cached_site_list
+        
+        if fetched and self.context_cache is not None and chat_id:
+            await self.context_cache.set(chat_id, **fetched)
+        return context
+    
+    async def _lookup_semantic_cache(
+        self,
+        chat_crud: AsyncChatCRUD,
+        plc_uuid: Optional[str],
+        messages: List[Dict],
+        context: CompletionContext,
+    ):
+        """
+        시맨틱 응답 캐시 조회
+
+        이전 대화가 있는 채팅은 같은 질문이라도 답이 달라지므로 캐시하지 않고,
+        응답에 영향을 주는 요청 범위(site_list, reviewer 수)는 키 공간에 포함
+
+        Returns:
+            (hit, cache_key): hit은 SemanticCacheHit 또는 None,
+            cache_key는 응답 저장에 사용할 (plc_uuid, 매핑 버전, 범위, 질문) - 캐시 대상이 아니면 None
+        """
+        if self.semantic_cache is None or not plc_uuid:
+            return None, None
+        turns = [m for m in messages if m.get("role") != "system"]
+        if len(turns) != 1 or turns[0].get("role") != "user" or not turns[0].get("content"):
+            return None, None
+        question = turns[0]["content"]
+        mapping_version = await chat_crud.get_plc_mapping_version(plc_uuid)
+        if not mapping_version:
+            return None, None
+        scope = self.semantic_cache.scope_digest(context.site_list, context.reviewer_count)
+        cache_key = (plc_uuid, mapping_version, scope, question)
+        return await self.semantic_cache.lookup(*cache_key), cache_key
+    
+    def _create_async_chat_crud(self, session) -> AsyncChatCRUD:
+        """비동기 세션용 Chat Repository 생성 (레디스 사용 시 채팅 캐시 함께 갱신)"""
+        return AsyncChatCRUD(
+            session,
+            redis_client=self.async_redis_client,
+            cache_window=settings.chat_history_cache_window,
+            cache_ttl=settings.cache_ttl_chat_messages,
+        )
+    
     def _count_tokens(self, text: str) -> int:
         """텍스트의 토큰 수 계산"""
         if self.tokenizer is None:
@@ -103,63 +221,66 @@ class LLMChatService:
             logger.warning(f"Token counting failed: {e}")
             return len(text) // 4
     
-    def _truncate_messages_by_tokens(self, messages: List[Dict]) -> List[Dict]:
-        """토큰 수를 기준으로 메시지 개수를 제한"""
-        if not self.tokenizer:
+    def _truncate_messages_by_tokens(
+        self, messages: List[Dict], token_counts: Optional[List[Optional[int]]] = None
+    ) -> List[Dict]:
+        """
+        토큰 수를 기준으로 메시지 개수를 제한
+        
+        저장 시 계산해 둔 토큰 수(token_counts)를 최신 메시지부터 합산하여
+        잘라낼 위치만 찾고, 마지막에 한 번 슬라이싱함 (O(n))
+        토큰 수가 없는 메시지(기존 데이터)만 즉시 계산함
+        """
+        if token_counts is None and not self.tokenizer:
             # 토큰 계산이 불가능한 경우 메시지 개수로 제한
             return messages[-20:]
         
-        total_tokens = 0
-        truncated_messages = []
-        
         # 시스템 프롬프트는 항상 포함
         system_prompt = messages[0] if messages and messages[0].get("role") == "system" else None
+        start = 1 if system_prompt else 0
+        total_tokens = 0
         if system_prompt:
-            total_tokens += self._count_tokens(system_prompt["content"])
-            truncated_messages.append(system_prompt)
+            total_tokens += self._message_token_count(system_prompt, token_counts, 0)
         
         # 나머지 메시지를 역순으로 확인 (최신 메시지부터)
-        remaining_messages = messages[1:] if system_prompt else messages
-        for message in reversed(remaining_messages):
-            message_tokens = self._count_tokens(message["content"])
+        cutoff = len(messages)
+        for index in range(len(messages) - 1, start - 1, -1):
+            message_tokens = self._message_token_count(messages[index], token_counts, index)
             if total_tokens + message_tokens > self.max_history_tokens:
                 break
             total_tokens += message_tokens
-            truncated_messages.insert(1 if system_prompt else 0, message)
+            cutoff = index
         
+        truncated_messages = ([system_prompt] if system_prompt else []) + messages[cutoff:]
         logger.debug(f"Truncated messages: {len(truncated_messages)} messages, ~{total_tokens} tokens")
         return truncated_messages
     
-    def _get_messages_for_openai(self, chat_id: str) -> List[Dict]:
-        """메시지를 가져와서 OpenAI 형식으로 변환 (레디스 우선)"""
+    def _message_token_count(self, message: Dict, token_counts: Optional[List[Optional[int]]], index: int) -> int:
+        """저장된 토큰 수 사용, 없으면 계산"""
+        if token_counts is not None and token_counts[index] is not None:
+            return token_counts[index]
+        return self._count_tokens(message["content"])
+    
+    def _cached_history_to_openai(self, cached_history: List[Dict]):
+        """캐시된 대화 기록을 OpenAI 형식 메시지와 토큰 수 목록으로 변환"""
         messages = []
-        
-        # 레디스 우선으로 대화 기록 조회
-        if self.use_redis:
-            try:
-                cached_history = self.redis_client.get_chat_messages(chat_id)
-                if cached_history:
-                    # 캐시된 데이터를 OpenAI 형식으로 변환
-                    for msg in cached_history[-20:]:  # 최근 20개로 증가
-                        # 취소된 메시지는 제외
-                        if msg.get("cancelled", False):
-                            continue
-                        messages.append({
-                            "role": msg.get("role", "user"),
-                            "content": msg.get("content", "")
-                        })
-                    logger.debug(f"Using cached history for chat {chat_id}: {len(messages)} messages")
-                    
-                    # 토큰 기반으로 메시지 제한 적용
-                    return self._truncate_messages_by_tokens(messages)
-            except Exception as e:
-                logger.warning(f"Redis cache read failed: {e}")
-        
-        # 레디스에 없거나 실패한 경우 DB에서 조회
-        db_messages = self.chat_crud.get_messages(chat_id)
-        
-        # 최근 20개 메시지만 사용 (토큰 제한 고려)
-        for msg in db_messages[-20:]:
+        token_counts = []
+        for msg in cached_history[-20:]:  # 최근 20개로 증가
+            # 취소된 메시지는 제외
+            if msg.get("cancelled", False):
+                continue
+            messages.append({
+                "role": msg.get("role", "user"),
+                "content": msg.get("content", "")
+            })
+            token_counts.append(msg.get("token_count"))
+        return messages, token_counts
+    
+    def _db_messages_to_openai(self, db_messages: List[ChatMessage]):
+        """DB 메시지를 OpenAI 형식 메시지와 토큰 수 목록으로 변환"""
+        messages = []
+        token_counts = []
+        for msg in db_messages:
             # 취소된 메시지는 제외
             if msg.is_cancelled:
                 continue
@@ -177,24 +298,31 @@ class LLMChatService:
                 "role": role,
                 "content": msg.message
             })
+            token_counts.append(msg.token_count)
+        return messages, token_counts
+    
+    async def _get_messages_for_openai_async(self, chat_crud: AsyncChatCRUD, chat_id: str) -> List[Dict]:
+        """메시지를 가져와서 OpenAI 형식으로 변환 (비동기 레디스 우선, 없으면 비동기 DB)"""
+        if self.async_redis_client is not None:
+            cached_history = await self.async_redis_client.get_chat_messages(chat_id)
+            if cached_history:
+                messages, token_counts = self._cached_history_to_openai(cached_history)
+                logger.debug(f"Using cached history for chat {chat_id}: {len(messages)} messages")
+                return self._truncate_messages_by_tokens(messages, token_counts)
         
+        messages, token_counts = self._db_messages_to_openai(await chat_crud.get_messages(chat_id, limit=20))
         logger.debug(f"Using DB history for chat {chat_id}: {len(messages)} messages")
-        
-        # 토큰 기반으로 메시지 제한 적용
-        return self._truncate_messages_by_tokens(messages)
+        return self._truncate_messages_by_tokens(messages, token_counts)
     
-    def _ensure_chat_exists(self, chat_id: str):
-        """채팅이 존재하지 않으면 생성"""
-        try:
-            # Repository에 세션 전달
-            self.chat_crud.get_chat_or_create(chat_id, "user")
-        except HandledException:
-            raise  # Repository에서 발생한 HandledException 전파
-        except Exception as e:
-            raise HandledException(ResponseCode.UNDEFINED_ERROR, e=e)
-    
-    def send_message_simple(self, chat_id: str, message: str, user_id: str = "user", plc_uuid: str = None) -> dict:
-        """사용자 메시지를 처리하고 LLM 응답을 생성 (REST API용)"""
+    async def send_message_simple(
+        self, chat_id: str, message: str, user_id: str = "user", plc_uuid: str = None,
+        admission_user_id: Optional[str] = None,
+    ) -> dict:
+        """
+        사용자 메시지를 처리하고 LLM 응답을 생성 (REST API용, 비동기 세션/공유 LLM 클라이언트 사용)
+        
+        admission_user_id: 사용자별 동시 생성 제한 기준 (라우터에서 인증된 user_id 전달, 없으면 user_id)
+        """
         try:
             # 비즈니스 로직 검증
             if not message or not message.strip():
@@ -203,27 +331,40 @@ class LLMChatService:
             if not chat_id or not chat_id.strip():
                 raise HandledException(ResponseCode.CHAT_SESSION_NOT_FOUND, msg="채팅 ID가 유효하지 않습니다.")
             
-            # 채팅 존재 확인 및 초기화
-            self._ensure_chat_exists(chat_id)
-            
-            # 사용자 메시지를 DB에 저장
-            user_message_id = gen()
-            self.chat_crud.save_user_message(user_message_id, chat_id, user_id, message, plc_uuid=plc_uuid)
-            
-            # LLM 응답 생성 (캐시 무효화 없이)
-            ai_response = asyncio.run(self._generate_ai_response(chat_id))
-            
-            # AI 응답을 DB에 저장
-            ai_message_id = gen()
-            self.chat_crud.save_ai_message(ai_message_id, chat_id, user_id, ai_response, "completed", plc_uuid=plc_uuid)
-            
-            # 메시지 저장 완료 후 캐시 무효화 (한 번만)
-            if self.use_redis:
+            async with self.async_session_factory() as session:
+                chat_crud = self._create_async_chat_crud(session)
+                
+                # 채팅 존재 확인 및 초기화
+                chat = await chat_crud.get_chat_or_create(chat_id, "user")
+                
+                # 첫 메시지면 제목 생성 예약 (LLM 호출은 백그라운드)
+                await self._schedule_title_generation(chat_crud, chat, message)
+                
+                # 사용자 메시지를 DB에 저장
+                user_message_id = gen()
+                await chat_crud.save_user_message(
+                    user_message_id, chat_id, user_id, message,
+                    plc_uuid=plc_uuid, token_count=self._count_tokens(message),
+                )
+                
+                # LLM 응답 생성 - 워커 이벤트 루프에서 공유 LLM 클라이언트로 호출 (생성 슬롯 대기 후)
+                ticket = AdmissionTicket(admission_user_id or user_id)
                 try:
-                    self.redis_client.delete_chat_messages(chat_id)
-                    logger.debug(f"Invalidated cache for chat {chat_id} after message completion")
-                except Exception as e:
-                    logger.warning(f"Redis cache invalidation failed: {e}")
+                    async with aclosing(self.admission.acquire(ticket)) as waiting:
+                        async for _ in waiting:
+                            pass
+                    ai_response = await self._generate_ai_response(
+                        chat_crud, AsyncUserCRUD(session), chat_id, user_id, plc_uuid
+                    )
+                finally:
+                    self.admission.release(ticket)
+                
+                # AI 응답을 DB에 저장
+                ai_message_id = gen()
+                await chat_crud.save_ai_message(
+                    ai_message_id, chat_id, user_id, ai_response, "completed",
+                    plc_uuid=plc_uuid, token_count=self._count_tokens(ai_response),
+                )
             
             # AI 응답 반환
             return {
@@ -236,18 +377,6 @@ class LLMChatService:
         except HandledException:
             raise  # HandledException은 그대로 전파
         except Exception as e:
-            # 에러 발생 시 메시지 상태를 error로 업데이트
-            if 'ai_message_id' in locals():
-                try:
-                    chat_crud = ChatCRUD(self.db)
-                    # AIMessage 객체를 안전하게 문자열로 변환
-                    error_msg = self._safe_error_message(e)
-                    chat_crud.update_message_to_error(ai_message_id, error_msg)
-                except HandledException:
-                    raise  # Repository에서 발생한 HandledException 전파
-                except Exception as db_error:
-                    logger.error(f"Failed to update message status to error: {db_error}")
-            
             raise HandledException(ResponseCode.UNDEFINED_ERROR, e=e)
     
     def _safe_error_message(self, error) -> str:
@@ -266,32 +395,18 @@ class LLMChatService:
             # 모든 변환에 실패한 경우
             return "Unknown error occurred"
     
-    async def _generate_ai_response(self, chat_id: str) -> str:
+    async def _generate_ai_response(
+        self,
+        chat_crud: AsyncChatCRUD,
+        user_crud: AsyncUserCRUD,
+        chat_id: str,
+        user_id: str = None,
+        plc_uuid: str = None,
+    ) -> str:
         """OpenAI API를 사용하여 AI 응답 생성"""
         try:
-            # 대화 기록을 가져와서 OpenAI 형식으로 변환
-            messages = []
-            
-            # 레디스 우선으로 대화 기록 조회
-            if self.use_redis:
-                try:
-                    cached_history = self.redis_client.get_chat_messages(chat_id)
-                    if cached_history:
-                        # 캐시된 데이터 사용
-                        for msg in cached_history[-10:]:  # 최근 10개만
-                            messages.append({
-                                "role": msg.get("role", "user"),
-                                "content": msg.get("content", "")
-                            })
-                    else:
-                        # 캐시에 없으면 DB에서 조회
-                        messages = self._get_messages_for_openai(chat_id)
-                except Exception as e:
-                    logger.warning(f"Redis cache read failed: {e}")
-                    messages = self._get_messages_for_openai(chat_id)
-            else:
-                # DB만 사용
-                messages = self._get_messages_for_openai(chat_id)
+            # 대화 기록을 가져와서 OpenAI 형식으로 변환 (레디스 우선, 토큰 제한 적용)
+            messages = await self._get_messages_for_openai_async(chat_crud, chat_id)
             
             # 시스템 프롬프트 추가
             system_prompt = {
@@ -304,20 +419,26 @@ class LLMChatService:
             for i, msg in enumerate(messages):
                 logger.debug(f"  Message {i}: {msg['role']} - {msg['content'][:100]}...")
             
-            # LLM 제공자를 통한 API 호출 (ExternalAPIProvider인 경우 chat_id, user_id 전달)
-            # user_id는 _generate_ai_response에서 지원하지 않으므로 기본값 사용
-            if hasattr(self.llm_provider, 'create_completion'):
-                # create_completion 메서드의 시그니처를 확인하여 chat_id 지원 여부 판단
-                import inspect
-                sig = inspect.signature(self.llm_provider.create_completion)
-                if 'chat_id' in sig.parameters:
-                    response = await self.llm_provider.create_completion(messages, chat_id=chat_id)
-                else:
-                    response = await self.llm_provider.create_completion(messages)
-            else:
-                response = await self.llm_provider.create_completion(messages)
+            # 같은 PLC에 대한 비슷한 질문이면 캐시된 응답 사용 (LLM 호출 생략)
+            provider_context = await self._get_provider_context_async(chat_crud, user_crud, chat_id, user_id)
+            semantic_hit, semantic_key = await self._lookup_semantic_cache(
+                chat_crud, plc_uuid, messages, provider_context
+            )
+            if semantic_hit is not None:
+                return semantic_hit.answer
             
-            return response.choices[0].message.content
+            # LLM 응답 대기 중에는 DB 커넥션을 풀에 반환
+            await chat_crud.release_connection()
+            
+            # LLM 제공자를 통한 API 호출 (요청 컨텍스트는 호출 시점에 전달)
+            response = await self.llm_provider.create_completion(
+                messages, stream=False, context=provider_context,
+            )
+            
+            content = response.choices[0].message.content
+            if semantic_key is not None:
+                await self.semantic_cache.store(*semantic_key, content)
+            return content
             
         except HandledException:
             raise  # HandledException은 그대로 전파
@@ -325,35 +446,45 @@ class LLMChatService:
             raise HandledException(ResponseCode.CHAT_AI_RESPONSE_ERROR, e=e)
     
     
-    def get_conversation_history(self, chat_id: str) -> List[Dict]:
-        """대화 기록 조회 (레디스 우선, 없으면 DB에서)"""
+    def get_conversation_history(self, chat_id: str, before: Optional[str] = None, limit: int = 50) -> List[Dict]:
+        """
+        대화 기록 조회 (레디스 우선, 없으면 DB에서)
+        
+        before(메시지 ID 커서)가 없으면 최근 limit개를, 있으면 해당 메시지 이전의 limit개를 반환
+        캐시는 최근 페이지(before 없음)에만 사용
+        """
         try:
             # 비즈니스 로직 검증
             if not chat_id or not chat_id.strip():
                 raise HandledException(ResponseCode.CHAT_SESSION_NOT_FOUND, msg="채팅 ID가 유효하지 않습니다.")
             
-            if self.use_redis:
+            if before:
+                return self.chat_crud.get_messages_from_db(chat_id, limit=limit, before=before)
+            
+            if self.use_redis and limit <= settings.chat_history_cache_window:
                 # 레디스에서 먼저 조회
                 try:
                     cached_history = self.redis_client.get_chat_messages(chat_id)
                     if cached_history:
                         logger.debug(f"Cache hit for chat {chat_id}")
-                        return cached_history
+                        return cached_history[-limit:]
                 except Exception as e:
                     logger.warning(f"Redis cache read failed: {e}")
             
             # 레디스에 없거나 실패한 경우 DB에서 조회
-            history = self.chat_crud.get_messages_from_db(chat_id)
+            history = self.chat_crud.get_messages_from_db(chat_id, limit=max(limit, settings.chat_history_cache_window))
             
-            # 레디스 사용 시 캐시에 저장
+            # 레디스 사용 시 캐시에 저장 (이후 메시지는 CRUD에서 리스트에 추가)
             if self.use_redis and history:
                 try:
-                    self.redis_client.set_chat_messages(chat_id, history, 1800)  # 30분 TTL
+                    self.redis_client.set_chat_messages(
+                        chat_id, history[-settings.chat_history_cache_window:], settings.cache_ttl_chat_messages
+                    )
                     logger.debug(f"Cached history for chat {chat_id}")
                 except Exception as e:
                     logger.warning(f"Redis cache write failed: {e}")
             
-            return history
+            return history[-limit:]
         except HandledException:
             raise  # HandledException은 그대로 전파
         except Exception as e:
@@ -368,16 +499,8 @@ class LLMChatService:
             # 레디스 캐시도 삭제
             if self.use_redis:
                 try:
-                    # 채팅방 메시지 캐시 삭제
-                    self.redis_client.delete_chat_messages(chat_id)
-                    
-                    # 생성 상태 캐시 삭제
-                    generation_key = f"generation:{chat_id}"
-                    self.redis_client.redis_client.delete(generation_key)
-                    
-                    # 취소 상태 캐시 삭제
-                    cancel_key = f"cancel:{chat_id}"
-                    self.redis_client.redis_client.delete(cancel_key)
+                    # 채팅방 메시지/생성 상태/취소 상태/컨텍스트 캐시를 한 번에 삭제
+                    self.redis_client.clear_chat_state(chat_id)
                     
                     logger.debug(f"Cleared all cache for chat {chat_id}")
                 except Exception as e:
@@ -389,7 +512,7 @@ class LLMChatService:
     
     def get_current_timestamp(self) -> str:
         """현재 타임스탬프 반환"""
-        return datetime.now(ZoneInfo("Asia/Seoul")).isoformat()
+        return get_current_datetime_iso()
     
     def get_active_chats(self) -> List[str]:
         """현재 생성 중인 채팅 목록 반환 (DB에서)"""
@@ -401,36 +524,91 @@ class LLMChatService:
         except Exception as e:
             raise HandledException(ResponseCode.UNDEFINED_ERROR, e=e)
     
-    def save_user_message(self, chat_id: str, message: str, user_id: str = "user", plc_uuid: str = None) -> str:
-        """사용자 메시지를 저장하고 메시지 ID 반환"""
-        # 세션 존재 확인 및 초기화
-        self._ensure_chat_exists(chat_id)
+    async def save_user_message(
+        self,
+        chat_id: str,
+        message: str,
+        user_id: str = "user",
+        plc_uuid: str = None,
+        on_title: Optional[Callable[[dict], None]] = None,
+    ) -> str:
+        """
+        사용자 메시지를 저장하고 메시지 ID 반환 (비동기 세션 사용)
         
-        # 사용자 메시지를 DB에 저장
-        user_message_id = gen()
-        self.chat_crud.save_user_message_simple(user_message_id, chat_id, user_id, message, plc_uuid=plc_uuid)
+        첫 메시지면 제목 생성을 백그라운드로 예약하고, 제목이 반영되면 on_title로 chat_title 이벤트를 전달
+        """
+        async with self.async_session_factory() as session:
+            chat_crud = self._create_async_chat_crud(session)
+            
+            # 세션 존재 확인 및 초기화
+            chat = await chat_crud.get_chat_or_create(chat_id, "user")
+            
+            # 첫 메시지면 제목 생성 예약 (LLM 호출은 백그라운드)
+            await self._schedule_title_generation(chat_crud, chat, message, on_title)
+            
+            # 사용자 메시지를 DB에 저장 (레디스 사용 시 채팅 캐시에도 추가)
+            user_message_id = gen()
+            await chat_crud.save_user_message(
+                user_message_id, chat_id, user_id, message,
+                plc_uuid=plc_uuid, token_count=self._count_tokens(message),
+            )
         
-        # 스트리밍에서는 캐시 무효화를 하지 않음 (성능 향상)
-        # 대화 완료 후에만 캐시를 업데이트
         logger.debug(f"Saved user message for chat {chat_id}")
         
         return user_message_id
     
-    async def generate_ai_response_stream(self, chat_id: str, user_id: str = "user", plc_uuid: str = None):
-        """AI 응답을 스트리밍으로 생성"""
+    async def generate_ai_response_stream(
+        self, chat_id: str, user_id: str = "user", plc_uuid: str = None,
+        admission_user_id: Optional[str] = None,
+    ):
+        """
+        AI 응답을 스트리밍으로 생성 (스트림 수명 동안 비동기 DB 세션 1개 사용, LLM 대기 중에는 커넥션 반환)
+        
+        생성 슬롯이 없으면 admission controller에서 대기하며 queued 이벤트를 먼저 전달
+        admission_user_id: 사용자별 동시 생성 제한 기준 (라우터에서 인증된 user_id 전달, 없으면 user_id)
+        """
+        ticket = AdmissionTicket(admission_user_id or user_id)
+        try:
+            async with aclosing(self.admission.acquire(ticket)) as waiting:
+                async for event in waiting:
+                    yield event
+            
+            async with self.async_session_factory() as session:
+                stream = self._generate_ai_response_stream(
+                    self._create_async_chat_crud(session), AsyncUserCRUD(session), chat_id, user_id, plc_uuid
+                )
+                async with aclosing(stream):
+                    async for event in stream:
+                        yield event
+        finally:
+            self.admission.release(ticket)
+    
+    async def _generate_ai_response_stream(
+        self,
+        chat_crud: AsyncChatCRUD,
+        user_crud: AsyncUserCRUD,
+        chat_id: str,
+        user_id: str = "user",
+        plc_uuid: str = None,
+    ):
+        """AI 응답 스트리밍 본문 - DB/Redis I/O는 모두 비동기로 수행"""
         ai_message_id = None
         ai_response_content = ""
         is_cancelled = False
+        semantic_hit = semantic_key = None
+        
+        # 취소 Event 등록 (cancel_generation 또는 다른 워커의 pub/sub 신호로 설정됨)
+        cancel_event = self.cancel_registry.register(chat_id)
         
         try:
             # 세션 존재 확인 및 초기화
-            self._ensure_chat_exists(chat_id)
+            await chat_crud.get_chat_or_create(chat_id, "user")
             
             # 생성 시작 표시 (레디스에 저장)
-            if self.use_redis:
+            if self.async_redis_client is not None:
                 try:
-                    generation_key = f"generation:{chat_id}"
-                    self.redis_client.redis_client.setex(generation_key, 300, "1")  # 5분 TTL
+                    # 생성 상태 저장(5분 TTL) + 이전 생성에서 남은 취소 키 제거를 한 번에 실행
+                    await self.async_redis_client.start_generation(chat_id, ttl=300)
                 except Exception as e:
                     logger.warning(f"Redis generation start failed: {e}")
             
@@ -443,7 +621,7 @@ class LLMChatService:
             }
             
             # 취소 확인
-            if self.is_cancelled.get(chat_id, False):
+            if cancel_event.is_set():
                 is_cancelled = True
                 yield {
                     'type': 'cancelled',
@@ -453,7 +631,7 @@ class LLMChatService:
                 return
             
             # 대화 기록을 가져와서 OpenAI 형식으로 변환 (레디스 우선)
-            messages = self._get_messages_for_openai(chat_id)
+            messages = await self._get_messages_for_openai_async(chat_crud, chat_id)
             
             # 시스템 프롬프트 추가
             system_prompt = {
@@ -475,7 +653,7 @@ class LLMChatService:
             }
             
             # 취소 확인
-            if self.is_cancelled.get(chat_id, False):
+            if cancel_event.is_set():
                 is_cancelled = True
                 yield {
                     'type': 'cancelled',
@@ -484,96 +662,110 @@ class LLMChatService:
                 }
                 return
             
-            # LLM 제공자를 통한 스트리밍 API 호출 (ExternalAPIProvider인 경우 chat_id, user_id 전달)
-            if hasattr(self.llm_provider, 'create_completion'):
-                # create_completion 메서드의 시그니처를 확인하여 chat_id, user_id 지원 여부 판단
-                import inspect
-                sig = inspect.signature(self.llm_provider.create_completion)
-                if 'chat_id' in sig.parameters and 'user_id' in sig.parameters:
-                    stream = await self.llm_provider.create_completion(messages, stream=True, chat_id=chat_id, user_id=user_id)
-                elif 'chat_id' in sig.parameters:
-                    stream = await self.llm_provider.create_completion(messages, stream=True, chat_id=chat_id)
-                else:
-                    stream = await self.llm_provider.create_completion(messages, stream=True)
-            else:
-                stream = await self.llm_provider.create_completion(messages, stream=True)
+            # 같은 PLC에 대한 비슷한 질문이면 캐시된 응답 사용 (LLM 호출 생략)
+            # (요청 범위가 캐시 키에 포함되므로 제공자 컨텍스트를 먼저 준비)
+            provider_context = await self._get_provider_context_async(chat_crud, user_crud, chat_id, user_id)
+            semantic_hit, semantic_key = await self._lookup_semantic_cache(
+                chat_crud, plc_uuid, messages, provider_context
+            )
+            
+            # 준비 단계 읽기 트랜잭션 종료 - LLM 응답 대기 중에는 DB 커넥션을 풀에 반환
+            # (이후 쓰기/체크포인트는 각각 커밋하므로 커넥션을 계속 점유하지 않음)
+            await chat_crud.release_connection()
+            
+            # LLM 제공자를 통한 스트리밍 API 호출 (요청 컨텍스트는 호출 시점에 전달)
+            # (제공자가 수집하는 노드 데이터는 이 스트림의 context에만 기록됨)
+            if semantic_hit is None:
+                stream = await self.llm_provider.create_completion(
+                    messages, stream=True, context=provider_context,
+                )
             
             ai_response_content = ""
             ai_message_id = gen()
             
             # AI 응답을 진행중 상태로 DB에 저장
-            self.chat_crud.save_ai_message_generating(ai_message_id, chat_id, user_id, plc_uuid=plc_uuid)
-            
-            async for chunk in stream:
-                # 취소 확인 (레디스 우선)
-                if self.use_redis:
-                    try:
-                        cancel_key = f"cancel:{chat_id}"
-                        if self.redis_client.redis_client.exists(cancel_key):
-                            is_cancelled = True
-                            logger.info(f"Cancellation detected in stream for session: {chat_id}")
-                            yield {
-                                'type': 'cancelled',
-                                'message': '사용자에 의해 취소되었습니다.',
-                                'timestamp': self.get_current_timestamp()
-                            }
-                            break
-                    except Exception as e:
-                        logger.warning(f"Redis cancel check failed: {e}")
-                
-                # 레디스에 없거나 실패한 경우 DB에서 확인
-                if not is_cancelled:
-                    try:
-                        messages = self.chat_crud.get_messages(chat_id)
-                        if messages and messages[-1].is_cancelled:
-                            is_cancelled = True
-                            logger.info(f"Cancellation detected in stream for session: {chat_id}")
-                            yield {
-                                'type': 'cancelled',
-                                'message': '사용자에 의해 취소되었습니다.',
-                                'timestamp': self.get_current_timestamp()
-                            }
-                            break
-                    except Exception as e:
-                        logger.warning(f"DB cancel check failed: {e}")
-                
-                # Provider별 스트림 청크 처리
-                content = self.llm_provider.process_stream_chunk(chunk)
-                if content is not None:
-                    ai_response_content += content
+            await chat_crud.save_ai_message_generating(ai_message_id, chat_id, user_id, plc_uuid=plc_uuid)
+            
+            # 부분 응답은 write-behind 버퍼로 주기적으로만 체크포인트
+            message_writer = StreamMessageWriter(chat_crud, ai_message_id, chat_id)
+            
+            # 취소 fallback 확인 시점 (pub/sub 신호를 놓친 경우 대비)
+            next_cancel_check = time.monotonic() + self.cancel_check_interval
+            
+            if semantic_hit is not None:
+                # 캐시 응답은 한 번에 전송
+                await message_writer.append(semantic_hit.answer)
+                yield {
+                    'type': 'ai_response_chunk',
+                    'message_id': ai_message_id,
+                    'content': semantic_hit.answer,
+                    'user_id': user_id,
+                    'timestamp': self.get_current_timestamp()
+                }
+            else:
+                async for chunk in self._iterate_until_cancelled(stream, cancel_event):
+                    # 주기적으로만 Redis 취소 키/DB 상태 확인 (청크당 I/O 없음)
+                    if time.monotonic() >= next_cancel_check:
+                        next_cancel_check = time.monotonic() + self.cancel_check_interval
+                        if await self._is_cancel_requested(chat_crud, chat_id, ai_message_id):
+                            cancel_event.set()
+                    
+                    if cancel_event.is_set():
+                        # 래퍼가 다음 반복에서 스트림을 닫고 종료
+                        continue
                     
-                    # 부분 응답 스트림
-                    yield {
-                        'type': 'ai_response_chunk',
-                        'message_id': ai_message_id,
-                        'content': content,
-                        'user_id': user_id,
-                        'timestamp': self.get_current_timestamp()
-                    }
+                    # Provider별 스트림 청크 처리
+                    content = self.llm_provider.process_stream_chunk(chunk)
+                    if content is not None:
+                        await message_writer.append(content)
+                        
+                        # 부분 응답 스트림
+                        yield {
+                            'type': 'ai_response_chunk',
+                            'message_id': ai_message_id,
+                            'content': content,
+                            'user_id': user_id,
+                            'timestamp': self.get_current_timestamp()
+                        }
+
+            ai_response_content = message_writer.content
+            
+            if cancel_event.is_set():
+                is_cancelled = True
+                logger.info(f"Cancellation detected in stream for session: {chat_id}")
+                yield {
+                    'type': 'cancelled',
+                    'message': '사용자에 의해 취소되었습니다.',
+                    'timestamp': self.get_current_timestamp()
+                }
             
             # 취소되지 않은 경우에만 완전한 응답 처리
             if not is_cancelled and ai_response_content:
-                # External API provider인 경우 노드 데이터 저장
-                if hasattr(self.llm_provider, 'get_collected_node_data'):
-                    node_data = self.llm_provider.get_collected_node_data()
-                    if node_data:
-                        # 노드 데이터와 함께 메시지 완료 업데이트
-                        self.chat_crud.update_ai_message_completed(ai_message_id, ai_response_content, node_data)
-                        # 노드 데이터 초기화
-                        self.llm_provider.clear_node_data()
+                # External API provider인 경우 노드 데이터 수집 (캐시 응답은 저장된 노드 데이터 사용)
+                # 검토 노드 여부는 스트리밍 중 확인한 값 사용 (캐시 응답은 저장 시 검사)
+                node_data = None
+                has_reviewer = None
+                if semantic_hit is not None:
+                    node_data = semantic_hit.node_data
+                elif self.llm_provider.supports(BaseLLMProvider.CAPABILITY_NODE_DATA):
+                    node_data = dict(provider_context.node_data) or None
+                    has_reviewer = provider_context.has_reviewer
+                
+                # 메시지 완료, 노드 데이터, 마지막 메시지 시간을 한 트랜잭션으로 저장
+                await message_writer.complete(
+                    node_data, token_count=self._count_tokens(ai_response_content), has_reviewer=has_reviewer,
+                )
+                
+                # DB와 같은 규칙으로 채팅 컨텍스트 캐시의 reviewer_count 갱신 (노드 데이터가 있을 때만 변경됨)
+                if node_data and self.context_cache is not None:
+                    if has_reviewer is None:
+                        await self.context_cache.invalidate(chat_id)
                     else:
-                        self.chat_crud.update_ai_message_completed(ai_message_id, ai_response_content)
-                else:
-                    # 일반 provider인 경우
-                    self.chat_crud.update_ai_message_completed(ai_message_id, ai_response_content)
+                        await self.context_cache.record_turn(chat_id, has_reviewer)
                 
-                # 스트리밍 완료 후 캐시 무효화
-                if self.use_redis:
-                    try:
-                        self.redis_client.delete_chat_messages(chat_id)
-                        logger.debug(f"Invalidated cache for chat {chat_id} after streaming completion")
-                    except Exception as e:
-                        logger.warning(f"Redis cache invalidation failed: {e}")
+                # 새로 생성한 응답은 시맨틱 캐시에 저장
+                if semantic_hit is None and semantic_key is not None:
+                    await self.semantic_cache.store(*semantic_key, ai_response_content, node_data)
                 
                 # 완료 표시
                 yield {
@@ -587,22 +779,22 @@ class LLMChatService:
                 # 취소된 경우 - 메시지 처리
                 try:
                     if ai_message_id:
-                        self.chat_crud.update_message_to_error(ai_message_id, "⚠️ 응답이 취소되었습니다.")
+                        await chat_crud.update_message_to_error(ai_message_id, "⚠️ 응답이 취소되었습니다.", chat_id=chat_id)
                     else:
                         # ai_message_id가 없으면 새로 생성
                         ai_message_id = gen()
                         
                         # 채팅방이 존재하는지 확인하고, 없으면 생성
-                        chat = self.chat_crud.get_chat(chat_id)
+                        chat = await chat_crud.get_chat(chat_id)
                         if not chat:
-                            self.chat_crud.create_chat(
+                            await chat_crud.create_chat(
                                 chat_id=chat_id,
                                 chat_title=f"Chat {chat_id}",
                                 user_id=user_id
                             )
                             
                         # 취소 메시지 저장
-                        self.chat_crud.create_message(
+                        await chat_crud.create_message(
                             message_id=ai_message_id,
                             chat_id=chat_id,
                             user_id=user_id,
@@ -633,12 +825,7 @@ class LLMChatService:
             # HandledException은 스트림으로 전달 (연결 유지)
             if ai_message_id:
                 try:
-                    self.chat_crud.update_message_status(ai_message_id, "error")
-                    # 에러 메시지로 업데이트
-                    message = self.db.query(ChatMessage).filter(ChatMessage.message_id == ai_message_id).first()
-                    if message:
-                        message.message = f"❌ 오류가 발생했습니다: {e.message}"
-                        self.db.commit()
+                    await chat_crud.update_message_to_error(ai_message_id, e.message, chat_id=chat_id)
                 except Exception as db_error:
                     logger.error(f"Failed to update message status to error: {db_error}")
             
@@ -656,12 +843,7 @@ class LLMChatService:
             # 에러 발생 시 메시지 상태를 error로 업데이트
             if ai_message_id:
                 try:
-                    self.chat_crud.update_message_status(ai_message_id, "error")
-                    # 에러 메시지로 업데이트
-                    message = self.db.query(ChatMessage).filter(ChatMessage.message_id == ai_message_id).first()
-                    if message:
-                        message.message = f"❌ 오류가 발생했습니다: {str(e)}"
-                        self.db.commit()
+                    await chat_crud.update_message_to_error(ai_message_id, str(e), chat_id=chat_id)
                 except Exception as db_error:
                     logger.error(f"Failed to update message status to error: {db_error}")
             
@@ -677,14 +859,71 @@ class LLMChatService:
             )
             yield error_response.dict()
         finally:
+            self.cancel_registry.unregister(chat_id)
+            
             # 생성 완료 - 레디스에서 생성 상태 제거
-            if self.use_redis:
+            if self.async_redis_client is not None:
                 try:
-                    generation_key = f"generation:{chat_id}"
-                    self.redis_client.redis_client.delete(generation_key)
+                    await self.async_redis_client.finish_generation(chat_id)
                 except Exception as e:
                     logger.warning(f"Redis generation cleanup failed: {e}")
     
+    async def _iterate_until_cancelled(self, stream, cancel_event: asyncio.Event):
+        """취소 Event가 설정되면 다음 청크를 기다리지 않고 즉시 종료하는 스트림 래퍼"""
+        iterator = stream.__aiter__()
+        cancel_wait = asyncio.ensure_future(cancel_event.wait())
+        try:
+            while not cancel_event.is_set():
+                next_chunk = asyncio.ensure_future(iterator.__anext__())
+                await asyncio.wait({next_chunk, cancel_wait}, return_when=asyncio.FIRST_COMPLETED)
+                if not next_chunk.done():
+                    # 취소 신호가 먼저 도착 - 대기 중인 청크 요청 중단
+                    # (__anext__ 태스크가 끝나기 전에는 aclose()가 "already running"으로 실패하므로 종료까지 대기)
+                    next_chunk.cancel()
+                    await asyncio.gather(next_chunk, return_exceptions=True)
+                    break
+                try:
+                    chunk = next_chunk.result()
+                except StopAsyncIteration:
+                    break
+                yield chunk
+        finally:
+            cancel_wait.cancel()
+            await self._close_stream(iterator)
+    
+    async def _close_stream(self, stream):
+        """Provider 스트림을 닫아 업스트림 연결 해제"""
+        try:
+            if hasattr(stream, "aclose"):
+                await stream.aclose()
+            elif hasattr(stream, "close"):
+                result = stream.close()
+                if asyncio.iscoroutine(result):
+                    await result
+        except Exception as e:
+            logger.debug(f"Stream close failed: {e}")
+    
+    async def _is_cancel_requested(
+        self, chat_crud: AsyncChatCRUD, chat_id: str, ai_message_id: Optional[str]
+    ) -> bool:
+        """취소 fallback 확인 (Redis 취소 키 → DB 메시지 상태)"""
+        if self.async_redis_client is not None:
+            try:
+                if await self.async_redis_client.is_cancel_requested(chat_id):
+                    return True
+            except Exception as e:
+                logger.warning(f"Redis cancel check failed: {e}")
+        
+        if ai_message_id:
+            try:
+                return await chat_crud.is_message_cancelled(ai_message_id)
+            except Exception as e:
+                logger.warning(f"DB cancel check failed: {e}")
+            finally:
+                # 다음 청크를 기다리는 동안 커넥션을 점유하지 않도록 읽기 트랜잭션 종료
+                await chat_crud.release_connection()
+        return False
+    
     async def cancel_generation(self, chat_id: str, user_id: str = "user"):
         """현재 생성 중인 AI 응답을 취소"""
         try:
@@ -692,41 +931,37 @@ class LLMChatService:
             if not chat_id or not chat_id.strip():
                 raise HandledException(ResponseCode.CHAT_SESSION_NOT_FOUND, msg="채팅 ID가 유효하지 않습니다.")
             
-            # 세션 존재 확인 및 초기화
-            self._ensure_chat_exists(chat_id)
+            # 실행 중인 스트림 즉시 깨우기 (로컬 Event + 다른 워커에 pub/sub 전파)
+            await self.cancel_registry.cancel(chat_id)
             
             # 레디스에서 생성 상태 확인
-            if self.use_redis:
+            if self.async_redis_client is not None:
                 try:
-                    generation_key = f"generation:{chat_id}"
-                    if self.redis_client.redis_client.exists(generation_key):
-                        # 레디스에서 생성 상태 제거
-                        self.redis_client.redis_client.delete(generation_key)
-                        
-                        # 취소 상태를 레디스에 저장
-                        cancel_key = f"cancel:{chat_id}"
-                        self.redis_client.redis_client.setex(cancel_key, 60, "1")  # 1분 TTL
-                        
+                    # 생성 중이면 생성 상태 제거 + 취소 상태 저장(1분 TTL)을 한 번에 원자적으로 처리
+                    if await self.async_redis_client.cancel_generation_state(chat_id, cancel_ttl=60):
                         logger.info(f"Generation cancelled for session: {chat_id}")
                         return True
                 except Exception as e:
                     logger.warning(f"Redis cancel check failed: {e}")
             
-            # DB에서 현재 생성 중인 메시지가 있는지 확인
-            messages = self.chat_crud.get_messages(chat_id)
-            
-            # 최근 메시지가 generating 상태인지 확인
-            if messages and messages[-1].status == "generating":
-                # 생성 중인 메시지를 취소 상태로 변경
-                messages[-1].status = "cancelled"
-                messages[-1].is_cancelled = True
-                messages[-1].message = "⚠️ 응답이 취소되었습니다."
-                self.db.commit()
-                logger.info(f"Generation cancelled for session: {chat_id}")
-                return True
-            else:
+            async with self.async_session_factory() as session:
+                chat_crud = self._create_async_chat_crud(session)
+                
+                # 세션 존재 확인 및 초기화
+                await chat_crud.get_chat_or_create(chat_id, "user")
+                
+                # DB에서 현재 생성 중인 메시지가 있는지 확인
+                messages = await chat_crud.get_messages(chat_id, limit=1)
+                
+                # 최근 메시지가 generating 상태인지 확인
+                if messages and messages[-1].status == "generating":
+                    # 생성 중인 메시지를 취소 상태로 변경
+                    await chat_crud.update_message_to_cancelled(messages[-1].message_id, chat_id)
+                    logger.info(f"Generation cancelled for session: {chat_id}")
+                    return True
+                
                 # 생성이 완료되었거나 시작되지 않은 경우에도 취소 메시지 저장
-                await self._save_cancelled_message_standalone(chat_id, user_id)
+                await self._save_cancelled_message_standalone(chat_crud, chat_id, user_id)
                 logger.info(f"No active generation to cancel for session: {chat_id}, but saved cancelled message")
                 return True
                 
@@ -735,35 +970,18 @@ class LLMChatService:
         except Exception as e:
             raise HandledException(ResponseCode.CHAT_GENERATION_CANCEL_ERROR, e=e)
     
-    async def _save_cancelled_message_standalone(self, chat_id: str, user_id: str = "user"):
+    async def _save_cancelled_message_standalone(self, chat_crud: AsyncChatCRUD, chat_id: str, user_id: str = "user"):
         """독립적으로 취소 메시지를 저장하는 메서드"""
         try:
-            # 메시지 ID 생성
-            ai_message_id = gen()
-            
-            # 채팅방이 존재하는지 확인하고, 없으면 생성
-            chat = self.chat_crud.get_chat(chat_id)
-            if not chat:
-                self.chat_crud.create_chat(
-                    chat_id=chat_id,
-                    chat_title=f"Chat {chat_id}",
-                    user_id=user_id
-                )
-            
-            # 취소 메시지 저장
-            self.chat_crud.create_message(
-                message_id=ai_message_id,
+            await chat_crud.create_message(
+                message_id=gen(),
                 chat_id=chat_id,
                 user_id=user_id,
                 message="⚠️ 응답이 취소되었습니다.",
                 message_type="assistant",
                 status="cancelled",
                 is_cancelled=True,
-                plc_id=None
             )
-            
-            # DB에 이미 저장되었으므로 메모리 저장 불필요
-            
         except HandledException:
             raise  # HandledException은 그대로 전파
         except Exception as e:
@@ -781,7 +999,7 @@ class LLMChatService:
                 logger.warning(f"Redis generation check failed: {e}")
         
         # 레디스에 없거나 실패한 경우 DB에서 확인
-        messages = self.chat_crud.get_messages(chat_id)
+        messages = self.chat_crud.get_messages(chat_id, limit=1)
         # 최근 메시지가 generating 상태인지 확인
         return messages and messages[-1].status == "generating"
     
@@ -820,16 +1038,8 @@ class LLMChatService:
             # DB 삭제 성공 시 Redis 캐시도 삭제
             if success and self.use_redis:
                 try:
-                    # 채팅방 관련 모든 캐시 삭제
-                    self.redis_client.delete_chat_messages(chat_id)
-                    
-                    # 생성 상태 캐시 삭제
-                    generation_key = f"generation:{chat_id}"
-                    self.redis_client.redis_client.delete(generation_key)
-                    
-                    # 취소 상태 캐시 삭제
-                    cancel_key = f"cancel:{chat_id}"
-                    self.redis_client.redis_client.delete(cancel_key)
+                    # 채팅방 메시지/생성 상태/취소 상태/컨텍스트 캐시를 한 번에 삭제
+                    self.redis_client.clear_chat_state(chat_id)
                     
                     logger.debug(f"Cleared all cache for deleted chat {chat_id}")
                 except Exception as e:
@@ -858,33 +1068,56 @@ class LLMChatService:
         """채팅 마지막 메시지 시간 업데이트"""
         self.chat_crud.update_chat_last_message(chat_id)
     
-    async def generate_chat_title(self, message: str) -> str:
-        """질문을 기반으로 채팅 제목을 생성합니다."""
+    async def _schedule_title_generation(
+        self,
+        chat_crud: AsyncChatCRUD,
+        chat,
+        message: str,
+        on_title: Optional[Callable[[dict], None]] = None,
+    ):
+        """
+        첫 메시지이고 자동 생성된 제목(Chat {chat_id})이면 임시 제목을 바로 저장하고
+        LLM 제목 생성은 백그라운드 큐에 예약 (요청 경로에서 LLM을 호출하지 않음)
+        """
+        if not settings.title_generation_background or chat.last_message_at is not None:
+            return
+        placeholder = f"Chat {chat.chat_id}"
+        if chat.chat_title != placeholder:
+            return
+        
+        heuristic = heuristic_chat_title(message)
+        try:
+            await chat_crud.replace_chat_title(chat.chat_id, heuristic, [placeholder])
+        except HandledException as e:
+            logger.warning(f"Failed to set heuristic title for chat {chat.chat_id}: {e}")
+        get_title_generation_queue().enqueue(chat.chat_id, message, [placeholder, heuristic], on_title=on_title)
+    
+    async def generate_chat_title(self, message: str, chat_id: Optional[str] = None) -> Dict:
+        """
+        질문을 기반으로 채팅 제목을 생성합니다.
+        
+        chat_id가 있으면 임시 제목을 바로 반환하고 LLM 제목은 백그라운드에서 생성하여 채팅에 반영
+        (pending=True, 최종 제목은 채팅 목록 조회로 확인), 없으면 LLM 응답을 기다려 반환
+        """
+        if chat_id and settings.title_generation_background:
+            async with self.async_session_factory() as session:
+                chat = await self._create_async_chat_crud(session).get_chat(chat_id)
+            if chat is None:
+                raise HandledException(ResponseCode.CHAT_SESSION_NOT_FOUND, msg="채팅방을 찾을 수 없습니다.")
+            heuristic = heuristic_chat_title(message)
+            job = get_title_generation_queue().enqueue(chat_id, message, [chat.chat_title, heuristic])
+            return {"title": heuristic, "pending": job is not None}
+        
         try:
             # LLM 제공자를 사용하여 제목 생성
             response = await self.llm_provider.create_title_completion(message)
-            
-            title = response.choices[0].message.content.strip()
-            
-            # 제목이 너무 길면 자르기
-            if len(title) > 20:
-                title = title[:17] + "..."
-            
-            # 빈 제목이면 기본값
-            if not title:
-                title = f"Chat {datetime.now().strftime('%H:%M')}"
-            
-            return title
+            return {"title": normalize_generated_title(response.choices[0].message.content, message), "pending": False}
             
         except HandledException:
             raise  # HandledException은 그대로 전파
         except Exception as e:
             # 실패 시 간단한 제목 생성 (HandledException으로 변환하지 않음 - 제목 생성은 선택적 기능)
-            words = message.split()[:3]  # 처음 3개 단어만 사용
-            title = " ".join(words)
-            if len(title) > 15:
-                title = title[:12] + "..."
-            return title if title else f"Chat {datetime.now().strftime('%H:%M')}"
+            return {"title": heuristic_chat_title(message), "pending": False}
     
     def update_chat_title(self, chat_id: str, new_title: str, user_id: str) -> bool:
         """채팅방 이름 변경"""
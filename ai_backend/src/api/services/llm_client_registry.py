@@ -0,0 +1,140 @@
+# _*_ coding: utf-8 _*_
+"""Process-level registry of long-lived LLM HTTP clients."""
+import logging
+import threading
+from typing import Dict, Optional, Tuple
+
+import httpx
+from langserve import RemoteRunnable
+from openai import AsyncOpenAI
+
+logger = logging.getLogger(__name__)
+
+
+class LLMClientRegistry:
+    """
+    워커 프로세스 단위 LLM 클라이언트 레지스트리
+
+    - AsyncOpenAI / RemoteRunnable 클라이언트를 설정별로 1회만 생성하여 재사용
+    - 커넥션 풀과 keep-alive를 공유하므로 요청마다 TLS 핸드셰이크가 발생하지 않음
+    - Provider는 요청마다 생성되더라도 클라이언트는 이 레지스트리에서 가져감
+    """
+
+    def __init__(
+        self,
+        max_connections: int = 100,
+        max_keepalive_connections: int = 20,
+        keepalive_expiry: float = 30.0,
+        timeout: float = 120.0,
+        connect_timeout: float = 10.0,
+    ):
+        self.max_connections = max_connections
+        self.max_keepalive_connections = max_keepalive_connections
+        self.keepalive_expiry = keepalive_expiry
+        self.timeout = timeout
+        self.connect_timeout = connect_timeout
+
+        self._lock = threading.Lock()
+        self._openai_clients: Dict[Tuple, AsyncOpenAI] = {}
+        self._remote_runnables: Dict[Tuple, RemoteRunnable] = {}
+
+    def _limits(self) -> httpx.Limits:
+        """커넥션 풀/keep-alive 설정"""
+        return httpx.Limits(
+            max_connections=self.max_connections,
+            max_keepalive_connections=self.max_keepalive_connections,
+            keepalive_expiry=self.keepalive_expiry,
+        )
+
+    def _create_http_client(self) -> httpx.AsyncClient:
+        """커넥션 풀/keep-alive가 설정된 httpx 클라이언트 생성"""
+        return httpx.AsyncClient(
+            limits=self._limits(),
+            timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+        )
+
+    def get_openai_client(
+        self, api_key: str, base_url: str, default_query: Optional[dict] = None
+    ) -> AsyncOpenAI:
+        """설정별 공유 AsyncOpenAI 클라이언트 반환 (없으면 생성)"""
+        key = (api_key, base_url, tuple(sorted((default_query or {}).items())))
+        client = self._openai_clients.get(key)
+        if client is not None:
+            return client
+
+        with self._lock:
+            client = self._openai_clients.get(key)
+            if client is None:
+                client = AsyncOpenAI(
+                    api_key=api_key,
+                    base_url=base_url,
+                    default_query=default_query,
+                    http_client=self._create_http_client(),
+                )
+                self._openai_clients[key] = client
+                logger.info(f"Shared OpenAI client created: {base_url}")
+        return client
+
+    def get_remote_runnable(self, api_url: str, headers: dict) -> RemoteRunnable:
+        """설정별 공유 RemoteRunnable 반환 (없으면 생성)"""
+        key = (api_url, tuple(sorted(headers.items())))
+        runnable = self._remote_runnables.get(key)
+        if runnable is not None:
+            return runnable
+
+        with self._lock:
+            runnable = self._remote_runnables.get(key)
+            if runnable is None:
+                runnable = RemoteRunnable(
+                    api_url,
+                    headers=headers,
+                    timeout=httpx.Timeout(self.timeout, connect=self.connect_timeout),
+                    # RemoteRunnable 내부 httpx 클라이언트에도 동일한 커넥션 풀 설정 적용
+                    client_kwargs={"limits": self._limits()},
+                )
+                self._remote_runnables[key] = runnable
+                logger.info(f"Shared RemoteRunnable created: {api_url}")
+        return runnable
+
+    async def aclose(self):
+        """모든 공유 클라이언트 종료 (앱 종료 시 1회 호출)"""
+        with self._lock:
+            openai_clients = list(self._openai_clients.values())
+            remote_runnables = list(self._remote_runnables.values())
+            self._openai_clients.clear()
+            self._remote_runnables.clear()
+
+        for client in openai_clients:
+            try:
+                await client.close()
+            except Exception as e:
+                logger.warning(f"OpenAI client close failed: {e}")
+
+        for runnable in remote_runnables:
+            async_client = getattr(runnable, "async_client", None)
+            if async_client is None:
+                continue
+            try:
+                await async_client.aclose()
+            except Exception as e:
+                logger.warning(f"RemoteRunnable client close failed: {e}")
+
+
+# 전역 클라이언트 레지스트리 인스턴스 (워커 프로세스당 1개)
+llm_client_registry = None
+
+
+def get_llm_client_registry() -> LLMClientRegistry:
+    """LLM 클라이언트 레지스트리 싱글톤 반환"""
+    global llm_client_registry
+    if llm_client_registry is None:
+        from src.config import settings
+
+        llm_client_registry = LLMClientRegistry(
+            max_connections=settings.llm_http_max_connections,
+            max_keepalive_connections=settings.llm_http_max_keepalive_connections,
+            keepalive_expiry=settings.llm_http_keepalive_expiry,
+            timeout=settings.llm_http_timeout,
+            connect_timeout=settings.llm_http_connect_timeout,
+        )
+    return llm_client_registry
@@ -1,28 +1,102 @@
 # _*_ coding: utf-8 _*_
 """LLM Provider Factory for supporting multiple LLM providers."""
+import asyncio
 import json
 import logging
 import os
-from typing import Any, AsyncGenerator, Dict, Optional
+import time
+from typing import Any, AsyncGenerator, Dict, FrozenSet, List, Optional, Set
 
 import aiohttp
-from langserve import RemoteRunnable
-from openai import AsyncOpenAI
+from src.api.services.llm_client_registry import get_llm_client_registry
+from src.api.services.llm_resilience import (
+    backoff_delay,
+    get_circuit_breaker,
+    get_llm_call_metrics,
+    hedged_call,
+)
 from src.types.response.exceptions import HandledException
 from src.types.response.response_code import ResponseCode
 
 logger = logging.getLogger(__name__)
 
+# 검토 에이전트 노드 타입 (응답에 포함되면 채팅의 reviewer_count 증가)
+REVIEWER_NODE_TYPE = "agent__reviewer"
+
+
+def _contains_node_type(data: Any, node_type: str) -> bool:
+    """중첩된 dict/list에 node_type이 일치하는 노드가 있는지 확인 (찾는 즉시 종료)"""
+    stack = [data]
+    visited = set()
+    while stack:
+        item = stack.pop()
+        if id(item) in visited:
+            continue
+        visited.add(id(item))
+        if isinstance(item, dict):
+            if item.get('node_type') == node_type:
+                return True
+            stack.extend(item.values())
+        elif isinstance(item, (list, tuple)):
+            stack.extend(item)
+    return False
+
+
+class CompletionContext:
+    """
+    요청별 LLM 호출 컨텍스트 (호출 시점에 전달)
+    
+    node_data/has_reviewer는 스트림 처리 중 제공자가 채우는 요청 단위 수집 결과로,
+    제공자 인스턴스에 상태를 두지 않으므로 하나의 제공자를 여러 요청이 동시에 공유할 수 있음
+    (has_reviewer가 None이면 수집하지 않은 것 - 저장 시 노드 데이터 전체를 검사)
+    has_reviewer는 노드별 검토 노드 포함 여부(reviewer_nodes)로 계산하므로, 같은 노드가 검토 노드 없이
+    다시 수신되면 해제되어 항상 최종 node_data 기준 값을 가짐
+    """
+    
+    def __init__(
+        self,
+        chat_id: Optional[str] = None,
+        user_id: Optional[str] = None,
+        reviewer_count: Optional[int] = None,
+        site_list: Any = None,
+    ):
+        self.chat_id = chat_id
+        self.user_id = user_id
+        self.reviewer_count = reviewer_count
+        self.site_list = site_list
+        self.node_data: Dict[str, dict] = {}
+        self.reviewer_nodes: Set[str] = set()
+        self.has_reviewer: Optional[bool] = None
+
 
 class BaseLLMProvider:
-    """Base class for LLM providers"""
+    """
+    Base class for LLM providers
+    
+    모든 제공자는 create_completion(messages, *, stream, context) 단일 계약을 구현하고,
+    요청 컨텍스트 중 어떤 정보를 사용하는지 capabilities로 선언함
+    (호출 측은 선언된 capability만 보고 필요한 컨텍스트를 준비)
+    """
+    
+    # 채팅 컨텍스트(chat_id, reviewer_count) 사용
+    CAPABILITY_CHAT_CONTEXT = "chat_context"
+    # 사용자 컨텍스트(user_id, site_list) 사용
+    CAPABILITY_USER_CONTEXT = "user_context"
+    # 스트리밍 중 노드 처리 결과 수집 (context.node_data에 기록)
+    CAPABILITY_NODE_DATA = "node_data"
+    
+    capabilities: FrozenSet[str] = frozenset()
     
     def __init__(self, model, max_tokens=1000, temperature=0.7):
         self.model = model
         self.max_tokens = max_tokens
         self.temperature = temperature
     
-    async def create_completion(self, messages, stream=False):
+    def supports(self, capability: str) -> bool:
+        """capability 지원 여부"""
+        return capability in self.capabilities
+    
+    async def create_completion(self, messages, *, stream=False, context: Optional[CompletionContext] = None):
         """Create completion from LLM provider"""
         raise NotImplementedError("Subclasses must implement create_completion")
     
@@ -30,6 +104,18 @@ class BaseLLMProvider:
         """Create title completion from LLM provider"""
         raise NotImplementedError("Subclasses must implement create_title_completion")
     
+    async def create_title_completions(self, messages: List[str]) -> List[Any]:
+        """
+        여러 메시지의 제목을 한 번에 생성 (백그라운드 제목 생성 배치용)
+        
+        기본 구현은 create_title_completion을 동시에 호출하며, 결과 목록에는 실패한 항목의 예외가 그대로 들어감
+        배치 API를 지원하는 제공자는 재정의하여 한 번의 호출로 처리할 수 있음
+        """
+        return await asyncio.gather(
+            *(self.create_title_completion(message) for message in messages),
+            return_exceptions=True,
+        )
+    
     def process_stream_chunk(self, chunk):
         """Process streaming chunk and extract content"""
         raise NotImplementedError("Subclasses must implement process_stream_chunk")
@@ -44,10 +130,11 @@ class OpenAIProvider(BaseLLMProvider):
         if not api_key:
             raise HandledException(ResponseCode.LLM_CONFIG_ERROR, msg="OpenAI API key is required")
         
-        self.client = AsyncOpenAI(api_key=api_key, base_url=base_url)
-        logger.info("OpenAI provider initialized with model: " + str(model))
+        # 프로세스 단위로 공유되는 클라이언트 사용 (커넥션 풀 재사용)
+        self.client = get_llm_client_registry().get_openai_client(api_key, base_url)
+        logger.debug("OpenAI provider initialized with model: " + str(model))
     
-    async def create_completion(self, messages: list, stream: bool = False):
+    async def create_completion(self, messages: list, *, stream: bool = False, context: Optional[CompletionContext] = None):
         """Create completion using OpenAI API"""
         try:
             response = await self.client.chat.completions.create(
@@ -106,14 +193,15 @@ class AzureOpenAIProvider(BaseLLMProvider):
         if not deployment_name:
             raise HandledException(ResponseCode.LLM_CONFIG_ERROR, msg="Azure OpenAI deployment name is required")
         
-        self.client = AsyncOpenAI(
-            api_key=api_key,
-            base_url=endpoint.rstrip('/') + "/openai/deployments/" + deployment_name,
-            default_query={"api-version": api_version}
+        # 프로세스 단위로 공유되는 클라이언트 사용 (커넥션 풀 재사용)
+        self.client = get_llm_client_registry().get_openai_client(
+            api_key,
+            endpoint.rstrip('/') + "/openai/deployments/" + deployment_name,
+            default_query={"api-version": api_version},
         )
-        logger.info("Azure OpenAI provider initialized with deployment: " + str(deployment_name))
+        logger.debug("Azure OpenAI provider initialized with deployment: " + str(deployment_name))
     
-    async def create_completion(self, messages: list, stream: bool = False):
+    async def create_completion(self, messages: list, *, stream: bool = False, context: Optional[CompletionContext] = None):
         """Create completion using Azure OpenAI API"""
         try:
             response = await self.client.chat.completions.create(
@@ -160,10 +248,25 @@ class AzureOpenAIProvider(BaseLLMProvider):
 
 
 class ExternalAPIProvider(BaseLLMProvider):
-    """External API Agent provider implementation using LangServe RemoteRunnable"""
+    """
+    External API Agent provider implementation using LangServe RemoteRunnable
+    
+    - 첫 청크 / 전체 응답 데드라인 적용
+    - 첫 청크를 받기 전 실패는 지수 백오프 + jitter로 재시도 (이후에는 중복 응답 방지를 위해 재시도 안 함)
+    - 연속 실패 시 회로 차단기로 즉시 실패
+    - 호출 결과는 LLMCallMetrics에 기록
+    """
+    
+    UPSTREAM = "external_api"
+    
+    capabilities = frozenset({
+        BaseLLMProvider.CAPABILITY_CHAT_CONTEXT,
+        BaseLLMProvider.CAPABILITY_USER_CONTEXT,
+        BaseLLMProvider.CAPABILITY_NODE_DATA,
+    })
     
     def __init__(self, api_url: str, authorization_header: str, 
-                 max_tokens: int = 1000, temperature: float = 0.7, chat_crud=None, user_crud=None):
+                 max_tokens: int = 1000, temperature: float = 0.7):
         super().__init__("external_api", max_tokens, temperature)
         
         if not api_url:
@@ -173,24 +276,40 @@ class ExternalAPIProvider(BaseLLMProvider):
         
         self.api_url = api_url.rstrip('/')
         self.authorization_header = authorization_header
-        self.node_data = {}  # 노드 데이터를 메모리에 수집
-        self.chat_crud = chat_crud  # DB 접근을 위한 ChatCRUD 인스턴스
-        self.user_crud = user_crud  # DB 접근을 위한 UserCRUD 인스턴스
         
-        # LangServe RemoteRunnable 초기화
+        # LangServe RemoteRunnable (프로세스 단위로 공유, 커넥션 풀 재사용)
         headers = {
             "Authorization": self.authorization_header,
         }
         
-        self.agent = RemoteRunnable(
-            self.api_url,
-            headers=headers
-        )
+        self.agent = get_llm_client_registry().get_remote_runnable(self.api_url, headers)
+        
+        # 호출 데드라인/재시도/회로 차단 설정 (연결 타임아웃은 공유 HTTP 클라이언트 설정 사용)
+        from src.config.simple_settings import settings
+        self.first_token_timeout = settings.external_api_first_token_timeout
+        self.overall_timeout = settings.external_api_overall_timeout
+        self.max_retries = settings.external_api_max_retries
+        self.retry_base_delay = settings.external_api_retry_base_delay
+        self.retry_max_delay = settings.external_api_retry_max_delay
+        self.title_hedge_delay = settings.title_hedge_delay_seconds
+        self.breaker = get_circuit_breaker(self.UPSTREAM)
+        self.metrics = get_llm_call_metrics()
         
-        logger.info("External API provider initialized with URL: " + str(self.api_url))
+        logger.debug("External API provider initialized with URL: " + str(self.api_url))
     
-    async def create_completion(self, messages: list, stream: bool = False, chat_id: str = None, user_id: str = None):
-        """Create completion using External API via LangServe RemoteRunnable"""
+    async def create_completion(
+        self,
+        messages: list,
+        *,
+        stream: bool = False,
+        context: Optional[CompletionContext] = None,
+    ):
+        """
+        Create completion using External API via LangServe RemoteRunnable
+        
+        요청별 컨텍스트(reviewer_count, site_list)는 호출 시점에 context로 전달받고,
+        스트리밍 중 수집한 노드 데이터는 같은 context.node_data에 기록함
+        """
         try:
             # OpenAI 형식의 messages를 LangServe 형식으로 변환
             langserve_messages = []
@@ -220,24 +339,11 @@ class ExternalAPIProvider(BaseLLMProvider):
                 "auth_level": "admin"  # 기본 auth_level
             }
             
-            if chat_id and self.chat_crud:
-                try:
-                    reviewer_count = self.chat_crud.get_reviewer_count(chat_id)
-                    additional_kwargs["reviewer_count"] = reviewer_count
-                    logger.debug(f"Added reviewer_count to additional_kwargs: {reviewer_count}")
-                except Exception as e:
-                    logger.warning(f"Failed to get reviewer_count for chat {chat_id}: {e}")
-                    additional_kwargs["reviewer_count"] = 0  # 기본값
+            if context and context.chat_id:
+                additional_kwargs["reviewer_count"] = context.reviewer_count or 0
             
-            # user_id로 user 정보 조회하여 site_list 추가
-            if user_id and self.user_crud:
-                try:
-                    user = self.user_crud.get_user(user_id)
-                    if user and user.site_list:
-                        additional_kwargs["site_list"] = user.site_list
-                        logger.debug(f"Added site_list to additional_kwargs for user {user_id}: {user.site_list}")
-                except Exception as e:
-                    logger.warning(f"Failed to get site_list for user {user_id}: {e}")
+            if context and context.site_list:
+                additional_kwargs["site_list"] = context.site_list
             
             request_body = {
                 "messages": langserve_messages,
@@ -246,7 +352,7 @@ class ExternalAPIProvider(BaseLLMProvider):
             
             if stream:
                 # 스트리밍의 경우 async generator를 직접 반환
-                return self._create_streaming_completion(request_body)
+                return self._create_streaming_completion(request_body, context or CompletionContext())
             else:
                 return await self._create_non_streaming_completion(request_body)
                 
@@ -254,25 +360,104 @@ class ExternalAPIProvider(BaseLLMProvider):
             logger.error("External API error: " + str(e))
             raise HandledException(ResponseCode.CHAT_AI_RESPONSE_ERROR, e=e)
     
-    async def _create_streaming_completion(self, request_body: dict):
-        """Create streaming completion using LangServe RemoteRunnable"""
+    async def _open_stream(self, request_body: dict, deadline: float):
+        """
+        업스트림 스트림을 열고 첫 청크까지 수신 - 첫 청크 전 실패는 재시도
+        
+        Returns:
+            (iterator, first_chunk) - 응답이 비어 있으면 first_chunk는 None
+        """
+        started = time.monotonic()
+        attempt = 0
+        while True:
+            self.metrics.incr(self.UPSTREAM, "calls")
+            iterator = self.agent.astream(request_body).__aiter__()
+            remaining = deadline - time.monotonic()
+            try:
+                first_chunk = await asyncio.wait_for(
+                    iterator.__anext__(), timeout=max(0.0, min(self.first_token_timeout, remaining))
+                )
+                self.metrics.observe_first_token(self.UPSTREAM, time.monotonic() - started)
+                return iterator, first_chunk
+            except StopAsyncIteration:
+                return iterator, None
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    self.metrics.incr(self.UPSTREAM, "first_token_timeouts")
+                    error = HandledException(ResponseCode.EXTERNAL_SERVICE_TIMEOUT, e=e)
+                else:
+                    error = e
+                await self._close_iterator(iterator)
+                
+                attempt += 1
+                delay = backoff_delay(attempt, self.retry_base_delay, self.retry_max_delay)
+                if attempt > self.max_retries or time.monotonic() + delay >= deadline:
+                    raise error
+                self.metrics.incr(self.UPSTREAM, "retries")
+                logger.warning(f"External API stream failed before first chunk (attempt {attempt}), retrying in {delay:.2f}s: {e}")
+                await asyncio.sleep(delay)
+    
+    @staticmethod
+    async def _close_iterator(iterator):
+        aclose = getattr(iterator, "aclose", None)
+        if aclose is not None:
+            try:
+                await aclose()
+            except Exception:
+                pass
+    
+    async def _create_streaming_completion(self, request_body: dict, context: CompletionContext):
+        """Create streaming completion using LangServe RemoteRunnable (데드라인/재시도/회로 차단 적용)"""
+        is_probe = self.breaker.before_call()
+        deadline = time.monotonic() + self.overall_timeout
+        iterator = None
+        context.reviewer_nodes.clear()
+        context.has_reviewer = False
         try:
             # LangServe RemoteRunnable의 stream 메서드 사용
-            async for chunk in self.agent.astream(request_body):
+            iterator, chunk = await self._open_stream(request_body, deadline)
+            while chunk is not None:
                 logger.debug(f"Received chunk: {chunk}")
                 
                 # LangServe 스타일의 청크 처리
-                content = self._extract_content_from_chunk(chunk)
+                content = self._extract_content_from_chunk(chunk, context)
                 if content is not None:
                     yield self._create_chunk_object({'content': content})
-                    
+                
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise asyncio.TimeoutError()
+                try:
+                    chunk = await asyncio.wait_for(iterator.__anext__(), timeout=remaining)
+                except StopAsyncIteration:
+                    chunk = None
+            
+            self.breaker.record_success()
+            self.metrics.incr(self.UPSTREAM, "successes")
+        except asyncio.TimeoutError as e:
+            self.breaker.record_failure()
+            self.metrics.incr(self.UPSTREAM, "overall_timeouts")
+            self.metrics.incr(self.UPSTREAM, "failures")
+            logger.error(f"LangServe streaming exceeded {self.overall_timeout}s deadline")
+            raise HandledException(ResponseCode.EXTERNAL_SERVICE_TIMEOUT, e=e)
+        except HandledException:
+            self.breaker.record_failure()
+            self.metrics.incr(self.UPSTREAM, "failures")
+            raise
         except Exception as e:
+            self.breaker.record_failure()
+            self.metrics.incr(self.UPSTREAM, "failures")
             logger.error(f"LangServe streaming error: {e}")
             raise HandledException(ResponseCode.CHAT_AI_RESPONSE_ERROR, e=e)
+        finally:
+            # 취소(CancelledError/GeneratorExit)로 끝난 시험 호출은 상태 변경 없이 반납
+            self.breaker.release_probe(is_probe)
+            if iterator is not None:
+                await self._close_iterator(iterator)
     
     
-    def _extract_content_from_chunk(self, chunk_data: dict):
-        """청크 데이터에서 스트리밍할 컨텐츠 추출"""
+    def _extract_content_from_chunk(self, chunk_data: dict, context: CompletionContext):
+        """청크 데이터에서 스트리밍할 컨텐츠 추출 (노드 업데이트는 context에 수집)"""
         # LangServe 스타일의 청크 처리
         if chunk_data.get("final_result"):
             return chunk_data["final_result"]
@@ -283,7 +468,7 @@ class ExternalAPIProvider(BaseLLMProvider):
         elif chunk_data.get("updates"):
             # 노드 업데이트는 스트리밍하지 않지만 데이터 저장
             logger.debug(f"Node updates: {chunk_data}")
-            self._store_node_data(chunk_data)
+            self._store_node_data(chunk_data, context)
             return None
         elif chunk_data.get("progress"):
             # 진행상황은 스트리밍하지 않음
@@ -298,8 +483,9 @@ class ExternalAPIProvider(BaseLLMProvider):
         return None
     
     
-    def _store_node_data(self, chunk_data: dict):
-        """노드 결과 데이터를 메모리에 수집 (LangServe 스타일)"""
+    @staticmethod
+    def _store_node_data(chunk_data: dict, context: CompletionContext):
+        """노드 결과 데이터를 요청별 context에 저장 (LangServe 스타일) - 검토 노드 여부도 수신 시점에 확인"""
         # 노드 기본 정보 추출
         node_name = chunk_data.get('node_name', 'unknown')
         node_type = chunk_data.get('node_type', 'unknown')
@@ -317,28 +503,55 @@ class ExternalAPIProvider(BaseLLMProvider):
             if key not in ['node_name', 'node_type', 'updates']:
                 node_data[key] = value
         
-        # 노드 데이터를 메모리에 저장
-        self.node_data[node_name] = node_data
+        # 노드 데이터를 요청별 context에 저장 (덮어쓴 노드의 검토 노드 여부도 함께 갱신)
+        context.node_data[node_name] = node_data
+        if _contains_node_type(node_data, REVIEWER_NODE_TYPE):
+            context.reviewer_nodes.add(node_name)
+        else:
+            context.reviewer_nodes.discard(node_name)
+        context.has_reviewer = bool(context.reviewer_nodes)
         logger.debug(f"Node '{node_name}' ({node_type}) data collected: {node_data}")
     
-    def get_collected_node_data(self):
-        """수집된 노드 데이터 반환"""
-        return self.node_data.copy()
-    
-    def clear_node_data(self):
-        """노드 데이터 초기화"""
-        self.node_data.clear()
-    
     
     async def _create_non_streaming_completion(self, request_body: dict):
-        """Create non-streaming completion using LangServe RemoteRunnable"""
+        """Create non-streaming completion using LangServe RemoteRunnable (응답 전체가 한 번에 오므로 실패 시 재시도)"""
+        is_probe = self.breaker.before_call()
         try:
-            # LangServe RemoteRunnable의 invoke 메서드 사용
-            response_data = await self.agent.ainvoke(request_body)
-            return self._create_completion_object(response_data)
-        except Exception as e:
-            logger.error(f"LangServe non-streaming error: {e}")
-            raise HandledException(ResponseCode.CHAT_AI_RESPONSE_ERROR, e=e)
+            return await self._invoke_with_retry(request_body)
+        finally:
+            self.breaker.release_probe(is_probe)
+
+    async def _invoke_with_retry(self, request_body: dict):
+        """non-streaming 호출 재시도 루프 (회로 차단기 성공/실패 기록)"""
+        deadline = time.monotonic() + self.overall_timeout
+        attempt = 0
+        while True:
+            self.metrics.incr(self.UPSTREAM, "calls")
+            try:
+                # LangServe RemoteRunnable의 invoke 메서드 사용
+                response_data = await asyncio.wait_for(
+                    self.agent.ainvoke(request_body), timeout=max(0.0, deadline - time.monotonic())
+                )
+                self.breaker.record_success()
+                self.metrics.incr(self.UPSTREAM, "successes")
+                return self._create_completion_object(response_data)
+            except Exception as e:
+                if isinstance(e, asyncio.TimeoutError):
+                    self.metrics.incr(self.UPSTREAM, "overall_timeouts")
+                    error = HandledException(ResponseCode.EXTERNAL_SERVICE_TIMEOUT, e=e)
+                else:
+                    error = HandledException(ResponseCode.CHAT_AI_RESPONSE_ERROR, e=e)
+                
+                attempt += 1
+                delay = backoff_delay(attempt, self.retry_base_delay, self.retry_max_delay)
+                if attempt > self.max_retries or time.monotonic() + delay >= deadline:
+                    self.breaker.record_failure()
+                    self.metrics.incr(self.UPSTREAM, "failures")
+                    logger.error(f"LangServe non-streaming error: {e}")
+                    raise error
+                self.metrics.incr(self.UPSTREAM, "retries")
+                logger.warning(f"LangServe non-streaming failed (attempt {attempt}), retrying in {delay:.2f}s: {e}")
+                await asyncio.sleep(delay)
     
     def _create_chunk_object(self, chunk_data: dict):
         """External API 응답을 OpenAI 스타일 청크 객체로 변환"""
@@ -367,7 +580,7 @@ class ExternalAPIProvider(BaseLLMProvider):
     async def create_title_completion(self, message: str):
         """Create title completion using OpenAIProvider (External API는 타이틀만 OpenAI 사용)"""
         try:
-            # OpenAIProvider를 직접 생성해서 타이틀 생성 (설정에서 값 가져오기)
+            # OpenAIProvider를 생성해서 타이틀 생성 (클라이언트는 레지스트리에서 공유)
             from src.config.simple_settings import settings
             
             openai_provider = OpenAIProvider(
@@ -376,8 +589,12 @@ class ExternalAPIProvider(BaseLLMProvider):
                 model=settings.openai_model,
             )
             
-            # OpenAIProvider의 create_title_completion 사용
-            return await openai_provider.create_title_completion(message)
+            # OpenAIProvider의 create_title_completion 사용 (지연 시 헤지 요청 1회 추가)
+            return await hedged_call(
+                "title",
+                lambda: openai_provider.create_title_completion(message),
+                self.title_hedge_delay,
+            )
             
         except Exception as e:
             logger.error("External API title generation error: " + str(e))
@@ -395,8 +612,27 @@ class ExternalAPIProvider(BaseLLMProvider):
 class LLMProviderFactory:
     """Factory class for creating LLM providers"""
     
+    # 프로세스 단위 공유 제공자 (제공자는 요청 상태를 갖지 않음)
+    _shared_providers: Dict[str, BaseLLMProvider] = {}
+    
+    @staticmethod
+    def get_shared_provider(provider_type: str = None) -> BaseLLMProvider:
+        """
+        프로세스 단위로 공유하는 LLM 제공자 반환 (없으면 생성)
+        
+        요청별 상태는 CompletionContext로 전달되므로 동시 요청 간 데이터가 섞이지 않음
+        """
+        if not provider_type:
+            provider_type = os.getenv("LLM_PROVIDER", "openai").lower()
+        
+        provider = LLMProviderFactory._shared_providers.get(provider_type)
+        if provider is None:
+            provider = LLMProviderFactory.create_provider(provider_type)
+            LLMProviderFactory._shared_providers[provider_type] = provider
+        return provider
+    
     @staticmethod
-    def create_provider(provider_type: str = None, chat_crud=None, user_crud=None) -> BaseLLMProvider:
+    def create_provider(provider_type: str = None) -> BaseLLMProvider:
         """Create LLM provider based on configuration"""
         
         # 환경 변수에서 제공자 타입 가져오기
@@ -410,7 +646,7 @@ class LLMProviderFactory:
         elif provider_type == "azure_openai":
             return LLMProviderFactory._create_azure_openai_provider()
         elif provider_type == "external_api":
-            return LLMProviderFactory._create_external_api_provider(chat_crud, user_crud)
+            return LLMProviderFactory._create_external_api_provider()
         else:
             raise HandledException(
                 ResponseCode.LLM_CONFIG_ERROR, 
@@ -454,7 +690,7 @@ class LLMProviderFactory:
         )
     
     @staticmethod
-    def _create_external_api_provider(chat_crud=None, user_crud=None) -> ExternalAPIProvider:
+    def _create_external_api_provider() -> ExternalAPIProvider:
         """Create External API provider"""
         api_url = os.getenv("EXTERNAL_API_URL")
         authorization_header = os.getenv("EXTERNAL_API_AUTHORIZATION")
@@ -465,7 +701,5 @@ class LLMProviderFactory:
             api_url=api_url,
             authorization_header=authorization_header,
             max_tokens=max_tokens,
-            temperature=temperature,
-            chat_crud=chat_crud,
-            user_crud=user_crud
+            temperature=temperature
         )
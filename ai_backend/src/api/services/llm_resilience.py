@@ -0,0 +1,203 @@
+# _*_ coding: utf-8 _*_
+"""Deadlines, retry, hedging and circuit breaking for upstream LLM calls."""
+import asyncio
+import logging
+import random
+import threading
+import time
+from typing import Awaitable, Callable, Dict
+
+from src.types.response.exceptions import HandledException
+from src.types.response.response_code import ResponseCode
+
+logger = logging.getLogger(__name__)
+
+
+class LLMCallMetrics:
+    """
+    업스트림 LLM 호출 지표 (워커 프로세스 단위 카운터)
+
+    - calls / successes / failures: 호출 결과
+    - retries: 첫 토큰 전 재시도 횟수
+    - first_token_timeouts / overall_timeouts: 데드라인 초과
+    - breaker_rejections: 회로 차단으로 즉시 실패한 호출
+    - hedges_fired / hedge_wins: 헤지 요청 발송 / 헤지 요청이 먼저 응답
+    - first_token_seconds_*: 첫 청크까지 걸린 시간 합계/개수
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[str, Dict[str, float]] = {}
+
+    def incr(self, upstream: str, name: str, value: float = 1):
+        with self._lock:
+            counters = self._counters.setdefault(upstream, {})
+            counters[name] = counters.get(name, 0) + value
+
+    def observe_first_token(self, upstream: str, seconds: float):
+        self.incr(upstream, "first_token_seconds_sum", seconds)
+        self.incr(upstream, "first_token_seconds_count")
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        with self._lock:
+            return {upstream: dict(counters) for upstream, counters in self._counters.items()}
+
+
+class CircuitBreaker:
+    """
+    업스트림 회로 차단기
+
+    - closed: 정상 호출, 연속 실패가 failure_threshold에 도달하면 open
+    - open: reset_timeout 동안 호출 없이 즉시 실패
+    - half_open: reset_timeout 경과 후 1건만 시험 호출, 성공하면 closed / 실패하면 다시 open
+    - 시험 호출이 취소되면(사용자 취소, 연결 종료) 상태 변경 없이 release_probe()로 반납하며,
+      반납되지 않은 시험 호출도 reset_timeout이 지나면 만료되어 다음 호출이 시험 호출이 됨
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, name: str, failure_threshold: int = 5, reset_timeout: float = 30.0):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+        self._probe_started_at = 0.0
+
+    def before_call(self) -> bool:
+        """
+        호출 가능 여부 확인 - 차단 중이면 EXTERNAL_SERVICE_UNAVAILABLE
+
+        Returns:
+            bool: 이 호출이 half_open 시험 호출이면 True (종료 시 release_probe에 전달)
+        """
+        if self.state == self.OPEN:
+            if time.monotonic() - self._opened_at < self.reset_timeout:
+                get_llm_call_metrics().incr(self.name, "breaker_rejections")
+                raise HandledException(
+                    ResponseCode.EXTERNAL_SERVICE_UNAVAILABLE,
+                    msg="AI 서비스가 일시적으로 응답하지 않습니다. 잠시 후 다시 시도해주세요.",
+                )
+            self.state = self.HALF_OPEN
+            self._probe_in_flight = False
+
+        if self.state == self.HALF_OPEN:
+            if self._probe_in_flight and time.monotonic() - self._probe_started_at >= self.reset_timeout:
+                logger.warning(f"Circuit breaker probe expired: {self.name}")
+                self._probe_in_flight = False
+            if self._probe_in_flight:
+                get_llm_call_metrics().incr(self.name, "breaker_rejections")
+                raise HandledException(
+                    ResponseCode.EXTERNAL_SERVICE_UNAVAILABLE,
+                    msg="AI 서비스 상태를 확인하고 있습니다. 잠시 후 다시 시도해주세요.",
+                )
+            self._probe_in_flight = True
+            self._probe_started_at = time.monotonic()
+            return True
+        return False
+
+    def release_probe(self, is_probe: bool):
+        """
+        시험 호출 반납 (호출 종료 시 항상 호출)
+
+        성공/실패가 기록되지 않고 끝난 시험 호출(취소 등)은 상태를 바꾸지 않고 다음 호출이 다시 시험하도록 함
+        """
+        if is_probe and self.state == self.HALF_OPEN:
+            self._probe_in_flight = False
+
+    def record_success(self):
+        if self.state != self.CLOSED:
+            logger.info(f"Circuit breaker closed: {self.name}")
+        self.state = self.CLOSED
+        self._failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self):
+        self._failures += 1
+        self._probe_in_flight = False
+        if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+            if self.state != self.OPEN:
+                logger.warning(f"Circuit breaker opened: {self.name} (failures={self._failures})")
+            self.state = self.OPEN
+            self._opened_at = time.monotonic()
+
+
+def backoff_delay(attempt: int, base_delay: float, max_delay: float) -> float:
+    """지수 백오프 + full jitter (attempt는 1부터)"""
+    return random.uniform(0, min(max_delay, base_delay * (2 ** (attempt - 1))))
+
+
+async def hedged_call(
+    upstream: str,
+    call: Callable[[], Awaitable],
+    hedge_delay: float,
+):
+    """
+    헤지 요청 - 첫 요청이 hedge_delay 안에 끝나지 않으면 같은 요청을 한 번 더 보내고 먼저 끝난 결과 사용
+
+    hedge_delay가 0 이하이면 단일 호출
+    """
+    if hedge_delay <= 0:
+        return await call()
+
+    metrics = get_llm_call_metrics()
+    primary = asyncio.ensure_future(call())
+    done, _ = await asyncio.wait({primary}, timeout=hedge_delay)
+    if done:
+        return primary.result()
+
+    metrics.incr(upstream, "hedges_fired")
+    hedge = asyncio.ensure_future(call())
+    pending = {primary, hedge}
+    error = None
+    try:
+        while pending:
+            done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+            for task in done:
+                if task.exception() is None:
+                    if task is hedge:
+                        metrics.incr(upstream, "hedge_wins")
+                    return task.result()
+                error = task.exception()
+        raise error
+    finally:
+        for task in pending:
+            task.cancel()
+
+
+# 전역 지표/회로 차단기 인스턴스 (워커 프로세스당 1개)
+llm_call_metrics = None
+_circuit_breakers: Dict[str, CircuitBreaker] = {}
+
+
+def get_llm_call_metrics() -> LLMCallMetrics:
+    """LLM 호출 지표 싱글톤 반환"""
+    global llm_call_metrics
+    if llm_call_metrics is None:
+        llm_call_metrics = LLMCallMetrics()
+    return llm_call_metrics
+
+
+def get_circuit_breaker(name: str) -> CircuitBreaker:
+    """업스트림별 회로 차단기 반환 (없으면 생성)"""
+    breaker = _circuit_breakers.get(name)
+    if breaker is None:
+        from src.config import settings
+
+        breaker = CircuitBreaker(
+            name,
+            failure_threshold=settings.llm_breaker_failure_threshold,
+            reset_timeout=settings.llm_breaker_reset_seconds,
+        )
+        _circuit_breakers[name] = breaker
+    return breaker
+
+
+def get_circuit_breaker_states() -> Dict[str, str]:
+    """업스트림별 회로 차단기 상태"""
+    return {name: breaker.state for name, breaker in _circuit_breakers.items()}
@@ -0,0 +1,233 @@
+# _*_ coding: utf-8 _*_
+"""Opt-in semantic response cache for repeated PLC questions."""
+import base64
+import hashlib
+import json
+import logging
+import math
+import operator
+import re
+import time
+import unicodedata
+from array import array
+from typing import Dict, List, Optional
+
+from src.api.services.llm_client_registry import get_llm_client_registry
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_TRAILING_PUNCT_RE = re.compile(r"[\s?？!！.。,~]+$")
+
+
+class SemanticCacheHit:
+    """캐시 조회 결과"""
+
+    def __init__(self, answer: str, node_data: Optional[dict], similarity: float, exact: bool):
+        self.answer = answer
+        self.node_data = node_data
+        self.similarity = similarity
+        self.exact = exact
+
+
+class SemanticResponseCache:
+    """
+    PLC 질문 의미 기반 응답 캐시 (Redis)
+
+    - 키 공간: PLC UUID + 현재 Program 매핑(program_id, mapping_dt) + 요청 범위(site_list, reviewer 수) digest
+      → PLC의 Program 매핑이 바뀌면 다른 키 공간을 사용하므로 이전 응답은 자동으로 무효화되고 TTL로 정리됨
+      → 사이트/리뷰어 범위가 다른 사용자·채팅은 서로의 응답을 받지 않음
+    - 조회 순서: 정규화된 질문 해시 일치(임베딩 호출 없음) → 임베딩 코사인 유사도가 임계값 이상인 항목
+    - 임베딩은 정규화(단위 벡터) 후 float32로 저장하여 유사도는 내적으로 계산
+    - hit/miss 카운터는 워커 로컬 값과 Redis 누적 값(semantic_cache:stats)을 함께 기록
+    """
+
+    STATS_KEY = "semantic_cache:stats"
+
+    def __init__(
+        self,
+        async_redis_client,
+        embedding_model: str,
+        embedding_dimensions: int,
+        api_key: str,
+        base_url: str,
+        threshold: float = 0.92,
+        ttl_seconds: int = 86400,
+        max_entries: int = 200,
+    ):
+        self.redis = async_redis_client.redis_client
+        self.embedding_model = embedding_model
+        self.embedding_dimensions = embedding_dimensions
+        self.api_key = api_key
+        self.base_url = base_url
+        self.threshold = threshold
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+
+        self.stats: Dict[str, int] = {"hit_exact": 0, "hit_semantic": 0, "miss": 0, "store": 0, "error": 0}
+
+    @staticmethod
+    def normalize_question(question: str) -> str:
+        """질문 정규화 (유니코드 NFKC, 소문자, 공백 정리, 끝 문장부호 제거)"""
+        text = unicodedata.normalize("NFKC", question or "").lower()
+        text = _WHITESPACE_RE.sub(" ", text).strip()
+        return _TRAILING_PUNCT_RE.sub("", text)
+
+    @staticmethod
+    def scope_digest(site_list=None, reviewer_count: Optional[int] = None) -> str:
+        """응답에 영향을 주는 요청 범위(site_list, reviewer 수)를 키 공간 구분용 digest로 변환"""
+        scope = json.dumps(
+            {"site_list": site_list, "reviewer_count": reviewer_count},
+            sort_keys=True,
+            ensure_ascii=False,
+            default=str,
+        )
+        return hashlib.sha256(scope.encode("utf-8")).hexdigest()[:16]
+
+    @staticmethod
+    def _namespace(plc_uuid: str, mapping_version: str, scope: str) -> str:
+        return f"semantic_cache:{plc_uuid}:{mapping_version}:{scope}"
+
+    @staticmethod
+    def _encode_vector(vector: List[float]) -> str:
+        return base64.b64encode(array("f", vector).tobytes()).decode("ascii")
+
+    @staticmethod
+    def _decode_vector(data: str) -> array:
+        vector = array("f")
+        vector.frombytes(base64.b64decode(data))
+        return vector
+
+    async def _embed(self, text: str) -> List[float]:
+        """질문 임베딩 (단위 벡터로 정규화)"""
+        client = get_llm_client_registry().get_openai_client(self.api_key, self.base_url)
+        kwargs = {"model": self.embedding_model, "input": text}
+        if self.embedding_dimensions:
+            kwargs["dimensions"] = self.embedding_dimensions
+        response = await client.embeddings.create(**kwargs)
+        vector = response.data[0].embedding
+        norm = math.sqrt(sum(v * v for v in vector)) or 1.0
+        return [v / norm for v in vector]
+
+    async def _count(self, name: str):
+        self.stats[name] += 1
+        try:
+            await self.redis.hincrby(self.STATS_KEY, name, 1)
+        except Exception:
+            pass
+
+    async def lookup(
+        self, plc_uuid: str, mapping_version: str, scope: str, question: str
+    ) -> Optional[SemanticCacheHit]:
+        """캐시 조회 - 실패해도 None을 반환하여 LLM 호출로 진행"""
+        normalized = self.normalize_question(question)
+        if not normalized:
+            return None
+
+        namespace = self._namespace(plc_uuid, mapping_version, scope)
+        field = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+        try:
+            # 1) 정규화된 질문이 같은 항목 (임베딩 호출 없음)
+            payload = await self.redis.hget(f"{namespace}:ans", field)
+            if payload:
+                await self._count("hit_exact")
+                data = json.loads(payload)
+                return SemanticCacheHit(data["answer"], data.get("node_data"), 1.0, exact=True)
+
+            # 2) 임베딩 유사도 검색
+            vectors = await self.redis.hgetall(f"{namespace}:vec")
+            if not vectors:
+                await self._count("miss")
+                return None
+
+            query = await self._embed(normalized)
+            best_field, best_score = None, -1.0
+            for candidate_field, encoded in vectors.items():
+                score = sum(map(operator.mul, query, self._decode_vector(encoded)))
+                if score > best_score:
+                    best_field, best_score = candidate_field, score
+
+            if best_field is not None and best_score >= self.threshold:
+                payload = await self.redis.hget(f"{namespace}:ans", best_field)
+                if payload:
+                    await self._count("hit_semantic")
+                    data = json.loads(payload)
+                    logger.info(f"Semantic cache hit for PLC {plc_uuid} (similarity={best_score:.3f})")
+                    return SemanticCacheHit(data["answer"], data.get("node_data"), best_score, exact=False)
+
+            await self._count("miss")
+            return None
+        except Exception as e:
+            await self._count("error")
+            logger.warning(f"Semantic cache lookup failed for PLC {plc_uuid}: {e}")
+            return None
+
+    async def store(
+        self,
+        plc_uuid: str,
+        mapping_version: str,
+        scope: str,
+        question: str,
+        answer: str,
+        node_data: Optional[dict] = None,
+    ):
+        """응답 저장 - 키 공간이 가득 차면 저장하지 않음 (TTL 만료 후 다시 채워짐)"""
+        normalized = self.normalize_question(question)
+        if not normalized or not answer:
+            return
+
+        namespace = self._namespace(plc_uuid, mapping_version, scope)
+        field = hashlib.sha256(normalized.encode("utf-8")).hexdigest()
+        try:
+            if await self.redis.hlen(f"{namespace}:ans") >= self.max_entries:
+                return
+
+            vector = await self._embed(normalized)
+            payload = json.dumps(
+                {"question": normalized, "answer": answer, "node_data": node_data, "created_at": time.time()},
+                ensure_ascii=False,
+                default=str,
+            )
+            pipe = self.redis.pipeline(transaction=True)
+            pipe.hset(f"{namespace}:ans", field, payload)
+            pipe.hset(f"{namespace}:vec", field, self._encode_vector(vector))
+            pipe.expire(f"{namespace}:ans", self.ttl_seconds)
+            pipe.expire(f"{namespace}:vec", self.ttl_seconds)
+            await pipe.execute()
+            await self._count("store")
+        except Exception as e:
+            await self._count("error")
+            logger.warning(f"Semantic cache store failed for PLC {plc_uuid}: {e}")
+
+    async def get_stats(self) -> Dict[str, Dict[str, int]]:
+        """hit/miss 통계 (워커 로컬 + Redis 누적)"""
+        try:
+            total = {k: int(v) for k, v in (await self.redis.hgetall(self.STATS_KEY)).items()}
+        except Exception:
+            total = {}
+        return {"worker": dict(self.stats), "total": total}
+
+
+# 전역 시맨틱 캐시 인스턴스 (워커 프로세스당 1개)
+semantic_response_cache = None
+
+
+def get_semantic_response_cache(async_redis_client) -> Optional[SemanticResponseCache]:
+    """시맨틱 응답 캐시 싱글톤 반환 (비활성화 또는 Redis 미사용 시 None)"""
+    global semantic_response_cache
+    from src.config import settings
+
+    if not settings.semantic_cache_enabled or async_redis_client is None:
+        return None
+    if semantic_response_cache is None:
+        semantic_response_cache = SemanticResponseCache(
+            async_redis_client,
+            embedding_model=settings.semantic_cache_embedding_model,
+            embedding_dimensions=settings.semantic_cache_embedding_dimensions,
+            api_key=settings.openai_api_key,
+            base_url=settings.openai_base_url,
+            threshold=settings.semantic_cache_threshold,
+            ttl_seconds=settings.semantic_cache_ttl_seconds,
+            max_entries=settings.semantic_cache_max_entries,
+        )
+    return semantic_response_cache
@@ -0,0 +1,97 @@
+# _*_ coding: utf-8 _*_
+"""SSE frame encoding and AI response chunk coalescing."""
+import json
+import logging
+import time
+from typing import List, Optional
+
+try:
+    import orjson
+except ImportError:  # orjson 미설치 시 표준 json 사용
+    orjson = None
+
+logger = logging.getLogger(__name__)
+
+
+def dumps_event(event: dict) -> str:
+    """이벤트를 JSON 문자열로 직렬화 (orjson 사용 가능 시 orjson)"""
+    if orjson is not None:
+        return orjson.dumps(event).decode("utf-8")
+    return json.dumps(event, ensure_ascii=False)
+
+
+def encode_sse_event(event: dict, event_id: Optional[str] = None) -> bytes:
+    """이벤트를 SSE 프레임으로 인코딩 (event_id가 있으면 id 필드 포함 - Last-Event-ID 재연결용)"""
+    prefix = f"id: {event_id}\n".encode("utf-8") if event_id else b""
+    if orjson is not None:
+        return prefix + b"data: " + orjson.dumps(event) + b"\n\n"
+    return prefix + f"data: {json.dumps(event, ensure_ascii=False)}\n\n".encode("utf-8")
+
+
+class SSEChunkCoalescer:
+    """
+    ai_response_chunk 이벤트 병합기 (전송 단위 이벤트를 반환, 인코딩은 호출 측에서 수행)
+
+    - 같은 메시지의 연속된 청크를 시간(window_ms)/바이트(max_bytes) 창 안에서 하나의 프레임으로 병합
+    - 청크가 아닌 이벤트(heartbeat, complete, cancelled, error 등)는 대기 중인 청크를 먼저 내보낸 뒤 그대로 전달
+    - 병합된 프레임의 timestamp는 창의 첫 청크 기준
+    - window_ms가 0이면 병합하지 않음
+    """
+
+    CHUNK_TYPE = "ai_response_chunk"
+
+    def __init__(self, window_ms: int = 50, max_bytes: int = 2048):
+        self.window = window_ms / 1000.0
+        self.max_bytes = max_bytes
+
+        self._pending: Optional[dict] = None
+        self._parts: List[str] = []
+        self._pending_bytes = 0
+        self._deadline = 0.0
+
+    def time_until_flush(self) -> Optional[float]:
+        """대기 중인 청크를 내보내야 할 때까지 남은 시간 (대기 청크가 없으면 None)"""
+        if self._pending is None:
+            return None
+        return max(0.0, self._deadline - time.monotonic())
+
+    def feed(self, event: dict) -> List[dict]:
+        """
+        이벤트 추가 - 지금 전송할 이벤트 목록 반환 (병합 대기 중이면 빈 목록)
+        """
+        if self.window <= 0:
+            return [event]
+
+        if event.get("type") != self.CHUNK_TYPE:
+            return self._flush_list() + [event]
+
+        ready = []
+        if self._pending is not None and self._pending.get("message_id") != event.get("message_id"):
+            ready = self._flush_list()
+
+        content = event.get("content") or ""
+        if self._pending is None:
+            self._pending = event
+            self._deadline = time.monotonic() + self.window
+        self._parts.append(content)
+        self._pending_bytes += len(content.encode("utf-8"))
+
+        if self._pending_bytes >= self.max_bytes or time.monotonic() >= self._deadline:
+            ready += self._flush_list()
+        return ready
+
+    def _flush_list(self) -> List[dict]:
+        event = self.flush()
+        return [event] if event is not None else []
+
+    def flush(self) -> Optional[dict]:
+        """대기 중인 청크를 하나의 이벤트로 병합하여 반환 (없으면 None)"""
+        if self._pending is None:
+            return None
+        event = dict(self._pending)
+        event["content"] = "".join(self._parts)
+
+        self._pending = None
+        self._parts = []
+        self._pending_bytes = 0
+        return event
@@ -0,0 +1,241 @@
+# _*_ coding: utf-8 _*_
+"""Bounded Redis stream of SSE events for Last-Event-ID resume."""
+import asyncio
+import hashlib
+import json
+import logging
+import re
+import time
+from typing import AsyncIterator, Optional, Tuple
+
+from src.api.services.sse_coalescer import dumps_event
+from src.utils import get_current_datetime_iso
+
+logger = logging.getLogger(__name__)
+
+# XREAD BLOCK 중인 replay follower 수 (워커 단위)
+# - 블로킹 중에는 공용 비동기 Redis 풀 연결을 하나씩 점유하므로 상한을 넘으면 폴링으로 전환
+_blocking_followers = 0
+
+
+class StreamEventLog:
+    """
+    채팅 스트림 이벤트 로그 (Redis Stream)
+
+    - 스트림에서 전송한 이벤트를 chat_id별 Redis Stream에 XADD (MAXLEN으로 길이 제한, TTL 설정)
+    - XADD가 반환한 엔트리 ID(단조 증가)를 SSE id로 사용
+    - 재연결 시 Last-Event-ID 이후 이벤트를 XRANGE로 재전송하고, 생성 중이면 XREAD로 이어서 전달
+    - 생성 종료 시 종료 마커를 남겨 재연결 스트림이 끝을 알 수 있게 함
+    - chat_id + 프롬프트 해시로 single-flight 점유 - 중복 요청은 진행 중인 생성의 이벤트 로그에 붙고,
+      다른 프롬프트는 진행 중인 생성이 끝날 때까지 거절 (진행 중인 생성의 이벤트 로그를 지우지 않도록)
+    """
+
+    END_TYPE = "stream_end"
+
+    # Redis Stream 엔트리 ID(<ms>-<seq>) 또는 처음부터 받기 위한 "0"
+    _EVENT_ID_PATTERN = re.compile(r"^(0|\d+-\d+)$")
+
+    # claim() 결과
+    CLAIMED = 1  # 새 생성 점유
+    ATTACHED = 0  # 같은 프롬프트가 진행 중 - 그 이벤트 로그에 붙음
+    BUSY = -1  # 다른 프롬프트가 진행 중 - 거절
+
+    # 같은 프롬프트가 진행 중이면 0, 다른 프롬프트가 진행 중이면 -1,
+    # 아니면 점유 + 이전 생성의 이벤트 로그 초기화 후 1
+    _CLAIM_SCRIPT = """
+    local current = redis.call('GET', KEYS[1])
+    if current == ARGV[1] then
+        return 0
+    end
+    if current then
+        return -1
+    end
+    redis.call('SET', KEYS[1], ARGV[1], 'EX', ARGV[2])
+    redis.call('DEL', KEYS[2])
+    return 1
+    """
+
+    # 자신이 점유한 경우에만 해제
+    _RELEASE_SCRIPT = """
+    if redis.call('GET', KEYS[1]) == ARGV[1] then
+        return redis.call('DEL', KEYS[1])
+    end
+    return 0
+    """
+
+    def __init__(
+        self,
+        async_redis_client,
+        maxlen: int = 1000,
+        ttl_seconds: int = 300,
+        block_ms: int = 3000,
+        heartbeat_interval: float = 10.0,
+        inflight_ttl_seconds: int = 300,
+        max_blocking_followers: int = 50,
+    ):
+        self.redis = async_redis_client.redis_client
+        self.maxlen = maxlen
+        self.ttl_seconds = ttl_seconds
+        self.block_ms = block_ms
+        self.heartbeat_interval = heartbeat_interval
+        self.inflight_ttl_seconds = inflight_ttl_seconds
+        self.max_blocking_followers = max_blocking_followers
+
+    @staticmethod
+    def _key(chat_id: str) -> str:
+        return f"chat_stream:{chat_id}"
+
+    @staticmethod
+    def _inflight_key(chat_id: str) -> str:
+        return f"chat_inflight:{chat_id}"
+
+    @classmethod
+    def is_valid_event_id(cls, event_id: str) -> bool:
+        """Last-Event-ID 형식 검사"""
+        return bool(cls._EVENT_ID_PATTERN.match(event_id))
+
+    @staticmethod
+    def prompt_hash(message: str, user_id: str = None, plc_uuid: str = None) -> str:
+        """요청 동일성 판단용 프롬프트 해시"""
+        raw = "\x00".join([user_id or "", plc_uuid or "", message or ""])
+        return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+    async def claim(self, chat_id: str, prompt_hash: str) -> int:
+        """
+        single-flight 점유
+
+        Returns:
+            int: CLAIMED(새 생성), ATTACHED(같은 프롬프트로 진행 중), BUSY(다른 프롬프트로 진행 중)
+
+        CLAIMED인 경우 끝난 이전 생성의 이벤트 로그를 같은 스크립트 안에서 제거하므로,
+        뒤이어 들어온 중복 요청이 이전 생성의 로그를 읽는 일이 없음
+        (진행 중인 생성의 로그는 점유가 해제되거나 만료될 때까지 지우지 않음)
+        Redis 오류 시에는 CLAIMED를 반환하여 기존처럼 생성함
+        """
+        try:
+            return int(await self.redis.eval(
+                self._CLAIM_SCRIPT, 2,
+                self._inflight_key(chat_id), self._key(chat_id),
+                prompt_hash, self.inflight_ttl_seconds,
+            ))
+        except Exception as e:
+            logger.warning(f"Single-flight claim failed for chat {chat_id}: {e}")
+            return self.CLAIMED
+
+    async def release(self, chat_id: str, prompt_hash: str):
+        """single-flight 점유 해제 (자신이 점유한 경우에만)"""
+        try:
+            await self.redis.eval(self._RELEASE_SCRIPT, 1, self._inflight_key(chat_id), prompt_hash)
+        except Exception as e:
+            logger.warning(f"Single-flight release failed for chat {chat_id}: {e}")
+
+    async def publish(self, chat_id: str, event: dict) -> Optional[str]:
+        """
+        이벤트 기록 - 엔트리 ID 반환 (실패 시 None, 스트리밍은 계속 진행)
+
+        생성 중 점유 만료 시간도 함께 연장 (생성이 inflight_ttl보다 길어도 점유가 풀리지 않도록)
+        """
+        key = self._key(chat_id)
+        try:
+            pipe = self.redis.pipeline(transaction=False)
+            pipe.xadd(key, {"data": dumps_event(event)}, maxlen=self.maxlen, approximate=True)
+            pipe.expire(key, self.ttl_seconds)
+            pipe.expire(self._inflight_key(chat_id), self.inflight_ttl_seconds)
+            event_id, _, _ = await pipe.execute()
+            return event_id
+        except Exception as e:
+            logger.warning(f"Stream event publish failed for chat {chat_id}: {e}")
+            return None
+
+    async def keep_alive(self, chat_id: str):
+        """점유 만료 시간 연장 (이벤트가 없는 대기 구간의 heartbeat마다 호출)"""
+        try:
+            await self.redis.expire(self._inflight_key(chat_id), self.inflight_ttl_seconds)
+        except Exception as e:
+            logger.warning(f"Single-flight keep-alive failed for chat {chat_id}: {e}")
+
+    async def finish(self, chat_id: str):
+        """생성 종료 마커 기록"""
+        await self.publish(chat_id, {"type": self.END_TYPE, "timestamp": get_current_datetime_iso()})
+
+    async def exists(self, chat_id: str) -> bool:
+        """재연결 가능한 이벤트 로그 존재 여부"""
+        try:
+            return bool(await self.redis.exists(self._key(chat_id)))
+        except Exception as e:
+            logger.warning(f"Stream event log check failed for chat {chat_id}: {e}")
+            return False
+
+    async def replay(self, chat_id: str, last_event_id: Optional[str] = None) -> AsyncIterator[Tuple[Optional[str], dict]]:
+        """
+        Last-Event-ID 이후 이벤트 재전송 후 실시간 tail 구독
+
+        Yields:
+            (event_id, event) - heartbeat는 event_id가 None
+        """
+        key = self._key(chat_id)
+        cursor = last_event_id or "0-0"
+
+        # 1) 놓친 이벤트 재전송 (cursor 제외)
+        entries = await self.redis.xrange(key, min=f"({cursor}" if last_event_id else "-")
+        for entry_id, fields in entries:
+            cursor = entry_id
+            event = json.loads(fields["data"])
+            if event.get("type") == self.END_TYPE:
+                return
+            yield entry_id, event
+
+        # 2) 생성 중이면 이후 이벤트를 이어서 전달 (종료 마커, 또는 로그 만료 + 점유 해제 시 종료)
+        # - 블로킹 follower 상한을 넘으면 연결을 점유하지 않도록 XREAD(비블로킹) + sleep 폴링
+        global _blocking_followers
+        blocking = _blocking_followers < self.max_blocking_followers
+        if blocking:
+            _blocking_followers += 1
+        try:
+            last_sent = time.monotonic()
+            while True:
+                result = await self.redis.xread(
+                    {key: cursor}, count=100, block=self.block_ms if blocking else None
+                )
+                if not result:
+                    # 이벤트 로그가 만료되었고 진행 중인 생성도 없으면 종료
+                    if not await self.redis.exists(key, self._inflight_key(chat_id)):
+                        return
+                    if not blocking:
+                        await asyncio.sleep(self.block_ms / 1000)
+                    if time.monotonic() - last_sent >= self.heartbeat_interval:
+                        last_sent = time.monotonic()
+                        yield None, {
+                            "type": "heartbeat",
+                            "message": "응답을 이어서 받는 중입니다...",
+                            "timestamp": get_current_datetime_iso(),
+                        }
+                    continue
+
+                for _, stream_entries in result:
+                    for entry_id, fields in stream_entries:
+                        cursor = entry_id
+                        event = json.loads(fields["data"])
+                        if event.get("type") == self.END_TYPE:
+                            return
+                        last_sent = time.monotonic()
+                        yield entry_id, event
+        finally:
+            if blocking:
+                _blocking_followers -= 1
+
+
+def get_stream_event_log(async_redis_client) -> Optional[StreamEventLog]:
+    """비동기 Redis 클라이언트가 있으면 스트림 이벤트 로그 반환 (없으면 재연결 미지원)"""
+    if async_redis_client is None:
+        return None
+    from src.config import settings
+
+    return StreamEventLog(
+        async_redis_client,
+        maxlen=settings.chat_stream_replay_maxlen,
+        ttl_seconds=settings.chat_stream_replay_ttl_seconds,
+        heartbeat_interval=settings.chat_heartbeat_interval_seconds,
+        inflight_ttl_seconds=settings.chat_stream_inflight_ttl_seconds,
+        max_blocking_followers=settings.chat_stream_replay_max_blocking_followers,
+    )
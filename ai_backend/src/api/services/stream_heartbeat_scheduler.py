@@ -0,0 +1,153 @@
+# _*_ coding: utf-8 _*_
+"""Per-worker heartbeat scheduler for SSE streams (hashed timer wheel)."""
+import asyncio
+import itertools
+import logging
+import time
+from typing import Dict, List, Optional, Tuple
+
+from src.utils import get_current_datetime_iso
+
+logger = logging.getLogger(__name__)
+
+# 경과 시간(초) 기준 heartbeat 메시지 - 경과 시간 이하인 가장 큰 기준의 메시지 사용
+DEFAULT_HEARTBEAT_MESSAGES: Dict[int, str] = {
+    10: "사용자의 의도를 파악하고 있습니다...",
+    30: "정확한 답변을 찾기 위해 노력하고 있습니다...",
+    50: "거의 다 완료되었습니다. 조금만 기다려주세요...",
+}
+
+
+class _HeartbeatEntry:
+    """heartbeat 대상 스트림 정보"""
+
+    __slots__ = ("chat_id", "queue", "started_at")
+
+    def __init__(self, chat_id: str, queue: asyncio.Queue):
+        self.chat_id = chat_id
+        self.queue = queue
+        self.started_at = time.monotonic()
+
+
+class StreamHeartbeatScheduler:
+    """
+    SSE 스트림 heartbeat 스케줄러 (워커 프로세스당 1개)
+
+    - 스트림마다 타이머 task를 두지 않고, 단일 task가 tick마다 타이머 휠의 슬롯 1개만 처리
+    - 슬롯 수 = interval / tick 이므로 각 스트림은 등록 시점 기준 interval마다 heartbeat를 받음
+    - tick당 깨어나는 task는 1개, 처리량은 해당 슬롯의 스트림 수로 제한됨
+    - 등록된 스트림이 없으면 task를 종료하여 유휴 상태의 wakeup이 없음
+    """
+
+    def __init__(
+        self,
+        interval: float = 10.0,
+        tick: float = 1.0,
+        messages: Optional[Dict[int, str]] = None,
+    ):
+        self.interval = interval
+        self.tick = tick
+        self.slot_count = max(1, round(interval / tick))
+        messages = messages or DEFAULT_HEARTBEAT_MESSAGES
+        self._messages: List[Tuple[int, str]] = sorted(messages.items())
+
+        self._wheel: List[Dict[int, _HeartbeatEntry]] = [{} for _ in range(self.slot_count)]
+        self._slots: Dict[int, int] = {}  # handle -> slot index
+        self._cursor = 0  # 다음 tick에 처리할 슬롯
+        self._handles = itertools.count(1)
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def active_streams(self) -> int:
+        """등록된 스트림 수"""
+        return len(self._slots)
+
+    def register(self, chat_id: str, queue: asyncio.Queue) -> int:
+        """
+        스트림 등록 - 이후 interval마다 queue에 heartbeat 이벤트를 넣음
+
+        Returns:
+            int: unregister에 사용할 핸들
+        """
+        handle = next(self._handles)
+        # 직전에 처리된 슬롯에 배치하면 휠이 한 바퀴 돈 뒤(interval 후) 처음 처리됨
+        slot = (self._cursor - 1) % self.slot_count
+        self._wheel[slot][handle] = _HeartbeatEntry(chat_id, queue)
+        self._slots[handle] = slot
+
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return handle
+
+    def unregister(self, handle: int):
+        """스트림 등록 해제"""
+        slot = self._slots.pop(handle, None)
+        if slot is not None:
+            self._wheel[slot].pop(handle, None)
+
+    def _message_for(self, elapsed: float) -> str:
+        """경과 시간에 맞는 heartbeat 메시지 선택"""
+        message = self._messages[0][1]
+        for threshold, text in self._messages:
+            if elapsed < threshold:
+                break
+            message = text
+        return message
+
+    def _fire_slot(self, slot: int):
+        """슬롯에 속한 스트림에 heartbeat 전달"""
+        entries = self._wheel[slot]
+        if not entries:
+            return
+
+        now = time.monotonic()
+        timestamp = get_current_datetime_iso()
+        for entry in entries.values():
+            # 경과 시간은 interval 단위로 반올림 (10, 20, 30 ...)
+            elapsed = round((now - entry.started_at) / self.interval) * self.interval
+            message = self._message_for(elapsed)
+            entry.queue.put_nowait({
+                "type": "heartbeat",
+                "message": message,
+                "timestamp": timestamp,
+            })
+            logger.debug(f"Sent heartbeat for chat {entry.chat_id} at {elapsed:.0f}s: {message}")
+
+    async def _run(self):
+        """타이머 휠 루프 - 등록된 스트림이 없어지면 종료"""
+        next_tick = time.monotonic()
+        try:
+            while self._slots:
+                next_tick += self.tick
+                await asyncio.sleep(max(0.0, next_tick - time.monotonic()))
+                try:
+                    self._fire_slot(self._cursor)
+                except Exception as e:
+                    logger.warning(f"Heartbeat scheduler error: {e}")
+                self._cursor = (self._cursor + 1) % self.slot_count
+        except asyncio.CancelledError:
+            pass
+
+    async def stop(self):
+        """스케줄러 task 종료 (앱 종료 시 호출)"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+
+# 전역 heartbeat 스케줄러 인스턴스 (워커 프로세스당 1개)
+heartbeat_scheduler = None
+
+
+def get_heartbeat_scheduler() -> StreamHeartbeatScheduler:
+    """heartbeat 스케줄러 싱글톤 반환"""
+    global heartbeat_scheduler
+    if heartbeat_scheduler is None:
+        from src.config import settings
+
+        heartbeat_scheduler = StreamHeartbeatScheduler(
+            interval=settings.chat_heartbeat_interval_seconds,
+            tick=settings.chat_heartbeat_tick_seconds,
+        )
+    return heartbeat_scheduler
@@ -0,0 +1,85 @@
+# _*_ coding: utf-8 _*_
+"""Write-behind buffer for streamed AI messages."""
+import logging
+import time
+from typing import List, Optional
+
+from src.config import settings
+from src.database.crud.async_chat_crud import AsyncChatCRUD
+
+logger = logging.getLogger(__name__)
+
+
+class StreamMessageWriter:
+    """
+    스트리밍 AI 메시지 write-behind 버퍼
+
+    - 청크는 메모리에 누적하고, N개 청크 또는 T ms마다 부분 응답을 1회 UPDATE
+    - 완료 시 메시지 내용/상태, 노드 데이터, 채팅 마지막 메시지 시간을 한 트랜잭션으로 저장
+    - 스트림 수와 관계없이 스트림당 DB 쓰기 빈도가 일정하게 제한됨
+    - DB 쓰기는 AsyncChatCRUD로 수행하여 이벤트 루프를 막지 않음
+    """
+
+    def __init__(
+        self,
+        chat_crud: AsyncChatCRUD,
+        message_id: str,
+        chat_id: str,
+        checkpoint_chunks: Optional[int] = None,
+        checkpoint_interval_ms: Optional[int] = None,
+    ):
+        self.chat_crud = chat_crud
+        self.message_id = message_id
+        self.chat_id = chat_id
+        self.checkpoint_chunks = checkpoint_chunks or settings.chat_stream_checkpoint_chunks
+        interval_ms = checkpoint_interval_ms or settings.chat_stream_checkpoint_interval_ms
+        self.checkpoint_interval = interval_ms / 1000.0
+
+        self._parts: List[str] = []
+        self._pending_chunks = 0
+        self._last_checkpoint = time.monotonic()
+
+    @property
+    def content(self) -> str:
+        """현재까지 누적된 응답 내용"""
+        return "".join(self._parts)
+
+    async def append(self, text: str):
+        """청크 추가 (체크포인트 조건 도달 시 부분 응답 저장)"""
+        self._parts.append(text)
+        self._pending_chunks += 1
+
+        if (
+            self._pending_chunks >= self.checkpoint_chunks
+            or time.monotonic() - self._last_checkpoint >= self.checkpoint_interval
+        ):
+            await self.checkpoint()
+
+    async def checkpoint(self):
+        """부분 응답 저장 - 실패해도 스트리밍은 계속 진행"""
+        if not self._pending_chunks:
+            return
+        try:
+            await self.chat_crud.checkpoint_ai_message(self.message_id, self.content)
+        except Exception as e:
+            logger.warning(f"Stream checkpoint failed for message {self.message_id}: {e}")
+        finally:
+            self._pending_chunks = 0
+            self._last_checkpoint = time.monotonic()
+
+    async def complete(
+        self,
+        external_api_nodes: dict = None,
+        token_count: int = None,
+        has_reviewer: Optional[bool] = None,
+    ):
+        """응답 완료 저장 (단일 트랜잭션)"""
+        await self.chat_crud.complete_ai_message(
+            self.message_id,
+            self.chat_id,
+            self.content,
+            external_api_nodes,
+            token_count=token_count,
+            has_reviewer=has_reviewer,
+        )
+        self._pending_chunks = 0
@@ -0,0 +1,201 @@
+# _*_ coding: utf-8 _*_
+"""Background chat title generation (batched, off the request path)."""
+import asyncio
+import logging
+import time
+from datetime import datetime
+from typing import Callable, Iterable, List, Optional
+
+from src.utils import get_current_datetime_iso
+
+logger = logging.getLogger(__name__)
+
+
+def heuristic_chat_title(message: str) -> str:
+    """LLM 호출 없이 만드는 임시 제목 (질문의 처음 3개 단어)"""
+    words = (message or "").split()[:3]
+    title = " ".join(words)
+    if len(title) > 15:
+        title = title[:12] + "..."
+    return title if title else f"Chat {datetime.now().strftime('%H:%M')}"
+
+
+def normalize_generated_title(title: Optional[str], message: str) -> str:
+    """LLM이 생성한 제목 정리 (너무 길면 자르고, 비어 있으면 임시 제목)"""
+    title = (title or "").strip()
+    if len(title) > 20:
+        title = title[:17] + "..."
+    return title if title else heuristic_chat_title(message)
+
+
+class TitleJob:
+    """제목 생성 작업 1건"""
+
+    __slots__ = ("chat_id", "message", "replace_titles", "future")
+
+    def __init__(self, chat_id: str, message: str, replace_titles: Iterable[str]):
+        self.chat_id = chat_id
+        self.message = message
+        # 현재 제목이 이 중 하나일 때만 교체 (사용자가 그 사이 이름을 바꿨으면 유지)
+        self.replace_titles = list(replace_titles)
+        self.future: asyncio.Future = asyncio.get_running_loop().create_future()
+
+
+class TitleGenerationQueue:
+    """
+    채팅 제목 백그라운드 생성 큐 (워커 프로세스당 1개)
+
+    - 요청 경로에서는 임시 제목만 사용하고 LLM 호출은 큐에 넣어 백그라운드 task가 처리
+    - batch_window 동안 모인 작업(최대 batch_size)을 제공자의 create_title_completions로 한 번에 처리
+    - 생성된 제목은 현재 제목이 임시 제목일 때만 DB에 반영하고, 작업 future로 결과를 알림
+      (스트림 중이면 호출 측이 chat_title 이벤트로 전달, 아니면 채팅 목록 조회로 확인)
+    - 대기 작업이 max_pending을 넘으면 새 작업은 버림 (임시 제목 유지)
+    - 처리할 작업이 없으면 task를 종료하여 유휴 상태의 wakeup이 없음
+    """
+
+    def __init__(
+        self,
+        async_session_factory,
+        batch_size: int = 8,
+        batch_window_ms: int = 200,
+        max_pending: int = 1000,
+    ):
+        self.async_session_factory = async_session_factory
+        self.batch_size = batch_size
+        self.batch_window = batch_window_ms / 1000.0
+        self.max_pending = max_pending
+
+        self._pending: List[TitleJob] = []
+        self._wakeup: Optional[asyncio.Event] = None
+        self._task: Optional[asyncio.Task] = None
+
+    @property
+    def pending(self) -> int:
+        """대기 중인 작업 수"""
+        return len(self._pending)
+
+    def enqueue(
+        self,
+        chat_id: str,
+        message: str,
+        replace_titles: Iterable[str],
+        on_title: Optional[Callable[[dict], None]] = None,
+    ) -> Optional[TitleJob]:
+        """
+        제목 생성 작업 추가 (즉시 반환)
+
+        Args:
+            on_title: 제목이 반영되면 chat_title 이벤트를 인자로 호출되는 콜백
+
+        Returns:
+            TitleJob - 대기열이 가득 차면 None
+        """
+        if len(self._pending) >= self.max_pending:
+            logger.warning(f"Title generation queue full, keeping heuristic title for chat {chat_id}")
+            return None
+
+        job = TitleJob(chat_id, message, replace_titles)
+        if on_title is not None:
+            job.future.add_done_callback(lambda f: self._notify(f, on_title))
+        self._pending.append(job)
+
+        if self._wakeup is None:
+            self._wakeup = asyncio.Event()
+        self._wakeup.set()
+        if self._task is None or self._task.done():
+            self._task = asyncio.get_running_loop().create_task(self._run())
+        return job
+
+    @staticmethod
+    def _notify(future: asyncio.Future, on_title: Callable[[dict], None]):
+        if future.cancelled() or future.exception() is not None or future.result() is None:
+            return
+        chat_id, title = future.result()
+        try:
+            on_title({
+                "type": "chat_title",
+                "chat_id": chat_id,
+                "title": title,
+                "timestamp": get_current_datetime_iso(),
+            })
+        except Exception as e:
+            logger.debug(f"Title notification skipped for chat {chat_id}: {e}")
+
+    async def _run(self):
+        """작업 루프 - 대기 작업이 없으면 종료"""
+        try:
+            while self._pending:
+                # 배치 창 동안 작업을 더 모음 (batch_size가 차면 바로 처리)
+                deadline = time.monotonic() + self.batch_window
+                while len(self._pending) < self.batch_size:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        break
+                    self._wakeup.clear()
+                    try:
+                        await asyncio.wait_for(self._wakeup.wait(), timeout=remaining)
+                    except asyncio.TimeoutError:
+                        break
+
+                batch = self._pending[:self.batch_size]
+                del self._pending[:self.batch_size]
+                try:
+                    await self._process(batch)
+                except Exception as e:
+                    logger.warning(f"Title generation batch failed: {e}")
+                finally:
+                    for job in batch:
+                        if not job.future.done():
+                            job.future.set_result(None)
+        except asyncio.CancelledError:
+            for job in self._pending:
+                job.future.cancel()
+            self._pending.clear()
+
+    async def _process(self, batch: List[TitleJob]):
+        """배치 제목 생성 후 DB 반영"""
+        from src.api.services.llm_provider_factory import LLMProviderFactory
+        from src.database.crud.async_chat_crud import AsyncChatCRUD
+
+        provider = LLMProviderFactory.get_shared_provider()
+        results = await provider.create_title_completions([job.message for job in batch])
+
+        async with self.async_session_factory() as session:
+            chat_crud = AsyncChatCRUD(session)
+            for job, result in zip(batch, results):
+                if isinstance(result, BaseException):
+                    logger.warning(f"Title generation failed for chat {job.chat_id}: {result}")
+                    continue
+                title = normalize_generated_title(result.choices[0].message.content, job.message)
+                if title in job.replace_titles:
+                    continue
+                if await chat_crud.replace_chat_title(job.chat_id, title, job.replace_titles):
+                    logger.debug(f"Generated title for chat {job.chat_id}: {title}")
+                    job.future.set_result((job.chat_id, title))
+
+    async def stop(self):
+        """작업 task 종료 (앱 종료 시 호출, 대기 작업은 버림)"""
+        if self._task is not None and not self._task.done():
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+        self._task = None
+
+
+# 전역 제목 생성 큐 인스턴스 (워커 프로세스당 1개)
+title_generation_queue = None
+
+
+def get_title_generation_queue() -> TitleGenerationQueue:
+    """제목 생성 큐 싱글톤 반환"""
+    global title_generation_queue
+    if title_generation_queue is None:
+        from src.config import settings
+        from src.core.dependencies import get_database
+
+        title_generation_queue = TitleGenerationQueue(
+            get_database().async_session,
+            batch_size=settings.title_generation_batch_size,
+            batch_window_ms=settings.title_generation_batch_window_ms,
+            max_pending=settings.title_generation_max_pending,
+        )
+    return title_generation_queue
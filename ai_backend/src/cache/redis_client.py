@@ -1,12 +1,29 @@
 # _*_ coding: utf-8 _*_
 """Redis client for caching and session management."""
 import redis
+import redis.asyncio as aioredis
 import json
 import os
-from typing import Optional, Dict, Any, List
+from contextlib import asynccontextmanager, contextmanager
+from typing import Optional, Dict, Any, Iterable, List
 from datetime import datetime, timedelta
 
 
+def chat_state_keys(chat_id: str) -> List[str]:
+    """채팅방에 속한 캐시/상태 키 (메시지 캐시, 생성 상태, 취소 상태, 에이전트 컨텍스트)"""
+    return [f"chat:{chat_id}", f"generation:{chat_id}", f"cancel:{chat_id}", f"chat_context:{chat_id}"]
+
+
+# 생성 중이면 생성 상태를 지우고 취소 상태를 남김 (1: 취소됨, 0: 생성 중 아님)
+CANCEL_GENERATION_SCRIPT = """
+if redis.call('DEL', KEYS[1]) == 1 then
+    redis.call('SET', KEYS[2], '1', 'EX', ARGV[1])
+    return 1
+end
+return 0
+"""
+
+
 class RedisClient:
     """Redis 클라이언트 - 캐싱 및 세션 관리"""
     
@@ -40,6 +57,58 @@ class RedisClient:
         except Exception:
             return False
     
+    @contextmanager
+    def pipeline(self, transaction: bool = True):
+        """
+        파이프라인 컨텍스트 - 블록 안에서 쌓은 명령을 블록 종료 시 한 번의 왕복으로 실행
+        
+        transaction=True면 MULTI/EXEC로 묶어 원자적으로 실행 (블록 안에서 예외가 나면 실행하지 않음)
+        
+        Example:
+            with redis_client.pipeline() as pipe:
+                pipe.setex(key, 60, "1")
+                pipe.delete(other_key)
+        """
+        pipe = self.redis_client.pipeline(transaction=transaction)
+        try:
+            yield pipe
+            pipe.execute()
+        finally:
+            pipe.reset()
+    
+    def unlink_keys(self, keys: Iterable[str]) -> int:
+        """여러 키 삭제 (UNLINK 한 번 - 메모리 해제는 Redis 백그라운드에서 수행)"""
+        keys = list(keys)
+        if not keys:
+            return 0
+        try:
+            return self.redis_client.unlink(*keys)
+        except Exception:
+            return 0
+    
+    def clear_chat_state(self, chat_id: str) -> int:
+        """채팅방의 메시지 캐시/생성 상태/취소 상태/컨텍스트 캐시를 한 번에 삭제"""
+        return self.unlink_keys(chat_state_keys(chat_id))
+    
+    def cancel_generation_state(self, chat_id: str, cancel_ttl: int = 60) -> bool:
+        """생성 중이면 생성 상태를 취소 상태로 전환 (확인과 변경을 Lua 스크립트 한 번으로 원자적으로 처리)"""
+        return bool(self.redis_client.eval(
+            CANCEL_GENERATION_SCRIPT, 2, f"generation:{chat_id}", f"cancel:{chat_id}", cancel_ttl
+        ))
+    
+    def get_sessions(self, chat_ids: List[str]) -> Dict[str, Optional[Dict[str, Any]]]:
+        """여러 채팅의 세션 데이터 조회 (MGET 한 번)"""
+        if not chat_ids:
+            return {}
+        try:
+            values = self.redis_client.mget([f"session:{chat_id}" for chat_id in chat_ids])
+            return {
+                chat_id: json.loads(value) if value else None
+                for chat_id, value in zip(chat_ids, values)
+            }
+        except Exception:
+            return {chat_id: None for chat_id in chat_ids}
+    
     def set_session(self, chat_id: str, data: Dict[str, Any], expire_seconds: int = 3600) -> bool:
         """세션 데이터 저장"""
         try:
@@ -67,20 +136,47 @@ class RedisClient:
             return False
     
     def set_chat_cache(self, chat_id: str, messages: List[Dict[str, Any]], expire_seconds: int = 1800) -> bool:
-        """채팅 메시지 캐시 저장"""
+        """채팅 메시지 캐시 저장 (Redis 리스트로 전체 교체)"""
         try:
             key = f"chat:{chat_id}"
-            self.redis_client.setex(key, expire_seconds, json.dumps(messages))
+            pipe = self.redis_client.pipeline()
+            pipe.delete(key)
+            if messages:
+                pipe.rpush(key, *[json.dumps(message) for message in messages])
+                pipe.expire(key, expire_seconds)
+            pipe.execute()
             return True
         except Exception:
             return False
     
+    def append_chat_cache(
+        self,
+        chat_id: str,
+        message: Dict[str, Any],
+        max_messages: int = 50,
+        expire_seconds: int = 1800,
+    ) -> bool:
+        """
+        채팅 메시지 캐시에 메시지 1건 추가 (RPUSHX + LTRIM)
+        
+        캐시가 이미 있는 경우에만 추가하여 일부 메시지만 담긴 캐시가 생기지 않도록 함
+        """
+        try:
+            key = f"chat:{chat_id}"
+            pipe = self.redis_client.pipeline()
+            pipe.rpushx(key, json.dumps(message))
+            pipe.ltrim(key, -max_messages, -1)
+            pipe.expire(key, expire_seconds)
+            return bool(pipe.execute()[0])
+        except Exception:
+            return False
+    
     def get_chat_cache(self, chat_id: str) -> Optional[List[Dict[str, Any]]]:
-        """채팅 메시지 캐시 조회"""
+        """채팅 메시지 캐시 조회 (LRANGE)"""
         try:
             key = f"chat:{chat_id}"
-            data = self.redis_client.get(key)
-            return json.loads(data) if data else None
+            data = self.redis_client.lrange(key, 0, -1)
+            return [json.loads(item) for item in data] if data else None
         except Exception:
             return None
     
@@ -157,6 +253,143 @@ class RedisClient:
             pass
 
 
+class AsyncRedisClient:
+    """
+    비동기 Redis 클라이언트 (redis.asyncio) - 이벤트 루프 안에서 사용하는 채팅 경로용
+    
+    키 구조와 직렬화 형식은 RedisClient와 동일하므로 두 클라이언트가 같은 캐시를 공유함
+    """
+    
+    def __init__(self):
+        self.host = os.getenv("REDIS_HOST", "localhost")
+        self.port = int(os.getenv("REDIS_PORT", "6379"))
+        self.db = int(os.getenv("REDIS_DB", "0"))
+        self.password = os.getenv("REDIS_PASSWORD", None)
+        
+        max_connections = int(os.getenv("REDIS_MAX_CONNECTIONS", "500"))
+        socket_timeout = int(os.getenv("REDIS_SOCKET_TIMEOUT", "5"))
+        socket_connect_timeout = int(os.getenv("REDIS_SOCKET_CONNECT_TIMEOUT", "5"))
+        
+        self.redis_client = aioredis.Redis(
+            host=self.host,
+            port=self.port,
+            db=self.db,
+            password=self.password,
+            decode_responses=True,
+            socket_connect_timeout=socket_connect_timeout,
+            socket_timeout=socket_timeout,
+            retry_on_timeout=True,
+            max_connections=max_connections,
+        )
+    
+    async def ping(self) -> bool:
+        """Redis 연결 상태 확인"""
+        try:
+            return await self.redis_client.ping()
+        except Exception:
+            return False
+    
+    @asynccontextmanager
+    async def pipeline(self, transaction: bool = True):
+        """파이프라인 컨텍스트 - 블록 종료 시 쌓은 명령을 한 번의 왕복으로 실행 (RedisClient.pipeline과 동일)"""
+        pipe = self.redis_client.pipeline(transaction=transaction)
+        try:
+            yield pipe
+            await pipe.execute()
+        finally:
+            await pipe.reset()
+    
+    async def unlink_keys(self, keys: Iterable[str]) -> int:
+        """여러 키 삭제 (UNLINK 한 번)"""
+        keys = list(keys)
+        if not keys:
+            return 0
+        try:
+            return await self.redis_client.unlink(*keys)
+        except Exception:
+            return 0
+    
+    async def clear_chat_state(self, chat_id: str) -> int:
+        """채팅방의 메시지 캐시/생성 상태/취소 상태/컨텍스트 캐시를 한 번에 삭제"""
+        return await self.unlink_keys(chat_state_keys(chat_id))
+    
+    async def start_generation(self, chat_id: str, ttl: int = 300):
+        """생성 시작 표시 + 이전 생성에서 남은 취소 상태 제거 (MULTI/EXEC 한 번)"""
+        async with self.pipeline() as pipe:
+            pipe.set(f"generation:{chat_id}", "1", ex=ttl)
+            pipe.delete(f"cancel:{chat_id}")
+    
+    async def finish_generation(self, chat_id: str):
+        """생성 상태 제거"""
+        await self.redis_client.delete(f"generation:{chat_id}")
+    
+    async def is_cancel_requested(self, chat_id: str) -> bool:
+        """취소 상태 확인"""
+        return bool(await self.redis_client.exists(f"cancel:{chat_id}"))
+    
+    async def cancel_generation_state(self, chat_id: str, cancel_ttl: int = 60) -> bool:
+        """생성 중이면 생성 상태를 취소 상태로 전환 (Lua 스크립트 한 번)"""
+        return bool(await self.redis_client.eval(
+            CANCEL_GENERATION_SCRIPT, 2, f"generation:{chat_id}", f"cancel:{chat_id}", cancel_ttl
+        ))
+    
+    async def set_chat_messages(self, chat_id: str, messages: List[Dict[str, Any]], expire_seconds: int = 1800) -> bool:
+        """채팅 메시지 캐시 저장 (Redis 리스트로 전체 교체)"""
+        try:
+            key = f"chat:{chat_id}"
+            pipe = self.redis_client.pipeline()
+            pipe.delete(key)
+            if messages:
+                pipe.rpush(key, *[json.dumps(message) for message in messages])
+                pipe.expire(key, expire_seconds)
+            await pipe.execute()
+            return True
+        except Exception:
+            return False
+    
+    async def append_chat_cache(
+        self,
+        chat_id: str,
+        message: Dict[str, Any],
+        max_messages: int = 50,
+        expire_seconds: int = 1800,
+    ) -> bool:
+        """채팅 메시지 캐시에 메시지 1건 추가 (캐시가 있는 경우에만, RPUSHX + LTRIM)"""
+        try:
+            key = f"chat:{chat_id}"
+            pipe = self.redis_client.pipeline()
+            pipe.rpushx(key, json.dumps(message))
+            pipe.ltrim(key, -max_messages, -1)
+            pipe.expire(key, expire_seconds)
+            return bool((await pipe.execute())[0])
+        except Exception:
+            return False
+    
+    async def get_chat_messages(self, chat_id: str) -> Optional[List[Dict[str, Any]]]:
+        """채팅 메시지 캐시 조회 (LRANGE)"""
+        try:
+            key = f"chat:{chat_id}"
+            data = await self.redis_client.lrange(key, 0, -1)
+            return [json.loads(item) for item in data] if data else None
+        except Exception:
+            return None
+    
+    async def delete_chat_messages(self, chat_id: str) -> bool:
+        """채팅 메시지 캐시 삭제"""
+        try:
+            key = f"chat:{chat_id}"
+            return bool(await self.redis_client.delete(key))
+        except Exception:
+            return False
+    
+    async def close(self):
+        """Redis 연결 종료"""
+        try:
+            await self.redis_client.aclose()
+        except Exception:
+            pass
+
+
 # 전역 Redis 클라이언트 인스턴스
 redis_client = None
 
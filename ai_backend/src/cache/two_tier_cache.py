@@ -0,0 +1,364 @@
+# _*_ coding: utf-8 _*_
+"""Two-tier cache for reference data (per-worker LRU + Redis, pub/sub invalidation)."""
+import hashlib
+import json
+import logging
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Dict, Iterable, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+_MISSING = object()
+
+# 네임스페이스 (소유 CRUD가 변경 시 무효화)
+MASTERS_NAMESPACE = "masters"  # 기준정보 드롭다운 (master_crud)
+PERMISSIONS_NAMESPACE = "permissions"  # 사용자 역할/접근 가능 공정 (group_crud)
+USERS_NAMESPACE = "users"  # 사용자 프로필 (user_crud)
+
+
+def cache_key_for_ids(ids: Optional[Iterable[str]]) -> str:
+    """ID 목록을 캐시 키로 변환 (순서 무관, 비어 있으면 'all')"""
+    if not ids:
+        return "all"
+    joined = ",".join(sorted(set(ids)))
+    return hashlib.sha1(joined.encode("utf-8")).hexdigest()
+
+
+class TwoTierCache:
+    """
+    참조 데이터용 2단계 캐시 (워커 프로세스당 1개)
+
+    - 1단계: 워커 메모리 LRU (local_max_entries개, local_ttl초) - I/O 없이 조회
+    - 2단계: Redis JSON (redis_ttl초) - 워커 간 공유, 1단계 miss 시 조회
+    - 둘 다 없으면 loader로 DB 조회 후 두 단계에 저장 (loader 예외는 캐시하지 않고 그대로 전파)
+    - 변경 시 소유 CRUD가 invalidate() 호출 → Redis 삭제 + pub/sub으로 모든 워커의 1단계 삭제
+    - 네임스페이스 전체 무효화는 Redis 버전 카운터 증가로 처리 (이전 버전 키는 TTL로 만료)
+    - 키 단위 무효화는 키별 무효화 카운터를 증가시키고, loader 결과는 조회 시점의 네임스페이스 버전과
+      키 무효화 카운터가 그대로일 때만 Redis에 저장 (조회 중 다른 워커가 무효화한 오래된 값을 저장하지 않음)
+    - Redis가 없거나 장애 시 1단계만 사용 (다른 워커 반영은 local_ttl 안에 이루어짐)
+    - 값은 JSON 직렬화 가능한 dict/list/str 등만 저장 (ORM 객체 불가)
+    - 1단계 hit 시 저장된 객체를 그대로 반환하므로 호출 측은 결과를 수정하지 않아야 함
+    """
+
+    KEY_PREFIX = "two_tier"
+
+    # 조회 시점의 네임스페이스 버전과 키 무효화 카운터가 그대로일 때만 저장 - 저장 시 1, 아니면 0
+    _SET_IF_CURRENT_SCRIPT = """
+    if (redis.call('GET', KEYS[1]) or '0') ~= ARGV[1] then
+        return 0
+    end
+    if (redis.call('GET', KEYS[2]) or '0') ~= ARGV[2] then
+        return 0
+    end
+    redis.call('SET', KEYS[3], ARGV[3], 'EX', ARGV[4])
+    return 1
+    """
+
+    def __init__(
+        self,
+        channel: str,
+        local_max_entries: int = 2048,
+        local_ttl: float = 30.0,
+        redis_ttl: int = 600,
+        enabled: bool = True,
+    ):
+        self.channel = channel
+        self.local_max_entries = local_max_entries
+        self.local_ttl = local_ttl
+        self.redis_ttl = redis_ttl
+        self.enabled = enabled
+
+        self._lock = threading.Lock()
+        self._local: "OrderedDict[Tuple[str, str], Tuple[float, Any]]" = OrderedDict()
+        # 네임스페이스별 Redis 버전 (version, 확인 시각) - local_ttl마다 Redis에서 다시 확인
+        self._versions: Dict[str, Tuple[int, float]] = {}
+        # 네임스페이스별 로컬 무효화 횟수 - 조회 중 무효화된 값을 저장하지 않기 위해 사용
+        self._generations: Dict[str, int] = {}
+        self._stats = {"local_hits": 0, "redis_hits": 0, "misses": 0, "invalidations": 0}
+
+        self._redis_client = None
+        self._pubsub = None
+        self._listener = None
+
+    @property
+    def _redis(self):
+        return self._redis_client.redis_client if self._redis_client is not None else None
+
+    def _version_key(self, namespace: str) -> str:
+        return f"{self.KEY_PREFIX}:{namespace}:version"
+
+    def _data_key(self, namespace: str, version: int, key: str) -> str:
+        return f"{self.KEY_PREFIX}:{namespace}:{version}:{key}"
+
+    def _invalidation_key(self, namespace: str, key: str) -> str:
+        return f"{self.KEY_PREFIX}:{namespace}:invalidated:{key}"
+
+    # ---------------------------------------------------------------- 조회
+
+    def get_or_load(
+        self,
+        namespace: str,
+        key: str,
+        loader: Callable[[], Any],
+        redis_ttl: Optional[int] = None,
+    ) -> Any:
+        """
+        캐시 조회 - 없으면 loader 결과를 저장 후 반환
+
+        Args:
+            namespace: 데이터 종류 (예: "masters", "permissions", "users")
+            key: 네임스페이스 안의 키
+            loader: DB 조회 함수 (JSON 직렬화 가능한 값 반환)
+            redis_ttl: Redis TTL (초, 없으면 기본값)
+        """
+        if not self.enabled:
+            return loader()
+
+        value = self._get_local(namespace, key)
+        if value is not _MISSING:
+            return value
+
+        generation = self._generations.get(namespace, 0)
+        version = self._get_version(namespace)
+        value, marker = self._get_redis(namespace, version, key)
+        if value is not _MISSING:
+            self._incr("redis_hits")
+            self._set_local(namespace, key, value, generation)
+            return value
+
+        self._incr("misses")
+        value = loader()
+        if self._set_local(namespace, key, value, generation) and marker is not None:
+            self._set_redis(namespace, version, key, value, redis_ttl or self.redis_ttl, marker)
+        return value
+
+    def _get_local(self, namespace: str, key: str) -> Any:
+        with self._lock:
+            entry = self._local.get((namespace, key))
+            if entry is None:
+                return _MISSING
+            expires_at, value = entry
+            if expires_at <= time.monotonic():
+                del self._local[(namespace, key)]
+                return _MISSING
+            self._local.move_to_end((namespace, key))
+            self._stats["local_hits"] += 1
+            return value
+
+    def _set_local(self, namespace: str, key: str, value: Any, generation: int) -> bool:
+        """1단계 저장 - 조회 중 네임스페이스가 무효화되었으면 저장하지 않고 False"""
+        with self._lock:
+            if self._generations.get(namespace, 0) != generation:
+                return False
+            self._local[(namespace, key)] = (time.monotonic() + self.local_ttl, value)
+            self._local.move_to_end((namespace, key))
+            while len(self._local) > self.local_max_entries:
+                self._local.popitem(last=False)
+            return True
+
+    def _get_version(self, namespace: str) -> int:
+        """네임스페이스 Redis 버전 (local_ttl 동안 메모리 값 사용)"""
+        cached = self._versions.get(namespace)
+        now = time.monotonic()
+        if cached is not None and now - cached[1] < self.local_ttl:
+            return cached[0]
+        redis = self._redis
+        if redis is None:
+            return 0
+        try:
+            version = int(redis.get(self._version_key(namespace)) or 0)
+        except Exception as e:
+            logger.warning(f"Two-tier cache version read failed for {namespace}: {e}")
+            return cached[0] if cached is not None else 0
+        self._versions[namespace] = (version, now)
+        return version
+
+    def _get_redis(self, namespace: str, version: int, key: str) -> Tuple[Any, Optional[str]]:
+        """
+        2단계 조회
+
+        Returns:
+            (value, marker): value는 없으면 _MISSING,
+            marker는 키 무효화 카운터 (저장 시 비교용, Redis를 사용할 수 없으면 None)
+        """
+        redis = self._redis
+        if redis is None:
+            return _MISSING, None
+        try:
+            raw, marker = redis.mget(
+                self._data_key(namespace, version, key),
+                self._invalidation_key(namespace, key),
+            )
+        except Exception as e:
+            logger.warning(f"Two-tier cache read failed for {namespace}:{key}: {e}")
+            return _MISSING, None
+        if raw is None:
+            return _MISSING, marker or "0"
+        return json.loads(raw), marker or "0"
+
+    def _set_redis(self, namespace: str, version: int, key: str, value: Any, ttl: int, marker: str):
+        """2단계 저장 - 조회 이후 네임스페이스 또는 키가 무효화되었으면 저장하지 않음"""
+        redis = self._redis
+        if redis is None:
+            return
+        try:
+            redis.eval(
+                self._SET_IF_CURRENT_SCRIPT, 3,
+                self._version_key(namespace),
+                self._invalidation_key(namespace, key),
+                self._data_key(namespace, version, key),
+                version, marker,
+                json.dumps(value, ensure_ascii=False),
+                ttl,
+            )
+        except Exception as e:
+            logger.warning(f"Two-tier cache write failed for {namespace}:{key}: {e}")
+
+    # ---------------------------------------------------------------- 무효화
+
+    def invalidate(self, namespace: str, key: Optional[str] = None):
+        """
+        캐시 무효화 (DB 커밋 후 호출)
+
+        Args:
+            namespace: 데이터 종류
+            key: 무효화할 키 (None이면 네임스페이스 전체)
+        """
+        self._incr("invalidations")
+        message = {"namespace": namespace, "key": key}
+        redis = self._redis
+        if redis is not None:
+            try:
+                if key is None:
+                    version = int(redis.incr(self._version_key(namespace)))
+                    message["version"] = version
+                else:
+                    # 무효화 카운터 증가 → 이 키를 조회 중인 다른 워커의 loader 결과는 Redis에 저장되지 않음
+                    version = self._get_version(namespace)
+                    invalidation_key = self._invalidation_key(namespace, key)
+                    pipe = redis.pipeline(transaction=True)
+                    pipe.incr(invalidation_key)
+                    pipe.expire(invalidation_key, self.redis_ttl)
+                    pipe.delete(self._data_key(namespace, version, key))
+                    pipe.execute()
+            except Exception as e:
+                logger.warning(f"Two-tier cache invalidation failed for {namespace}:{key}: {e}")
+
+        self._invalidate_local(namespace, key, message.get("version"))
+
+        if redis is not None:
+            try:
+                redis.publish(self.channel, json.dumps(message))
+            except Exception as e:
+                logger.warning(f"Two-tier cache invalidation publish failed for {namespace}: {e}")
+
+    def _invalidate_local(self, namespace: str, key: Optional[str], version: Optional[int] = None):
+        """1단계 삭제 (요청 스레드 또는 리스너 스레드에서 호출)"""
+        with self._lock:
+            self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            if key is None:
+                for cache_key in [k for k in self._local if k[0] == namespace]:
+                    del self._local[cache_key]
+                if version is not None:
+                    current = self._versions.get(namespace)
+                    if current is None or current[0] < version:
+                        self._versions[namespace] = (version, time.monotonic())
+            else:
+                self._local.pop((namespace, key), None)
+
+    def clear_local(self):
+        """1단계 전체 삭제"""
+        with self._lock:
+            for namespace in {k[0] for k in self._local}:
+                self._generations[namespace] = self._generations.get(namespace, 0) + 1
+            self._local.clear()
+            self._versions.clear()
+
+    def _incr(self, name: str):
+        with self._lock:
+            self._stats[name] += 1
+
+    def stats(self) -> dict:
+        """캐시 지표 (워커 프로세스 단위)"""
+        with self._lock:
+            return {
+                **self._stats,
+                "local_entries": len(self._local),
+                "local_max_entries": self.local_max_entries,
+                "listening": self._listener is not None,
+            }
+
+    # ---------------------------------------------------------------- pub/sub
+
+    def _on_message(self, message: dict):
+        """pub/sub 수신 핸들러 (리스너 스레드에서 호출)"""
+        try:
+            payload = json.loads(message.get("data") or "")
+            self._invalidate_local(payload["namespace"], payload.get("key"), payload.get("version"))
+        except (ValueError, KeyError, TypeError) as e:
+            logger.debug(f"Ignoring malformed two-tier cache invalidation: {e}")
+
+    def _on_listener_error(self, e, pubsub, thread):
+        """리스너 오류 처리 - 놓친 무효화가 있을 수 있으므로 1단계를 비우고 재연결 대기"""
+        logger.warning(f"Two-tier cache listener error (retrying): {e}")
+        self.clear_local()
+        time.sleep(1.0)
+
+    def start(self, redis_client):
+        """Redis 연결 및 무효화 리스너 시작 (앱 시작 시 1회 호출)"""
+        if not self.enabled or redis_client is None or self._listener is not None:
+            return
+
+        try:
+            self._pubsub = redis_client.redis_client.pubsub(ignore_subscribe_messages=True)
+            self._pubsub.subscribe(**{self.channel: self._on_message})
+            self._listener = self._pubsub.run_in_thread(
+                sleep_time=1.0,
+                daemon=True,
+                exception_handler=self._on_listener_error,
+            )
+            # 리스너가 있을 때만 Redis 단계 사용 (무효화를 받지 못하는 워커가 오래된 값을 쓰지 않도록)
+            self._redis_client = redis_client
+            logger.info(f"Two-tier cache listener subscribed: {self.channel}")
+        except Exception as e:
+            logger.warning(f"Two-tier cache listener start failed, local tier only: {e}")
+            self._pubsub = None
+            self._listener = None
+
+    def stop(self):
+        """무효화 리스너 종료"""
+        if self._listener is not None:
+            try:
+                self._listener.stop()
+            except Exception as e:
+                logger.warning(f"Two-tier cache listener stop failed: {e}")
+            self._listener = None
+        if self._pubsub is not None:
+            try:
+                self._pubsub.close()
+            except Exception:
+                pass
+            self._pubsub = None
+        self._redis_client = None
+
+
+# 전역 2단계 캐시 인스턴스 (워커 프로세스당 1개)
+two_tier_cache = None
+
+
+def get_two_tier_cache() -> TwoTierCache:
+    """2단계 캐시 싱글톤 반환"""
+    global two_tier_cache
+    if two_tier_cache is None:
+        from src.config import settings
+
+        two_tier_cache = TwoTierCache(
+            settings.two_tier_cache_channel,
+            local_max_entries=settings.two_tier_cache_local_max_entries,
+            local_ttl=settings.two_tier_cache_local_ttl_seconds,
+            redis_ttl=settings.two_tier_cache_redis_ttl_seconds,
+            enabled=settings.two_tier_cache_enabled,
+        )
+    return two_tier_cache
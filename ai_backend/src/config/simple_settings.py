@@ -107,9 +107,30 @@ class Settings(BaseSettings):
     # database_implicit_returning: bool = Field(default=True, env="DATABASE_IMPLICIT_RETURNING")
     # database_hide_parameters: bool = Field(default=True, env="DATABASE_HIDE_PARAMETERS")
 
+    # Async Database Pool Configuration (asyncpg, 워커 프로세스당 1개)
+    # - 스트리밍/REST 채팅 경로가 사용하는 비동기 엔진의 커넥션 풀
+    # - LLM 응답 대기 중에는 커넥션을 풀에 반환하므로 DB 작업 시점의 동시 사용량만큼 필요
+    # - pool_size + max_overflow는 CHAT_ADMISSION_MAX_CONCURRENT 이상 권장
+    database_async_pool_size: int = Field(default=20, env="DATABASE_ASYNC_POOL_SIZE")
+    database_async_max_overflow: int = Field(default=20, env="DATABASE_ASYNC_MAX_OVERFLOW")
+    database_async_pool_timeout: float = Field(default=30.0, env="DATABASE_ASYNC_POOL_TIMEOUT")
+    database_async_pool_recycle: int = Field(default=1800, env="DATABASE_ASYNC_POOL_RECYCLE")
+
     # LLM Provider Configuration
     llm_provider: str = Field(default="openai", env="LLM_PROVIDER")
 
+    # LLM HTTP Client Pool Configuration
+    # ==========================================
+    # 워커 프로세스당 1회 생성되는 LLM 클라이언트의 커넥션 풀 설정
+    # - 요청마다 클라이언트를 만들지 않고 keep-alive 커넥션을 재사용
+    llm_http_max_connections: int = Field(default=100, env="LLM_HTTP_MAX_CONNECTIONS")
+    llm_http_max_keepalive_connections: int = Field(
+        default=20, env="LLM_HTTP_MAX_KEEPALIVE_CONNECTIONS"
+    )
+    llm_http_keepalive_expiry: float = Field(default=30.0, env="LLM_HTTP_KEEPALIVE_EXPIRY")
+    llm_http_timeout: float = Field(default=120.0, env="LLM_HTTP_TIMEOUT")
+    llm_http_connect_timeout: float = Field(default=10.0, env="LLM_HTTP_CONNECT_TIMEOUT")
+
     # OpenAI Configuration
     openai_api_key: str = Field(default="", env="OPENAI_API_KEY")  # 기본값 추가
     openai_model: str = Field(default="gpt-3.5-turbo", env="OPENAI_MODEL")
@@ -159,6 +180,186 @@ class Settings(BaseSettings):
         default=1800, env="CACHE_TTL_CHAT_MESSAGES"
     )  # 30분
     cache_ttl_user_chats: int = Field(default=600, env="CACHE_TTL_USER_CHATS")  # 10분
+    # 채팅 메시지 캐시(Redis 리스트)에 유지할 최근 메시지 수
+    chat_history_cache_window: int = Field(
+        default=50, env="CHAT_HISTORY_CACHE_WINDOW"
+    )
+    # 캐시 키 조회(SCAN) 설정 - 페이지 크기(SCAN COUNT), 요청당 최대 반환 키 수, 요청당 최대 SCAN 호출 수
+    cache_scan_page_size: int = Field(default=100, env="CACHE_SCAN_PAGE_SIZE")
+    cache_scan_max_keys: int = Field(default=1000, env="CACHE_SCAN_MAX_KEYS")
+    cache_scan_max_calls: int = Field(default=50, env="CACHE_SCAN_MAX_CALLS")
+    # 채팅별 에이전트 요청 컨텍스트(reviewer_count, site_list) 캐시 TTL (초)
+    chat_context_cache_ttl_seconds: int = Field(
+        default=1800, env="CHAT_CONTEXT_CACHE_TTL_SECONDS"
+    )
+    # 참조 데이터(기준정보, 사용자 역할/공정 권한, 사용자 이름) 2단계 캐시
+    # - 워커 메모리 LRU(최대 항목 수, TTL) + Redis(TTL), 변경 시 pub/sub 채널로 모든 워커에 무효화 전파
+    two_tier_cache_enabled: bool = Field(default=True, env="TWO_TIER_CACHE_ENABLED")
+    two_tier_cache_local_max_entries: int = Field(
+        default=2048, env="TWO_TIER_CACHE_LOCAL_MAX_ENTRIES"
+    )
+    two_tier_cache_local_ttl_seconds: float = Field(
+        default=30.0, env="TWO_TIER_CACHE_LOCAL_TTL_SECONDS"
+    )
+    two_tier_cache_redis_ttl_seconds: int = Field(
+        default=600, env="TWO_TIER_CACHE_REDIS_TTL_SECONDS"
+    )
+    two_tier_cache_channel: str = Field(
+        default="two_tier_cache:invalidate", env="TWO_TIER_CACHE_CHANNEL"
+    )
+    # 사용자 역할/접근 가능 공정 캐시의 Redis TTL (초) - 그룹 변경 시 무효화되지만 DB 직접 변경 대비 짧게 유지
+    permission_cache_ttl_seconds: int = Field(
+        default=60, env="PERMISSION_CACHE_TTL_SECONDS"
+    )
+    # 앱 시작 시 USER_EFFECTIVE_PERMISSIONS 유지 트리거 설치 + 전체 재계산 여부
+    effective_permissions_rebuild_on_startup: bool = Field(
+        default=True, env="EFFECTIVE_PERMISSIONS_REBUILD_ON_STARTUP"
+    )
+
+    # External API Resilience Configuration
+    # ==========================================
+    # - 연결 타임아웃은 LLM_HTTP_CONNECT_TIMEOUT 사용
+    # - 첫 청크 데드라인: 에이전트가 이 시간 안에 첫 이벤트를 보내지 않으면 재시도/실패
+    # - 전체 데드라인: 스트림 전체 허용 시간
+    external_api_first_token_timeout: float = Field(
+        default=60.0, env="EXTERNAL_API_FIRST_TOKEN_TIMEOUT"
+    )
+    external_api_overall_timeout: float = Field(
+        default=300.0, env="EXTERNAL_API_OVERALL_TIMEOUT"
+    )
+    # 첫 청크 전 실패 시 재시도 횟수와 백오프(지수 증가 + jitter) 범위 (초)
+    external_api_max_retries: int = Field(default=2, env="EXTERNAL_API_MAX_RETRIES")
+    external_api_retry_base_delay: float = Field(default=0.5, env="EXTERNAL_API_RETRY_BASE_DELAY")
+    external_api_retry_max_delay: float = Field(default=4.0, env="EXTERNAL_API_RETRY_MAX_DELAY")
+
+    # 회로 차단기 - 연속 실패 횟수가 임계값에 도달하면 reset 시간 동안 즉시 실패
+    llm_breaker_failure_threshold: int = Field(default=5, env="LLM_BREAKER_FAILURE_THRESHOLD")
+    llm_breaker_reset_seconds: float = Field(default=30.0, env="LLM_BREAKER_RESET_SECONDS")
+
+    # 채팅 제목 생성 헤지 요청 지연 (초) - 이 시간 안에 응답이 없으면 같은 요청을 한 번 더 보냄, 0이면 사용 안 함
+    title_hedge_delay_seconds: float = Field(default=1.5, env="TITLE_HEDGE_DELAY_SECONDS")
+
+    # Title Generation Configuration
+    # ==========================================
+    # 첫 메시지 시 임시 제목을 바로 저장하고 LLM 제목은 백그라운드에서 생성 (False면 기존처럼 요청 안에서 생성)
+    title_generation_background: bool = Field(default=True, env="TITLE_GENERATION_BACKGROUND")
+    # 배치 크기 / 배치를 모으는 시간 (밀리초)
+    title_generation_batch_size: int = Field(default=8, env="TITLE_GENERATION_BATCH_SIZE")
+    title_generation_batch_window_ms: int = Field(default=200, env="TITLE_GENERATION_BATCH_WINDOW_MS")
+    # 대기 작업 상한 - 넘으면 임시 제목 유지
+    title_generation_max_pending: int = Field(default=1000, env="TITLE_GENERATION_MAX_PENDING")
+
+    # Chat Cancellation Configuration
+    # ==========================================
+    # 스트리밍 취소 신호를 워커 간에 전달하는 Redis pub/sub 채널
+    chat_cancel_channel: str = Field(default="chat:cancel", env="CHAT_CANCEL_CHANNEL")
+
+    # 취소 상태 fallback 확인 주기 (초)
+    # - pub/sub 신호를 놓친 경우를 대비해 Redis 취소 키/DB 상태를 확인하는 최소 간격
+    # - 청크마다 확인하지 않고 이 주기마다 한 번만 확인
+    chat_cancel_check_interval: float = Field(
+        default=2.0, env="CHAT_CANCEL_CHECK_INTERVAL"
+    )
+
+    # Chat Stream Persistence Configuration
+    # ==========================================
+    # 스트리밍 중 부분 응답을 DB에 체크포인트하는 주기
+    # - 청크 수 또는 경과 시간 중 먼저 도달한 조건으로 1회 UPDATE
+    # - 워커가 비정상 종료되어도 마지막 체크포인트까지의 응답은 보존됨
+    chat_stream_checkpoint_chunks: int = Field(
+        default=50, env="CHAT_STREAM_CHECKPOINT_CHUNKS"
+    )
+    chat_stream_checkpoint_interval_ms: int = Field(
+        default=2000, env="CHAT_STREAM_CHECKPOINT_INTERVAL_MS"
+    )
+
+    # generating 상태로 남은 메시지를 중단된 것으로 간주하는 시간 (초)
+    # - 앱 시작 시 마지막 체크포인트가 이 시간 이상 갱신되지 않은 generating 메시지를 error로 정리
+    # - 체크포인트 없이 대기할 수 있는 최대 시간(어드미션 대기 + 첫 응답까지의 LLM 타임아웃)보다 커야 함
+    chat_stream_stale_after_seconds: int = Field(
+        default=900, env="CHAT_STREAM_STALE_AFTER_SECONDS"
+    )
+
+    # SSE 응답 청크 병합 창
+    # - 연속된 ai_response_chunk를 window_ms 또는 max_bytes 중 먼저 도달한 조건까지 모아 1개 프레임으로 전송
+    # - window_ms=0이면 청크마다 바로 전송
+    chat_stream_coalesce_window_ms: int = Field(
+        default=50, env="CHAT_STREAM_COALESCE_WINDOW_MS"
+    )
+    chat_stream_coalesce_max_bytes: int = Field(
+        default=2048, env="CHAT_STREAM_COALESCE_MAX_BYTES"
+    )
+
+    # 스트림 재연결(Last-Event-ID)용 Redis Stream 이벤트 로그
+    # - 채팅별 최대 보관 이벤트 수(MAXLEN, 근사 trim)와 마지막 이벤트 이후 보관 시간(초)
+    chat_stream_replay_maxlen: int = Field(
+        default=1000, env="CHAT_STREAM_REPLAY_MAXLEN"
+    )
+    chat_stream_replay_ttl_seconds: int = Field(
+        default=300, env="CHAT_STREAM_REPLAY_TTL_SECONDS"
+    )
+
+    # 재연결 스트림의 XREAD BLOCK 동시 수 상한 (워커 단위)
+    # - 블로킹 중에는 공용 비동기 Redis 풀(REDIS_MAX_CONNECTIONS) 연결을 점유하므로,
+    #   상한을 넘는 재연결은 연결을 점유하지 않는 폴링으로 이어받음
+    chat_stream_replay_max_blocking_followers: int = Field(
+        default=50, env="CHAT_STREAM_REPLAY_MAX_BLOCKING_FOLLOWERS"
+    )
+
+    # 동일 요청 single-flight 점유 유지 시간 (초)
+    # - 같은 채팅에 같은 프롬프트가 진행 중이면 새로 생성하지 않고 진행 중인 스트림에 연결
+    # - 생성 중에는 이벤트 기록/heartbeat마다 만료 시간을 연장 (대기열·LLM 대기가 길어도 점유 유지)
+    # - 워커가 비정상 종료된 경우 마지막 연장 후 이 시간이 지나면 점유가 풀림
+    chat_stream_inflight_ttl_seconds: int = Field(
+        default=120, env="CHAT_STREAM_INFLIGHT_TTL_SECONDS"
+    )
+
+    # Chat Stream Heartbeat Configuration
+    # ==========================================
+    # SSE heartbeat 전송 주기 (초) - Nginx 타임아웃(60초) 대비
+    chat_heartbeat_interval_seconds: float = Field(
+        default=10.0, env="CHAT_HEARTBEAT_INTERVAL_SECONDS"
+    )
+
+    # heartbeat 스케줄러 tick 간격 (초)
+    # - 워커당 단일 task가 tick마다 타이머 휠의 슬롯 1개만 처리
+    # - 값이 작을수록 heartbeat 시점이 정확하지만 wakeup이 늘어남
+    chat_heartbeat_tick_seconds: float = Field(
+        default=1.0, env="CHAT_HEARTBEAT_TICK_SECONDS"
+    )
+
+    # Generation Admission Control
+    # ==========================================
+    # 워커당 동시 LLM 생성 수 / 사용자당 동시 생성 수
+    # - 한도를 넘는 요청은 실패하지 않고 대기하며 queued 이벤트(대기 순번)를 받음
+    chat_admission_max_concurrent: int = Field(default=32, env="CHAT_ADMISSION_MAX_CONCURRENT")
+    chat_admission_max_per_user: int = Field(default=2, env="CHAT_ADMISSION_MAX_PER_USER")
+    # 클러스터 전체 생성 시작 속도 (초당 토큰, Redis 토큰 버킷) - 0이면 사용 안 함
+    chat_admission_bucket_rate: float = Field(default=0.0, env="CHAT_ADMISSION_BUCKET_RATE")
+    chat_admission_bucket_capacity: int = Field(default=20, env="CHAT_ADMISSION_BUCKET_CAPACITY")
+    # 최대 대기 시간 (초) - 초과 시 CHAT_RATE_LIMIT_EXCEEDED
+    chat_admission_queue_timeout_seconds: float = Field(
+        default=120.0, env="CHAT_ADMISSION_QUEUE_TIMEOUT_SECONDS"
+    )
+
+    # Semantic Response Cache Configuration (opt-in)
+    # ==========================================
+    # 같은 PLC에 대한 비슷한 질문은 LLM을 호출하지 않고 이전 응답을 재사용
+    # - 키: PLC UUID + 현재 Program 매핑 + 정규화된 질문 임베딩
+    # - PLC의 Program 매핑이 바뀌면 이전 응답은 사용되지 않음
+    semantic_cache_enabled: bool = Field(default=False, env="SEMANTIC_CACHE_ENABLED")
+    # 코사인 유사도 임계값 (이상이면 캐시 응답 사용)
+    semantic_cache_threshold: float = Field(default=0.92, env="SEMANTIC_CACHE_THRESHOLD")
+    semantic_cache_ttl_seconds: int = Field(default=86400, env="SEMANTIC_CACHE_TTL_SECONDS")
+    # PLC 매핑별 최대 저장 응답 수
+    semantic_cache_max_entries: int = Field(default=200, env="SEMANTIC_CACHE_MAX_ENTRIES")
+    semantic_cache_embedding_model: str = Field(
+        default="text-embedding-3-small", env="SEMANTIC_CACHE_EMBEDDING_MODEL"
+    )
+    # 임베딩 차원 수 (0이면 모델 기본값)
+    semantic_cache_embedding_dimensions: int = Field(
+        default=256, env="SEMANTIC_CACHE_EMBEDDING_DIMENSIONS"
+    )
 
     # Redis Configuration (캐시가 활성화된 경우에만 사용)
     redis_host: str = Field(default="localhost", env="REDIS_HOST")
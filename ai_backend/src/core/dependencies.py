@@ -21,6 +21,7 @@ logger = logging.getLogger(__name__)
 # 전역 인스턴스들 (싱글톤)
 _db_instance = None
 _redis_instance = None
+_async_redis_instance = None
 
 
 def get_database() -> Database:
@@ -91,12 +92,50 @@ def get_redis_client():
         return None
 
 
+def get_async_redis_client():
+    """비동기 Redis 클라이언트 의존성 주입 (싱글톤, 캐시 비활성화/연결 실패 시 None)"""
+    global _async_redis_instance
+
+    # 동기 클라이언트 연결이 확인된 경우에만 비동기 클라이언트 사용
+    if get_redis_client() is None:
+        return None
+
+    if _async_redis_instance is None:
+        from src.cache.redis_client import AsyncRedisClient
+
+        _async_redis_instance = AsyncRedisClient()
+    return _async_redis_instance
+
+
+async def close_async_resources():
+    """비동기 Redis 클라이언트와 비동기 DB 엔진 종료 (앱 종료 시 호출)"""
+    global _async_redis_instance
+
+    if _async_redis_instance is not None:
+        try:
+            await _async_redis_instance.close()
+        except Exception as e:
+            logger.warning(f"Async Redis client close failed: {e}")
+        _async_redis_instance = None
+
+    if _db_instance is not None:
+        await _db_instance.aclose()
+
+
 def get_llm_chat_service(
-    db: Session = Depends(get_db), redis_client=Depends(get_redis_client)
+    db: Session = Depends(get_db),
+    redis_client=Depends(get_redis_client),
+    async_redis_client=Depends(get_async_redis_client),
 ) -> LLMChatService:
     """LLM 채팅 서비스 의존성 주입 (Redis fallback 지원)"""
     # LLMChatService는 환경 변수에서 LLM 제공자를 자동으로 선택
-    return LLMChatService(db=db, redis_client=redis_client)
+    # 스트리밍 경로는 비동기 세션(asyncpg)/비동기 Redis를 사용
+    return LLMChatService(
+        db=db,
+        redis_client=redis_client,
+        async_session_factory=get_database().async_session,
+        async_redis_client=async_redis_client,
+    )
 
 
 def get_document_service(db: Session = Depends(get_db)) -> DocumentService:
@@ -223,13 +262,13 @@ def get_user_name(
         # users 테이블에서 name 조회
 
         user_crud = UserCRUD(db)
-        user = user_crud.get_user(user_id)
+        profile = user_crud.get_user_profile(user_id)
 
-        if user and user.name:
+        if profile and profile["name"]:
             logger.debug(
-                "사용자 이름 조회 성공: user_id=%s, name=%s", user_id, user.name
+                "사용자 이름 조회 성공: user_id=%s, name=%s", user_id, profile["name"]
             )
-            return user.name
+            return profile["name"]
 
         logger.warning(
             "사용자를 찾을 수 없습니다: user_id=%s. 기본값 반환: %s",
@@ -351,8 +390,6 @@ def get_accessible_process_ids_dependency(
     Raises:
         HTTPException: 사용자 ID가 없으면 400 에러
     """
-    from src.database.crud.program_crud import ProgramCRUD
-
     check_user_id = getattr(request.state, "user_id", None)
     if not check_user_id:
         raise HTTPException(
@@ -360,8 +397,36 @@ def get_accessible_process_ids_dependency(
             detail="사용자 ID가 필요합니다.",
         )
 
-    program_crud = ProgramCRUD(db)
-    return program_crud.get_accessible_process_ids(check_user_id)
+    return resolve_accessible_process_ids(request, check_user_id, db)
+
+
+def resolve_accessible_process_ids(
+    request: Request, user_id: str, db: Session
+) -> Optional[List[str]]:
+    """
+    요청 단위로 메모이즈된 접근 가능한 공정 ID 목록 반환
+
+    한 요청에서 check_any_role_dependency와 get_accessible_process_ids_dependency가
+    모두 실행되어도 권한 조회는 1번만 수행합니다 (결과는 request.state에 사용자별 저장).
+    사용자별 조회 결과는 2단계 캐시에도 저장되므로 캐시 hit 시 DB 조회가 없습니다.
+
+    Args:
+        request: FastAPI Request 객체
+        user_id: 사용자 ID
+        db: 데이터베이스 세션
+
+    Returns:
+        Optional[List[str]]: ProgramCRUD.get_accessible_process_ids()와 동일
+    """
+    from src.database.crud.program_crud import ProgramCRUD
+
+    memo = getattr(request.state, "accessible_process_ids_by_user", None)
+    if memo is None:
+        memo = {}
+        request.state.accessible_process_ids_by_user = memo
+    if user_id not in memo:
+        memo[user_id] = ProgramCRUD(db).get_accessible_process_ids(user_id)
+    return memo[user_id]
 
 
 def get_user_roles_dependency(
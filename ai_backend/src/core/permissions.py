@@ -100,25 +100,19 @@ def get_user_roles(user_id: str, db: Session) -> List[str]:
 
     Returns:
         List[str]: 역할 ID 목록 (예: ['system_admin'], ['process_manager'], [])
+
+    Note:
+        USER_EFFECTIVE_PERMISSIONS PK 조회 (2단계 캐시 사용, 활성 그룹만 반영)
     """
     try:
-        from src.database.models.permission_group_models import (
-            PermissionGroup,
-            UserGroupMapping,
+        from src.database.crud.effective_permission_crud import (
+            EffectivePermissionCRUD,
         )
 
-        groups = (
-            db.query(PermissionGroup)
-            .join(
-                UserGroupMapping, PermissionGroup.group_id == UserGroupMapping.group_id
-            )
-            .filter(UserGroupMapping.user_id == user_id)
-            .all()
+        return list(
+            EffectivePermissionCRUD(db).get_effective_permissions(user_id)["role_ids"]
         )
 
-        roles = [group.role_id for group in groups]
-        return list(set(roles))  # 중복 제거
-
     except Exception as e:
         logger.error(f"사용자 역할 조회 실패: user_id={user_id}, error={str(e)}")
         return []
@@ -252,7 +246,7 @@ def check_any_role_dependency(
     라우터에서 다음과 같이 사용:
         _: None = Depends(check_any_role_dependency)
     """
-    from src.core.dependencies import resolve_user_id
+    from src.core.dependencies import resolve_accessible_process_ids, resolve_user_id
 
     # request.state.user_id 우선 사용 (미들웨어에서 설정된 경우), 없으면 파라미터 user_id 사용 (테스트용)
     check_user_id = resolve_user_id(request, user_id)
@@ -263,7 +257,10 @@ def check_any_role_dependency(
             detail="사용자 ID가 필요합니다.",
         )
 
-    check_any_role(check_user_id, db)
+    # 같은 요청의 get_accessible_process_ids_dependency와 조회 결과 공유
+    _require_any_role(
+        check_user_id, resolve_accessible_process_ids(request, check_user_id, db)
+    )
 
 
 def check_any_role(user_id: str, db: Session) -> None:
@@ -279,8 +276,11 @@ def check_any_role(user_id: str, db: Session) -> None:
         HTTPException: 권한이 없을 때 403 에러
     """
     program_crud = ProgramCRUD(db)
-    accessible_process_ids = program_crud.get_accessible_process_ids(user_id)
+    _require_any_role(user_id, program_crud.get_accessible_process_ids(user_id))
+
 
+def _require_any_role(user_id: str, accessible_process_ids: Optional[List[str]]) -> None:
+    """접근 가능한 공정 ID 목록 기준 역할 체크 (일반 사용자면 403)"""
     # 모든 공정 접근 가능 (system_admin 또는 process_admin)이면 허용
     if is_all_processes_accessible(accessible_process_ids):
         return
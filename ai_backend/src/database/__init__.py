@@ -33,4 +33,5 @@ __all__ = [
     "PermissionGroup",
     "GroupProcessPermission",
     "UserGroupMapping",
+    "UserEffectivePermission",
 ]
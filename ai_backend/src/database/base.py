@@ -4,9 +4,10 @@
 import logging
 import os
 import re
-from contextlib import contextmanager
+from contextlib import asynccontextmanager, contextmanager
 
 from sqlalchemy import create_engine, inspect, orm, text
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
 
 logger = logging.getLogger(__name__)
@@ -115,6 +116,13 @@ class Database:
             autoflush=False,
             bind=self._engine,
         )
+        
+        # 비동기 엔진 (asyncpg) - 스트리밍 채팅 등 이벤트 루프 안에서 사용하는 경로용
+        # 첫 사용 시 생성 (동기 경로만 사용하는 프로세스는 asyncpg 커넥션을 만들지 않음)
+        self._async_database_url = database_url.replace('postgresql://', 'postgresql+asyncpg://', 1)
+        self._async_connect_args = {"server_settings": {"search_path": schema}} if schema else {}
+        self._async_engine = None
+        self._async_session_factory = None
 
     def create_database(self, checkfirst=True):
         """
@@ -420,6 +428,53 @@ class Database:
         finally:
             session.close()
 
+    def _get_async_session_factory(self) -> async_sessionmaker:
+        """비동기 세션 팩토리 반환 (없으면 엔진과 함께 생성, 풀 크기는 DATABASE_ASYNC_* 설정)"""
+        if self._async_session_factory is None:
+            from src.config import settings
+
+            self._async_engine = create_async_engine(
+                self._async_database_url,
+                connect_args=self._async_connect_args,
+                pool_pre_ping=True,
+                pool_size=settings.database_async_pool_size,
+                max_overflow=settings.database_async_max_overflow,
+                pool_timeout=settings.database_async_pool_timeout,
+                pool_recycle=settings.database_async_pool_recycle,
+            )
+            self._async_session_factory = async_sessionmaker(
+                bind=self._async_engine,
+                class_=AsyncSession,
+                autoflush=False,
+                expire_on_commit=False,
+            )
+        return self._async_session_factory
+
+    @asynccontextmanager
+    async def async_session(self):
+        """
+        비동기 데이터베이스 세션 컨텍스트 매니저 (AsyncSession + asyncpg)
+        
+        사용 예시:
+            async with db.async_session() as session:
+                result = await session.execute(select(Model))
+        """
+        session = self._get_async_session_factory()()
+        try:
+            yield session
+        except Exception:
+            await session.rollback()
+            raise
+        finally:
+            await session.close()
+
+    async def aclose(self):
+        """비동기 엔진 연결 종료"""
+        if self._async_engine is not None:
+            await self._async_engine.dispose()
+            self._async_engine = None
+            self._async_session_factory = None
+
     def close(self):
         """데이터베이스 연결 종료"""
         if hasattr(self, '_session_factory'):
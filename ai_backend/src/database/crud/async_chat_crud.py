@@ -0,0 +1,460 @@
+# _*_ coding: utf-8 _*_
+"""Async Chat CRUD operations (AsyncSession) for the streaming chat path."""
+import logging
+from datetime import datetime
+from typing import List, Optional
+from zoneinfo import ZoneInfo
+
+from sqlalchemy import and_, case, desc, func, or_, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+from src.database.crud.chat_crud import ChatCRUD
+from src.database.models.chat_models import Chat, ChatMessage
+from src.types.response.exceptions import HandledException
+from src.types.response.response_code import ResponseCode
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncChatCRUD:
+    """
+    Chat 관련 CRUD 작업을 처리하는 비동기 클래스 - AsyncSession(asyncpg) 기반
+
+    스트리밍 채팅 경로에서 이벤트 루프를 막지 않도록 ChatCRUD의 필요한 작업만 비동기로 제공
+    메시지 변환/직렬화 규칙과 캐시 갱신 정책은 ChatCRUD와 동일
+    """
+
+    # 세션을 사용하지 않는 변환/검사 로직은 ChatCRUD와 공유
+    _to_history_item = ChatCRUD._to_history_item
+    _safe_json_serialize = ChatCRUD._safe_json_serialize
+    _safe_error_message = ChatCRUD._safe_error_message
+    _has_reviewer_type = ChatCRUD._has_reviewer_type
+
+    def __init__(
+        self,
+        session: AsyncSession,
+        redis_client=None,
+        cache_window: int = 50,
+        cache_ttl: int = 1800,
+    ):
+        self.session = session
+        self.redis_client = redis_client  # AsyncRedisClient
+        self.cache_window = cache_window
+        self.cache_ttl = cache_ttl
+
+    async def _append_message_cache(self, message: ChatMessage, plc_active: bool):
+        """완료된 메시지를 채팅 메시지 캐시에 추가 (캐시 실패는 무시)"""
+        if self.redis_client is None:
+            return
+        try:
+            await self.redis_client.append_chat_cache(
+                message.chat_id,
+                self._to_history_item(message, plc_active=plc_active),
+                max_messages=self.cache_window,
+                expire_seconds=self.cache_ttl,
+            )
+        except Exception as e:
+            logger.warning(f"Chat cache append failed for chat {message.chat_id}: {e}")
+
+    async def _is_plc_active(self, plc_uuid: Optional[str]) -> bool:
+        """메시지 캐시용 PLC 활성 여부 (ChatCRUD.get_messages_from_db와 같은 규칙)"""
+        if not plc_uuid:
+            return False
+        from src.database.models.plc_models import PLC
+
+        result = await self.session.execute(
+            select(PLC.plc_uuid)
+            .where(PLC.plc_uuid == plc_uuid)
+            .where(PLC.is_active == True)
+        )
+        return result.first() is not None
+
+    async def _invalidate_message_cache(self, chat_id: str):
+        """채팅 메시지 캐시 삭제 (캐시 실패는 무시)"""
+        if self.redis_client is None or not chat_id:
+            return
+        try:
+            await self.redis_client.delete_chat_messages(chat_id)
+        except Exception as e:
+            logger.warning(f"Chat cache invalidation failed for chat {chat_id}: {e}")
+
+    async def get_chat(self, chat_id: str) -> Optional[Chat]:
+        """채팅 조회"""
+        try:
+            result = await self.session.execute(select(Chat).where(Chat.chat_id == chat_id))
+            return result.scalars().first()
+        except Exception as e:
+            logger.error(f"Database error getting chat: {str(e)}")
+            raise HandledException(ResponseCode.DATABASE_QUERY_ERROR, e=e)
+
+    async def create_chat(self, chat_id: str, chat_title: str, user_id: str) -> Chat:
+        """채팅 생성"""
+        try:
+            chat = Chat(
+                chat_id=chat_id,
+                chat_title=chat_title,
+                user_id=user_id,
+                create_dt=datetime.now(ZoneInfo("Asia/Seoul")),
+                is_active=True,  # 활성 상태로 생성
+            )
+            self.session.add(chat)
+            await self.session.commit()
+            return chat
+        except Exception as e:
+            logger.error(f"Database error creating chat: {str(e)}")
+            await self.session.rollback()
+            raise HandledException(ResponseCode.DATABASE_QUERY_ERROR, e=e)
+
+    async def get_chat_or_create(self, chat_id: str, user_id: str = "user") -> Chat:
+        """채팅이 없으면 생성하고 반환"""
+        chat = await self.get_chat(chat_id)
+        if not chat:
+            chat = await self.create_chat(
+                chat_id=chat_id,
+                chat_title=f"Chat {chat_id}",
+                user_id=user_id,
+            )
+        return chat
+
+    async def replace_chat_title(self, chat_id: str, new_title: str, expected_titles: List[str]) -> bool:
+        """현재 제목이 expected_titles 중 하나일 때만 제목 변경 (사용자가 바꾼 제목은 유지)"""
+        try:
+            result = await self.session.execute(
+                update(Chat)
+                .where(
+                    Chat.chat_id == chat_id,
+                    Chat.chat_title.in_(expected_titles),
+                    Chat.is_active == True,
+                )
+                .values(chat_title=new_title)
+            )
+            await self.session.commit()
+            return result.rowcount > 0
+        except Exception as e:
+            logger.error(f"Database error replacing chat title: {str(e)}")
+            await self.session.rollback()
+            raise HandledException(ResponseCode.DATABASE_QUERY_ERROR, e=e)
+
+    async def create_message(
+        self,
+        message_id: str,
+        chat_id: str,
+        user_id: str,
+        message: str,
+        message_type: str = "text",
+        status: str = None,
+        is_cancelled: bool = False,
+        plc_uuid: str = None,
+        token_count: int = None,
+    ) -> ChatMessage:
+        """메시지 생성 (채팅 마지막 메시지 시간과 같은 트랜잭션)"""
+        try:
+            chat_message = ChatMessage(
+                message_id=message_id,
+                chat_id=chat_id,
+                user_id=user_id,
+                message=message,
+                message_type=message_type,
+                status=status,
+                is_cancelled=is_cancelled,
+                is_deleted=False,
+                plc_uuid=plc_uuid,
+                token_count=token_count,
+                create_dt=datetime.now(ZoneInfo("Asia/Seoul")),
+            )
+            self.session.add(chat_message)
+            await self.session.execute(
+                update(Chat)
+                .where(Chat.chat_id == chat_id)
+                .values(last_message_at=chat_message.create_dt)
+            )
+            # 생성 중(generating) 메시지는 완료 시점에 캐시에 추가 (PLC 활성 여부는 같은 트랜잭션에서 조회)
+            cache_message = status != "generating" and self.redis_client is not None
+            plc_active = cache_message and await self._is_plc_active(plc_uuid)
+            await self.session.commit()
+
+            if cache_message:
+                await self._append_message_cache(chat_message, plc_active)
+
+            return chat_message
+        except Exception as e:
+            logger.error(f"Database error creating message: {str(e)}")
+            await self.session.rollback()
+            raise HandledException(ResponseCode.DATABASE_QUERY_ERROR, e=e)
+
+    async def save_user_message(
+        self,
+        message_id: str,
+        chat_id: str,
+        user_id: str,
+        message: str,
+        plc_uuid: str = None,
+        token_count: int = None,
+    ) -> ChatMessage:
+        """사용자 메시지 저장"""
+        return await self.create_message(
+            message_id=message_id,
+            chat_id=chat_id,
+            user_id=user_id,
+            message=message,
+            message_type="user",
+            status="completed",
+            plc_uuid=plc_uuid,
+            token_count=token_count,
+        )
+
+    async def save_ai_message(
+        self,
+        message_id: str,
+        chat_id: str,
+        user_id: str,
+        message: str,
+        status: str = "completed",
+        plc_uuid: str = None,
+        token_count: int = None,
+    ) -> ChatMessage:
+        """AI 메시지 저장"""
+        return await self.create_message(
+            message_id=message_id,
+            chat_id=chat_id,
+            user_id=user_id,
+            message=message,
+            message_type="assistant",
+            status=status,
+            plc_uuid=plc_uuid,
+            token_count=token_count,
+        )
+
+    async def save_ai_message_generating(
+        self,
+        message_id: str,
+        chat_id: str,
+        user_id: str,
+        plc_uuid: str = None,
+    ) -> ChatMessage:
+        """AI 메시지를 generating 상태로 저장"""
+        return await self.create_message(
+            message_id=message_id,
+            chat_id=chat_id,
+            user_id=user_id,
+            message="",  # 빈 메시지로 시작
+            message_type="assistant",
+            status="generating",
+            plc_uuid=plc_uuid,
+        )
+
+    async def release_connection(self):
+        """
+        읽기 트랜잭션 종료 후 커넥션을 풀에 반환 (LLM 응답 대기 중 idle in transaction 방지)
+
+        세션은 계속 사용할 수 있으며, 다음 쿼리에서 커넥션을 다시 가져옴
+        """
+        try:
+            await self.session.commit()
+        except Exception as e:
+            await self.session.rollback()
+            logger.warning(f"Failed to release database connection: {str(e)}")
+
+    async def get_messages(self, chat_id: str, limit: int = 50, before: Optional[str] = None) -> List[ChatMessage]:
+        """특정 채팅의 최근 메시지 조회 (오래된 것부터 정렬하여 반환) - ChatCRUD.get_messages와 동일"""
+        try:
+            query = select(ChatMessage)\
+                .where(ChatMessage.chat_id == chat_id)\
+                .where(ChatMessage.is_deleted == False)
+
+            if before:
+                cursor_result = await self.session.execute(
+                    select(ChatMessage.create_dt, ChatMessage.message_id)
+                    .where(ChatMessage.message_id == before)
+                    .where(ChatMessage.chat_id == chat_id)
+                )
+                cursor = cursor_result.first()
+                if cursor is None:
+                    return []
+                query = query.where(
+                    or_(
+                        ChatMessage.create_dt < cursor.create_dt,
+                        and_(
+                            ChatMessage.create_dt == cursor.create_dt,
+                            ChatMessage.message_id < cursor.message_id,
+                        ),
+                    )
+                )
+
+            result = await self.session.execute(
+                query.order_by(desc(ChatMessage.create_dt), desc(ChatMessage.message_id)).limit(limit)
+            )
+            messages = list(result.scalars().all())
+            messages.reverse()
+            return messages
+        except Exception as e:
+            logger.error("Database error getting messages: " + str(e))
+            raise HandledException(ResponseCode.DATABASE_QUERY_ERROR, e=e)
+
+    async def get_plc_mapping_version(self, plc_uuid: str) -> Optional[str]:
+        """
+        PLC의 현재 Program 매핑 버전 (program_id + mapping_dt)
+
+        매핑된 Program이 없거나 삭제된 PLC면 None
+        """
+        from src.database.models.plc_models import PLC
+
+        try:
+            result = await self.session.execute(
+                select(PLC.program_id, PLC.mapping_dt)
+                .where(PLC.plc_uuid == plc_uuid)
+                .where(PLC.is_deleted.is_(False))
+            )
+            row = result.first()
+            if not row or not row.program_id:
+                return None
+            mapping_ts = int(row.mapping_dt.timestamp()) if row.mapping_dt else 0
+            return f"{row.program_id}:{mapping_ts}"
+        except Exception as e:
+            logger.error(f"Database error getting PLC mapping version: {str(e)}")
+            return None
+
+    async def get_reviewer_count(self, chat_id: str) -> int:
+        """채팅의 reviewer_count 조회"""
+        try:
+            result = await self.session.execute(
+                select(Chat.reviewer_count).where(Chat.chat_id == chat_id)
+            )
+            return result.scalar() or 0  # 없거나 None인 경우 0 반환
+        except Exception as e:
+            logger.error(f"Database error getting reviewer count: {str(e)}")
+            return 0  # 오류 시 기본값 0 반환
+
+    async def is_message_cancelled(self, message_id: str) -> bool:
+        """메시지 취소 여부 조회 (단일 행의 상태 컬럼만 조회)"""
+        try:
+            result = await self.session.execute(
+                select(ChatMessage.status, ChatMessage.is_cancelled)
+                .where(ChatMessage.message_id == message_id)
+            )
+            row = result.first()
+            if not row:
+                return False
+            return bool(row.is_cancelled) or row.status == "cancelled"
+        except Exception as e:
+            logger.error(f"Database error checking message cancellation: {str(e)}")
+            raise HandledException(ResponseCode.DATABASE_QUERY_ERROR, e=e)
+
+    async def checkpoint_ai_message(self, message_id: str, content: str):
+        """스트리밍 중인 AI 메시지의 부분 응답 저장 (단일 UPDATE)"""
+        try:
+            await self.session.execute(
+                update(ChatMessage)
+                .where(ChatMessage.message_id == message_id)
+                .values(message=content, update_dt=datetime.now(ZoneInfo("Asia/Seoul")))
+            )
+            await self.session.commit()
+        except Exception as e:
+            await self.session.rollback()
+            logger.error(f"Database error checkpointing AI message: {str(e)}")
+            raise HandledException(ResponseCode.DATABASE_QUERY_ERROR, e=e)
+
+    async def complete_ai_message(
+        self,
+        message_id: str,
+        chat_id: str,
+        content: str,
+        external_api_nodes: dict = None,
+        token_count: int = None,
+        has_reviewer: Optional[bool] = None,
+    ):
+        """
+        AI 메시지 완료 처리 - 메시지 내용/상태, 노드 데이터, reviewer_count, 마지막 메시지 시간을 한 트랜잭션으로 저장
+
+        has_reviewer를 전달하면(스트리밍 중 확인한 값) 노드 데이터 전체 검사를 생략
+        """
+        try:
+            now = datetime.now(ZoneInfo("Asia/Seoul"))
+            message_values = {
+                "message": content,
+                "status": "completed",
+                "is_cancelled": False,
+                "token_count": token_count,
+                "update_dt": now,
+            }
+            chat_values = {
+                "last_message_at": now,
+            }
+
+            # External API 노드 데이터가 있으면 안전하게 저장하고 reviewer_count 갱신
+            if external_api_nodes:
+                message_values["external_api_nodes"] = self._safe_json_serialize(external_api_nodes)
+                if has_reviewer is None:
+                    has_reviewer = self._has_reviewer_type(external_api_nodes)
+                if has_reviewer:
+                    # 0 -> 1, 1 -> 2 (increment_reviewer_count와 동일한 규칙)
+                    chat_values["reviewer_count"] = case(
+                        (func.coalesce(Chat.reviewer_count, 0) == 0, 1),
+                        else_=2,
+                    )
+                else:
+                    chat_values["reviewer_count"] = 0
+
+            await self.session.execute(
+                update(ChatMessage).where(ChatMessage.message_id == message_id).values(**message_values)
+            )
+            await self.session.execute(
+                update(Chat).where(Chat.chat_id == chat_id).values(**chat_values)
+            )
+
+            # 캐시에 추가할 메시지와 PLC 활성 여부는 커밋 전 같은 트랜잭션에서 조회
+            # (커밋 후 조회로 트랜잭션이 다시 열린 채 남지 않도록)
+            message = None
+            plc_active = False
+            if self.redis_client is not None:
+                result = await self.session.execute(
+                    select(ChatMessage).where(ChatMessage.message_id == message_id)
+                )
+                message = result.scalars().first()
+                plc_active = message is not None and await self._is_plc_active(message.plc_uuid)
+            await self.session.commit()
+
+            if message:
+                await self._append_message_cache(message, plc_active)
+        except Exception as e:
+            await self.session.rollback()
+            logger.error(f"Database error completing AI message: {str(e)}")
+            raise HandledException(ResponseCode.DATABASE_QUERY_ERROR, e=e)
+
+    async def update_message_to_cancelled(self, message_id: str, chat_id: str = None):
+        """생성 중인 메시지를 취소 상태로 업데이트 (상태와 내용을 한 번에 갱신)"""
+        try:
+            await self.session.execute(
+                update(ChatMessage)
+                .where(ChatMessage.message_id == message_id)
+                .values(
+                    status="cancelled",
+                    is_cancelled=True,
+                    message="⚠️ 응답이 취소되었습니다.",
+                )
+            )
+            await self.session.commit()
+            await self._invalidate_message_cache(chat_id)
+        except Exception as e:
+            await self.session.rollback()
+            logger.error(f"Database error updating message to cancelled: {str(e)}")
+            raise HandledException(ResponseCode.DATABASE_QUERY_ERROR, e=e)
+
+    async def update_message_to_error(self, message_id: str, error_message, chat_id: str = None):
+        """메시지를 에러 상태로 업데이트 (상태와 내용을 한 번에 갱신)"""
+        try:
+            safe_error_msg = self._safe_error_message(error_message)
+            await self.session.execute(
+                update(ChatMessage)
+                .where(ChatMessage.message_id == message_id)
+                .values(
+                    status="error",
+                    is_cancelled=False,
+                    message=f"❌ 오류가 발생했습니다: {safe_error_msg}",
+                )
+            )
+            await self.session.commit()
+            await self._invalidate_message_cache(chat_id)
+        except Exception as e:
+            await self.session.rollback()
+            logger.error(f"Database error updating message to error: {str(e)}")
+            raise HandledException(ResponseCode.DATABASE_QUERY_ERROR, e=e)
@@ -1,11 +1,11 @@
 # _*_ coding: utf-8 _*_
 """Chat CRUD operations with database."""
 import logging
-from datetime import datetime
+from datetime import datetime, timedelta
 from typing import Dict, List, Optional
 from zoneinfo import ZoneInfo
 
-from sqlalchemy import desc
+from sqlalchemy import and_, desc, func, or_
 from sqlalchemy.orm import Session
 from src.database.models.chat_models import Chat, ChatMessage
 from src.types.response.exceptions import HandledException
@@ -15,10 +15,48 @@ logger = logging.getLogger(__name__)
 
 
 class ChatCRUD:
-    """Chat 관련 CRUD 작업을 처리하는 클래스 - DB 기반"""
+    """
+    Chat 관련 CRUD 작업을 처리하는 클래스 - DB 기반
     
-    def __init__(self, session: Session):
+    redis_client가 주어지면 메시지 저장/변경 시 채팅 메시지 캐시(Redis 리스트)를 함께 갱신함
+    - 완료된 메시지 저장: 캐시에 1건 추가 (RPUSHX + LTRIM)
+    - 기존 메시지 변경/삭제: 캐시 삭제 (다음 조회 시 DB에서 재구성)
+    """
+    
+    def __init__(
+        self,
+        session: Session,
+        redis_client=None,
+        cache_window: int = 50,
+        cache_ttl: int = 1800,
+    ):
         self.session = session
+        self.redis_client = redis_client
+        self.cache_window = cache_window
+        self.cache_ttl = cache_ttl
+    
+    def _append_message_cache(self, message: ChatMessage, plc_active: bool):
+        """완료된 메시지를 채팅 메시지 캐시에 추가 (캐시 실패는 무시)"""
+        if self.redis_client is None:
+            return
+        try:
+            self.redis_client.append_chat_cache(
+                message.chat_id,
+                self._to_history_item(message, plc_active=plc_active),
+                max_messages=self.cache_window,
+                expire_seconds=self.cache_ttl,
+            )
+        except Exception as e:
+            logger.warning(f"Chat cache append failed for chat {message.chat_id}: {e}")
+    
+    def _invalidate_message_cache(self, chat_id: str):
+        """채팅 메시지 캐시 삭제 (캐시 실패는 무시)"""
+        if self.redis_client is None or not chat_id:
+            return
+        try:
+            self.redis_client.delete_chat_messages(chat_id)
+        except Exception as e:
+            logger.warning(f"Chat cache invalidation failed for chat {chat_id}: {e}")
     
     def create_chat(self, chat_id: str, chat_title: str, user_id: str) -> Chat:
         """채팅 생성"""
@@ -49,6 +87,7 @@ class ChatCRUD:
         status: str = None,
         is_cancelled: bool = False,
         plc_uuid: str = None,
+        token_count: int = None,
     ) -> ChatMessage:
         """메시지 생성"""
         try:
@@ -61,14 +100,25 @@ class ChatCRUD:
                 status=status,
                 is_cancelled=is_cancelled,
                 plc_uuid=plc_uuid,
+                token_count=token_count,
                 create_dt=datetime.now(ZoneInfo("Asia/Seoul")),
             )
             self.session.add(chat_message)
+
+            # 채팅의 마지막 메시지 시간 업데이트 (메시지 저장과 같은 트랜잭션)
+            self.session.query(Chat)\
+                .filter(Chat.chat_id == chat_id)\
+                .update({Chat.last_message_at: chat_message.create_dt}, synchronize_session=False)
+
+            # 생성 중(generating) 메시지는 완료 시점에 캐시에 추가 (PLC 활성 여부는 같은 트랜잭션에서 조회)
+            cache_message = status != "generating" and self.redis_client is not None
+            plc_active = cache_message and self._is_plc_active(plc_uuid)
+
             self.session.commit()
             self.session.refresh(chat_message)
 
-            # 채팅의 마지막 메시지 시간 업데이트
-            self.update_chat_last_message(chat_id)
+            if cache_message:
+                self._append_message_cache(chat_message, plc_active)
 
             return chat_message
         except Exception as e:
@@ -185,15 +235,46 @@ class ChatCRUD:
             )
             return None
     
-    def get_messages(self, chat_id: str, limit: int = 50) -> List[ChatMessage]:
-        """특정 채팅의 메시지 조회"""
+    def get_messages(self, chat_id: str, limit: int = 50, before: Optional[str] = None) -> List[ChatMessage]:
+        """
+        특정 채팅의 최근 메시지 조회 (오래된 것부터 정렬하여 반환)
+        
+        (CHAT_ID, IS_DELETED, CREATE_DT) 인덱스를 역순으로 읽어 최근 limit개만 가져온 뒤
+        메모리에서 뒤집으므로 채팅 길이와 무관하게 일정한 비용으로 조회됨
+        
+        Args:
+            chat_id: 채팅 ID
+            limit: 조회할 메시지 수
+            before: 커서 메시지 ID (지정 시 해당 메시지보다 이전 메시지만 조회)
+        """
         try:
-            return self.session.query(ChatMessage)\
+            query = self.session.query(ChatMessage)\
                 .filter(ChatMessage.chat_id == chat_id)\
-                .filter(ChatMessage.is_deleted == False)\
-                .order_by(ChatMessage.create_dt)\
+                .filter(ChatMessage.is_deleted == False)
+            
+            if before:
+                cursor = self.session.query(ChatMessage.create_dt, ChatMessage.message_id)\
+                    .filter(ChatMessage.message_id == before)\
+                    .filter(ChatMessage.chat_id == chat_id)\
+                    .first()
+                if cursor is None:
+                    return []
+                query = query.filter(
+                    or_(
+                        ChatMessage.create_dt < cursor.create_dt,
+                        and_(
+                            ChatMessage.create_dt == cursor.create_dt,
+                            ChatMessage.message_id < cursor.message_id,
+                        ),
+                    )
+                )
+            
+            messages = query\
+                .order_by(desc(ChatMessage.create_dt), desc(ChatMessage.message_id))\
                 .limit(limit)\
                 .all()
+            messages.reverse()
+            return messages
         except Exception as e:
             logger.error("Database error getting messages: " + str(e))
             raise HandledException(ResponseCode.DATABASE_QUERY_ERROR, e=e)
@@ -248,6 +329,7 @@ class ChatCRUD:
         user_id: str,
         message: str,
         plc_uuid: str = None,
+        token_count: int = None,
     ) -> ChatMessage:
         """사용자 메시지 저장"""
         try:
@@ -259,6 +341,7 @@ class ChatCRUD:
                 message_type="user",
                 status="completed",
                 plc_uuid=plc_uuid,
+                token_count=token_count,
             )
         except Exception as e:
             logger.error(f"Database error saving user message: {str(e)}")
@@ -272,6 +355,7 @@ class ChatCRUD:
         message: str,
         status: str = "completed",
         plc_uuid: str = None,
+        token_count: int = None,
     ) -> ChatMessage:
         """AI 메시지 저장"""
         try:
@@ -283,83 +367,96 @@ class ChatCRUD:
                 message_type="assistant",
                 status=status,
                 plc_uuid=plc_uuid,
+                token_count=token_count,
             )
         except Exception as e:
             logger.error(f"Database error saving AI message: {str(e)}")
             raise HandledException(ResponseCode.DATABASE_QUERY_ERROR, e=e)
     
-    def get_messages_from_db(self, chat_id: str) -> List[dict]:
+    def _get_active_plc_uuids(self, plc_uuids: set) -> set:
+        """주어진 PLC UUID 중 활성 상태인 것만 반환 (단일 IN 쿼리)"""
+        if not plc_uuids:
+            return set()
+        from src.database.models.plc_models import PLC
+        rows = (
+            self.session.query(PLC.plc_uuid)
+            .filter(PLC.plc_uuid.in_(plc_uuids))
+            .filter(PLC.is_active == True)
+            .all()
+        )
+        return {row.plc_uuid for row in rows}
+    
+    def _is_plc_active(self, plc_uuid: Optional[str]) -> bool:
+        """메시지 캐시용 PLC 활성 여부 (get_messages_from_db와 같은 규칙)"""
+        return bool(plc_uuid) and plc_uuid in self._get_active_plc_uuids({plc_uuid})
+    
+    def _to_history_item(self, msg: ChatMessage, plc_active: bool) -> dict:
+        """ChatMessage를 대화 기록 딕셔너리로 변환"""
+        role = "user" if msg.message_type == "user" else "assistant"
+        if msg.is_cancelled:
+            role = "system"
+
+        # PLC 계층 구조: 스냅샷이 있으면 사용, 없으면 공란
+        # 단, PLC가 없거나 is_active=false인 경우 빈 값 반환
+        plc_hierarchy = None
+        plc_snapshot = None
+        
+        if msg.plc_uuid and plc_active and msg.plc_hierarchy_snapshot:
+            # 스냅샷이 있으면 스냅샷 사용 (메시지 생성 시점의 정보)
+            snapshot = msg.plc_hierarchy_snapshot
+            plc_snapshot = snapshot
+            
+            # 스냅샷에서 계층 구조 정보 추출
+            plc_hierarchy = {}
+            if snapshot.get("plant_id"):
+                plc_hierarchy["plant"] = {
+                    "id": snapshot.get("plant_id"),
+                    "name": snapshot.get("plant_name"),
+                }
+            if snapshot.get("process_id"):
+                plc_hierarchy["process"] = {
+                    "id": snapshot.get("process_id"),
+                    "name": snapshot.get("process_name"),
+                }
+            if snapshot.get("line_id"):
+                plc_hierarchy["line"] = {
+                    "id": snapshot.get("line_id"),
+                    "name": snapshot.get("line_name"),
+                }
+            
+            # plc_hierarchy가 비어있으면 None으로 설정
+            if not plc_hierarchy:
+                plc_hierarchy = None
+
+        return {
+            "role": role,
+            "content": msg.message,
+            "timestamp": msg.create_dt.isoformat(),
+            "cancelled": msg.is_cancelled,
+            "message_id": msg.message_id,
+            "plc_uuid": msg.plc_uuid,
+            "plc_hierarchy": plc_hierarchy,
+            "plc_snapshot": plc_snapshot,  # 스냅샷 전체 정보 포함
+            "token_count": msg.token_count,
+        }
+    
+    def get_messages_from_db(self, chat_id: str, limit: int = 50, before: Optional[str] = None) -> List[dict]:
         """데이터베이스에서 메시지 조회하여 딕셔너리로 변환"""
         try:
-            messages = self.get_messages(chat_id)
+            messages = self.get_messages(chat_id, limit=limit, before=before)
 
-            # ChatMessage 객체를 딕셔너리로 변환
-            history = []
-            for msg in messages:
-                role = "user" if msg.message_type == "user" else "assistant"
-                if msg.is_cancelled:
-                    role = "system"
-
-                # PLC 계층 구조: 스냅샷이 있으면 사용, 없으면 공란
-                # 단, PLC가 is_active=false인 경우 빈 값 반환
-                plc_hierarchy = None
-                plc_snapshot = None
-                
-                if msg.plc_uuid:
-                    # PLC의 현재 활성 상태 확인
-                    from src.database.models.plc_models import PLC
-                    plc = (
-                        self.session.query(PLC)
-                        .filter(PLC.plc_uuid == msg.plc_uuid)
-                        .first()
-                    )
-                    
-                    # PLC가 없거나 is_active=false인 경우 빈 값 반환
-                    if not plc or not plc.is_active:
-                        plc_hierarchy = None
-                        plc_snapshot = None
-                    elif msg.plc_hierarchy_snapshot:
-                        # 스냅샷이 있으면 스냅샷 사용 (메시지 생성 시점의 정보)
-                        snapshot = msg.plc_hierarchy_snapshot
-                        plc_snapshot = snapshot
-                        
-                        # 스냅샷에서 계층 구조 정보 추출
-                        plc_hierarchy = {}
-                        if snapshot.get("plant_id"):
-                            plc_hierarchy["plant"] = {
-                                "id": snapshot.get("plant_id"),
-                                "name": snapshot.get("plant_name"),
-                            }
-                        if snapshot.get("process_id"):
-                            plc_hierarchy["process"] = {
-                                "id": snapshot.get("process_id"),
-                                "name": snapshot.get("process_name"),
-                            }
-                        if snapshot.get("line_id"):
-                            plc_hierarchy["line"] = {
-                                "id": snapshot.get("line_id"),
-                                "name": snapshot.get("line_name"),
-                            }
-                        
-                        # plc_hierarchy가 비어있으면 None으로 설정
-                        if not plc_hierarchy:
-                            plc_hierarchy = None
+            # 메시지에 연결된 PLC의 활성 상태를 한 번의 IN 쿼리로 조회
+            active_plc_uuids = self._get_active_plc_uuids(
+                {msg.plc_uuid for msg in messages if msg.plc_uuid}
+            )
 
-                history.append(
-                    {
-                        "role": role,
-                        "content": msg.message,
-                        "timestamp": msg.create_dt.isoformat(),
-                        "cancelled": msg.is_cancelled,
-                        "message_id": msg.message_id,
-                        "plc_uuid": msg.plc_uuid,
-                        "plc_hierarchy": plc_hierarchy,
-                        "plc_snapshot": plc_snapshot,  # 스냅샷 전체 정보 포함
-                    }
-                )
+            # ChatMessage 객체를 딕셔너리로 변환
+            history = [
+                self._to_history_item(msg, plc_active=msg.plc_uuid in active_plc_uuids)
+                for msg in messages
+            ]
 
-            # 시간순으로 정렬 (오래된 것부터)
-            history.sort(key=lambda x: x["timestamp"])
+            # get_messages가 이미 시간순(오래된 것부터)으로 반환
             return history
         except Exception as e:
             logger.error(f"Database error getting messages: {str(e)}")
@@ -369,10 +466,12 @@ class ChatCRUD:
         """대화 기록 초기화 (DB에서 메시지 삭제)"""
         try:
             # 채팅의 모든 메시지를 삭제 상태로 변경
-            messages = self.get_messages(chat_id)
-            for msg in messages:
-                msg.is_deleted = True
+            self.session.query(ChatMessage)\
+                .filter(ChatMessage.chat_id == chat_id)\
+                .filter(ChatMessage.is_deleted == False)\
+                .update({ChatMessage.is_deleted: True}, synchronize_session=False)
             self.session.commit()
+            self._invalidate_message_cache(chat_id)
         except Exception as e:
             logger.error(f"Database error clearing conversation: {str(e)}")
             raise HandledException(ResponseCode.DATABASE_QUERY_ERROR, e=e)
@@ -389,6 +488,7 @@ class ChatCRUD:
             if message:
                 message.message = f"❌ 오류가 발생했습니다: {safe_error_msg}"
                 self.session.commit()
+                self._invalidate_message_cache(message.chat_id)
         except Exception as e:
             logger.error(f"Database error updating message to error: {str(e)}")
             raise HandledException(ResponseCode.DATABASE_QUERY_ERROR, e=e)
@@ -477,6 +577,7 @@ class ChatCRUD:
         user_id: str,
         message: str,
         plc_uuid: str = None,
+        token_count: int = None,
     ):
         """사용자 메시지 저장"""
         try:
@@ -488,6 +589,7 @@ class ChatCRUD:
                 message_type="user",
                 status="completed",
                 plc_uuid=plc_uuid,
+                token_count=token_count,
             )
         except Exception as e:
             logger.error(f"Database error saving user message: {str(e)}")
@@ -515,25 +617,35 @@ class ChatCRUD:
             logger.error(f"Database error saving AI message generating: {str(e)}")
             raise HandledException(ResponseCode.DATABASE_QUERY_ERROR, e=e)
     
-    def update_ai_message_completed(self, message_id: str, content: str, external_api_nodes: dict = None):
-        """AI 메시지를 완료 상태로 업데이트"""
+    def mark_stale_generating_messages(self, older_than_seconds: int) -> int:
+        """
+        오래된 generating 상태 메시지를 error로 정리 (워커 비정상 종료 대비)
+        
+        마지막 체크포인트(UPDATE_DT, 없으면 CREATE_DT)가 older_than_seconds 이상 멈춘 메시지만 대상으로 하여
+        롤링 재시작 중 다른 워커가 아직 스트리밍 중인 메시지는 건드리지 않음
+        체크포인트된 부분 응답은 그대로 유지하고, 내용이 없는 경우에만 안내 문구로 채움
+        
+        Returns:
+            int: 정리된 메시지 수
+        """
         try:
-            self.update_message_status(message_id, "completed")
-            # 메시지 내용도 업데이트
-            message = self.session.query(ChatMessage).filter(ChatMessage.message_id == message_id).first()
-            if message:
-                message.message = content
-                # External API 노드 데이터가 있으면 안전하게 저장
-                if external_api_nodes:
-                    safe_nodes = self._safe_json_serialize(external_api_nodes)
-                    message.external_api_nodes = safe_nodes
-                    
-                    # reviewer_type이 있는지 체크하고 증가
-                    self._check_and_increment_reviewer_count(external_api_nodes, message.chat_id)
-                
-                self.session.commit()
+            threshold = datetime.now(ZoneInfo("Asia/Seoul")) - timedelta(seconds=older_than_seconds)
+            stale_filter = (
+                ChatMessage.status == "generating",
+                func.coalesce(ChatMessage.update_dt, ChatMessage.create_dt) < threshold,
+            )
+            self.session.query(ChatMessage)\
+                .filter(*stale_filter)\
+                .filter(ChatMessage.message == "")\
+                .update({ChatMessage.message: "❌ 응답 생성이 중단되었습니다."}, synchronize_session=False)
+            updated = self.session.query(ChatMessage)\
+                .filter(*stale_filter)\
+                .update({ChatMessage.status: "error"}, synchronize_session=False)
+            self.session.commit()
+            return updated
         except Exception as e:
-            logger.error(f"Database error updating AI message completed: {str(e)}")
+            self.session.rollback()
+            logger.error(f"Database error marking stale generating messages: {str(e)}")
             raise HandledException(ResponseCode.DATABASE_QUERY_ERROR, e=e)
     
     def get_user_chats(self, user_id: str) -> List[Chat]:
@@ -566,6 +678,7 @@ class ChatCRUD:
                 message.status = status
                 message.is_cancelled = is_cancelled
                 self.session.commit()
+                self._invalidate_message_cache(message.chat_id)
         except Exception as e:
             self.session.rollback()
             raise HandledException(ResponseCode.DATABASE_QUERY_ERROR, e=e)
@@ -577,6 +690,7 @@ class ChatCRUD:
             if message:
                 message.is_deleted = True
                 self.session.commit()
+                self._invalidate_message_cache(message.chat_id)
                 return True
             return False
         except Exception as e:
@@ -642,21 +756,6 @@ class ChatCRUD:
             logger.error(f"Database error resetting reviewer count: {str(e)}")
             raise HandledException(ResponseCode.DATABASE_QUERY_ERROR, e=e)
     
-    def _check_and_increment_reviewer_count(self, external_api_nodes: dict, chat_id: str):
-        """external_api_nodes에서 agent__reviewer가 있는지 체크하고 reviewer_count 증가 또는 초기화"""
-        try:
-            # external_api_nodes에서 agent__reviewer가 있는지 재귀적으로 검색
-            if self._has_reviewer_type(external_api_nodes):
-                logger.info(f"Found agent__reviewer in external_api_nodes for chat {chat_id}, incrementing reviewer_count")
-                self.increment_reviewer_count(chat_id)
-            else:
-                # agent__reviewer가 없으면 카운트를 0으로 초기화
-                logger.info(f"No agent__reviewer found in external_api_nodes for chat {chat_id}, resetting reviewer_count to 0")
-                self.reset_reviewer_count(chat_id)
-        except Exception as e:
-            logger.warning(f"Error checking agent__reviewer in external_api_nodes: {str(e)}")
-            # agent__reviewer 체크 실패는 전체 프로세스를 중단시키지 않음
-    
     def _has_reviewer_type(self, data, visited=None) -> bool:
         """데이터 구조에서 'type': 'agent__reviewer'이 있는지 재귀적으로 검색"""
         if visited is None:
@@ -0,0 +1,340 @@
+# _*_ coding: utf-8 _*_
+"""
+사용자 유효 권한(USER_EFFECTIVE_PERMISSIONS) CRUD 작업
+그룹/매핑 변경 시 사용자별 유효 권한을 다시 계산하여 저장
+
+USER_GROUPS / GROUPS / GROUP_PROCESSES 변경은 PostgreSQL 트리거가 같은 트랜잭션에서
+영향받는 사용자 행을 재계산하므로, API를 거치지 않고 DB에서 직접 변경해도 즉시 반영됩니다.
+"""
+import logging
+from typing import Dict, Iterable, Optional
+
+from sqlalchemy import and_, text
+from sqlalchemy.orm import Session
+
+from src.cache.two_tier_cache import PERMISSIONS_NAMESPACE, get_two_tier_cache
+from src.database.models.permission_group_models import (
+    GroupProcessPermission,
+    PermissionGroup,
+    UserEffectivePermission,
+    UserGroupMapping,
+)
+from src.types.response.exceptions import HandledException
+from src.types.response.response_code import ResponseCode
+
+logger = logging.getLogger(__name__)
+
+SUPER_ROLES = {PermissionGroup.ROLE_SYSTEM_ADMIN, PermissionGroup.ROLE_PROCESS_ADMIN}
+
+# 트리거 설치/전체 재계산을 워커 간에 직렬화하는 advisory lock 키
+_ADVISORY_LOCK_SQL = "SELECT pg_advisory_xact_lock(hashtext('USER_EFFECTIVE_PERMISSIONS'))"
+
+# 유효 권한 유지 트리거 (compute()와 같은 규칙, docs/migration/add_user_effective_permissions.sql과 동일)
+# - SET search_path FROM CURRENT: 설치 시점 스키마로 고정 (psql 등 다른 search_path에서 변경해도 동작)
+TRIGGER_DDL = [
+    """
+    CREATE OR REPLACE FUNCTION refresh_user_effective_permissions(p_user_id VARCHAR)
+    RETURNS VOID LANGUAGE plpgsql SET search_path FROM CURRENT AS $$
+    DECLARE
+        v_is_super BOOLEAN;
+        v_role_ids JSON;
+        v_process_ids JSON;
+    BEGIN
+        -- 삭제된 사용자 (USERS 삭제로 매핑이 함께 삭제된 경우)
+        IF NOT EXISTS (SELECT 1 FROM "USERS" WHERE "USER_ID" = p_user_id) THEN
+            DELETE FROM "USER_EFFECTIVE_PERMISSIONS" WHERE "USER_ID" = p_user_id;
+            RETURN;
+        END IF;
+
+        SELECT
+            COALESCE(bool_or(g."ROLE_ID" IN ('system_admin', 'process_admin')), FALSE),
+            COALESCE(to_json(array_agg(DISTINCT g."ROLE_ID" ORDER BY g."ROLE_ID")), '[]'::json),
+            COALESCE(
+                to_json(
+                    array_agg(DISTINCT gp."PROCESS_ID" ORDER BY gp."PROCESS_ID")
+                    FILTER (WHERE g."ROLE_ID" = 'process_manager' AND gp."PROCESS_ID" IS NOT NULL)
+                ),
+                '[]'::json
+            )
+        INTO v_is_super, v_role_ids, v_process_ids
+        FROM "USER_GROUPS" ug
+        JOIN "GROUPS" g
+            ON g."GROUP_ID" = ug."GROUP_ID" AND g."IS_ACTIVE" = TRUE
+        LEFT JOIN "GROUP_PROCESSES" gp
+            ON gp."GROUP_ID" = g."GROUP_ID" AND gp."IS_ACTIVE" = TRUE
+        WHERE ug."USER_ID" = p_user_id AND ug."IS_ACTIVE" = TRUE;
+
+        IF v_is_super THEN
+            v_process_ids := '[]'::json;
+        END IF;
+
+        INSERT INTO "USER_EFFECTIVE_PERMISSIONS"
+            ("USER_ID", "IS_SUPER", "ROLE_IDS", "PROCESS_IDS", "UPDATE_DT")
+        VALUES (p_user_id, v_is_super, v_role_ids, v_process_ids, now())
+        ON CONFLICT ("USER_ID") DO UPDATE SET
+            "IS_SUPER" = EXCLUDED."IS_SUPER",
+            "ROLE_IDS" = EXCLUDED."ROLE_IDS",
+            "PROCESS_IDS" = EXCLUDED."PROCESS_IDS",
+            "UPDATE_DT" = EXCLUDED."UPDATE_DT";
+    END
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION trg_user_groups_effective_permissions()
+    RETURNS TRIGGER LANGUAGE plpgsql SET search_path FROM CURRENT AS $$
+    BEGIN
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            PERFORM refresh_user_effective_permissions(NEW."USER_ID");
+        END IF;
+        IF TG_OP = 'DELETE' OR (TG_OP = 'UPDATE' AND OLD."USER_ID" IS DISTINCT FROM NEW."USER_ID") THEN
+            PERFORM refresh_user_effective_permissions(OLD."USER_ID");
+        END IF;
+        RETURN NULL;
+    END
+    $$
+    """,
+    """
+    CREATE OR REPLACE FUNCTION trg_group_members_effective_permissions()
+    RETURNS TRIGGER LANGUAGE plpgsql SET search_path FROM CURRENT AS $$
+    BEGIN
+        -- GROUPS / GROUP_PROCESSES 변경: 해당 그룹 소속 사용자 전체 재계산
+        IF TG_OP IN ('INSERT', 'UPDATE') THEN
+            PERFORM refresh_user_effective_permissions(members."USER_ID")
+            FROM (SELECT DISTINCT "USER_ID" FROM "USER_GROUPS" WHERE "GROUP_ID" = NEW."GROUP_ID") members;
+        END IF;
+        IF TG_OP = 'DELETE' OR (TG_OP = 'UPDATE' AND OLD."GROUP_ID" IS DISTINCT FROM NEW."GROUP_ID") THEN
+            PERFORM refresh_user_effective_permissions(members."USER_ID")
+            FROM (SELECT DISTINCT "USER_ID" FROM "USER_GROUPS" WHERE "GROUP_ID" = OLD."GROUP_ID") members;
+        END IF;
+        RETURN NULL;
+    END
+    $$
+    """,
+    'DROP TRIGGER IF EXISTS trg_user_groups_effective_permissions ON "USER_GROUPS"',
+    """
+    CREATE TRIGGER trg_user_groups_effective_permissions
+    AFTER INSERT OR UPDATE OR DELETE ON "USER_GROUPS"
+    FOR EACH ROW EXECUTE PROCEDURE trg_user_groups_effective_permissions()
+    """,
+    'DROP TRIGGER IF EXISTS trg_groups_effective_permissions ON "GROUPS"',
+    """
+    CREATE TRIGGER trg_groups_effective_permissions
+    AFTER UPDATE OR DELETE ON "GROUPS"
+    FOR EACH ROW EXECUTE PROCEDURE trg_group_members_effective_permissions()
+    """,
+    'DROP TRIGGER IF EXISTS trg_group_processes_effective_permissions ON "GROUP_PROCESSES"',
+    """
+    CREATE TRIGGER trg_group_processes_effective_permissions
+    AFTER INSERT OR UPDATE OR DELETE ON "GROUP_PROCESSES"
+    FOR EACH ROW EXECUTE PROCEDURE trg_group_members_effective_permissions()
+    """,
+]
+
+
+def _empty_permissions() -> Dict:
+    return {"is_super": False, "role_ids": [], "process_ids": []}
+
+
+class EffectivePermissionCRUD:
+    """사용자 유효 권한 계산/조회를 처리하는 클래스"""
+
+    def __init__(self, db: Session):
+        self.db = db
+
+    def get_effective_permissions(self, user_id: str) -> Dict:
+        """
+        사용자 유효 권한 조회 (2단계 캐시 → USER_EFFECTIVE_PERMISSIONS PK 조회)
+
+        행이 없으면 원본 테이블에서 계산합니다 (저장하지 않음).
+        DB 직접 변경은 트리거로 테이블에 즉시 반영되고, 캐시에는 PERMISSION_CACHE_TTL_SECONDS 안에 반영됩니다.
+        결과는 수정하지 않아야 합니다 (캐시된 객체 공유).
+
+        Returns:
+            Dict: {
+                "is_super": bool,  # 모든 공정 접근 가능
+                "role_ids": [...],  # 소속 그룹의 Role ID 목록
+                "process_ids": [...]  # 접근 가능한 공정 ID 목록 (is_super면 빈 목록)
+            }
+        """
+        from src.config import settings
+
+        return get_two_tier_cache().get_or_load(
+            PERMISSIONS_NAMESPACE,
+            f"effective:{user_id}",
+            lambda: self._load_effective_permissions(user_id),
+            redis_ttl=settings.permission_cache_ttl_seconds,
+        )
+
+    def _load_effective_permissions(self, user_id: str) -> Dict:
+        try:
+            row = self.db.get(UserEffectivePermission, user_id)
+            if row is not None:
+                return {
+                    "is_super": row.is_super,
+                    "role_ids": list(row.role_ids or []),
+                    "process_ids": list(row.process_ids or []),
+                }
+            return self.compute([user_id]).get(user_id, _empty_permissions())
+        except Exception as e:
+            logger.error(f"사용자 유효 권한 조회 실패: user_id={user_id}, error={str(e)}")
+            raise HandledException(ResponseCode.DATABASE_QUERY_ERROR, e=e)
+
+    def compute(self, user_ids: Optional[Iterable[str]] = None) -> Dict[str, Dict]:
+        """
+        원본 테이블(USER_GROUPS, GROUPS, GROUP_PROCESSES)에서 유효 권한 계산
+
+        활성 매핑 + 활성 그룹만 반영하며, 조인 쿼리 1번으로 계산합니다.
+
+        Args:
+            user_ids: 계산할 사용자 ID 목록 (None이면 그룹에 속한 전체 사용자)
+
+        Returns:
+            Dict[str, Dict]: user_id별 유효 권한 (그룹이 없는 사용자는 포함되지 않음)
+        """
+        query = (
+            self.db.query(
+                UserGroupMapping.user_id,
+                PermissionGroup.role_id,
+                GroupProcessPermission.process_id,
+            )
+            .join(
+                PermissionGroup,
+                PermissionGroup.group_id == UserGroupMapping.group_id,
+            )
+            .outerjoin(
+                GroupProcessPermission,
+                and_(
+                    GroupProcessPermission.group_id == PermissionGroup.group_id,
+                    GroupProcessPermission.is_active.is_(True),
+                ),
+            )
+            .filter(UserGroupMapping.is_active.is_(True))
+            .filter(PermissionGroup.is_active.is_(True))
+        )
+        if user_ids is not None:
+            user_ids = list(set(user_ids))
+            if not user_ids:
+                return {}
+            query = query.filter(UserGroupMapping.user_id.in_(user_ids))
+
+        roles_by_user: Dict[str, set] = {}
+        processes_by_user: Dict[str, set] = {}
+        for row in query.all():
+            roles_by_user.setdefault(row.user_id, set()).add(row.role_id)
+            processes = processes_by_user.setdefault(row.user_id, set())
+            # 공정 관리자 그룹의 공정만 합집합 (다른 Role은 GROUP_PROCESSES와 무관)
+            if row.role_id == PermissionGroup.ROLE_PROCESS_MANAGER and row.process_id:
+                processes.add(row.process_id)
+
+        result = {}
+        for user_id, roles in roles_by_user.items():
+            is_super = bool(roles & SUPER_ROLES)
+            result[user_id] = {
+                "is_super": is_super,
+                "role_ids": sorted(roles),
+                "process_ids": [] if is_super else sorted(processes_by_user[user_id]),
+            }
+        return result
+
+    def refresh_users(self, user_ids: Iterable[str]) -> int:
+        """
+        사용자 유효 권한 재계산 후 저장 (커밋하지 않음 - 호출 측 트랜잭션에 포함)
+
+        호출 측은 커밋 후 2단계 캐시 permissions 네임스페이스를 무효화해야 합니다.
+
+        그룹/매핑 변경 후 flush된 상태에서 호출하면 같은 트랜잭션에서 함께 커밋됩니다.
+        그룹이 없어진 사용자는 빈 권한으로 저장합니다 (다음 조회도 PK 조회로 처리).
+
+        Returns:
+            int: 재계산한 사용자 수
+        """
+        user_ids = list(set(user_ids))
+        if not user_ids:
+            return 0
+
+        self.db.flush()
+        computed = self.compute(user_ids)
+        existing = {
+            row.user_id: row
+            for row in self.db.query(UserEffectivePermission)
+            .filter(UserEffectivePermission.user_id.in_(user_ids))
+            .all()
+        }
+        for user_id in user_ids:
+            self._store(user_id, computed.get(user_id), existing.get(user_id))
+        return len(user_ids)
+
+    def _is_postgresql(self) -> bool:
+        return self.db.get_bind().dialect.name == "postgresql"
+
+    def install_triggers(self) -> bool:
+        """
+        유효 권한 유지 트리거 설치 후 커밋 (앱 시작 시, 여러 워커가 동시에 실행해도 advisory lock으로 직렬화)
+
+        Returns:
+            bool: 설치 여부 (PostgreSQL이 아니면 False)
+        """
+        if not self._is_postgresql():
+            return False
+        try:
+            self.db.execute(text(_ADVISORY_LOCK_SQL))
+            for statement in TRIGGER_DDL:
+                self.db.execute(text(statement))
+            self.db.commit()
+            return True
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"사용자 유효 권한 트리거 설치 실패: {str(e)}")
+            raise HandledException(ResponseCode.DATABASE_QUERY_ERROR, e=e)
+
+    def rebuild_all(self) -> int:
+        """
+        전체 사용자 유효 권한 재계산 후 커밋 (앱 시작 시, 트리거 설치 전 변경분 반영)
+
+        그룹이 없어진 사용자도 빈 권한으로 초기화합니다.
+
+        Returns:
+            int: 변경된 사용자 수
+        """
+        try:
+            if self._is_postgresql():
+                self.db.execute(text(_ADVISORY_LOCK_SQL))
+            computed = self.compute()
+            existing = {
+                row.user_id: row for row in self.db.query(UserEffectivePermission).all()
+            }
+            changed = 0
+            for user_id in set(computed) | set(existing):
+                if self._store(user_id, computed.get(user_id), existing.get(user_id)):
+                    changed += 1
+            self.db.commit()
+            if changed:
+                get_two_tier_cache().invalidate(PERMISSIONS_NAMESPACE)
+            return changed
+        except Exception as e:
+            self.db.rollback()
+            logger.error(f"사용자 유효 권한 전체 재계산 실패: {str(e)}")
+            raise HandledException(ResponseCode.DATABASE_QUERY_ERROR, e=e)
+
+    def _store(
+        self,
+        user_id: str,
+        permissions: Optional[Dict],
+        row: Optional[UserEffectivePermission],
+    ) -> bool:
+        """계산 결과 반영 (그룹이 없으면 빈 권한) - 변경이 있으면 True"""
+        permissions = permissions or _empty_permissions()
+        if row is None:
+            self.db.add(UserEffectivePermission(user_id=user_id, **permissions))
+            return True
+
+        if (
+            row.is_super == permissions["is_super"]
+            and list(row.role_ids or []) == permissions["role_ids"]
+            and list(row.process_ids or []) == permissions["process_ids"]
+        ):
+            return False
+        row.is_super = permissions["is_super"]
+        row.role_ids = permissions["role_ids"]
+        row.process_ids = permissions["process_ids"]
+        return True
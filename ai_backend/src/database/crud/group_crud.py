@@ -8,6 +8,8 @@ from typing import List, Optional
 
 from sqlalchemy.orm import Session
 
+from src.cache.two_tier_cache import PERMISSIONS_NAMESPACE, get_two_tier_cache
+from src.database.crud.effective_permission_crud import EffectivePermissionCRUD
 from src.database.models.permission_group_models import (
     GroupProcessPermission,
     PermissionGroup,
@@ -35,6 +37,7 @@ class GroupCRUD:
         1. 관련된 USER_GROUPS 삭제
         2. 관련된 GROUP_PROCESSES 삭제
         3. GROUPS 삭제
+        4. 소속 사용자의 USER_EFFECTIVE_PERMISSIONS 재계산 (같은 트랜잭션)
         
         Args:
             group_id: 삭제할 그룹 ID
@@ -67,6 +70,7 @@ class GroupCRUD:
                 .all()
             )
             
+            member_ids = {mapping.user_id for mapping in user_mappings}
             for mapping in user_mappings:
                 self.db.delete(mapping)
             
@@ -83,8 +87,14 @@ class GroupCRUD:
             # 4. 그룹 삭제
             self.db.delete(group)
             
-            # 5. 커밋
+            # 5. 소속 사용자 유효 권한 재계산 (삭제 반영 후 계산)
+            EffectivePermissionCRUD(self.db).refresh_users(member_ids)
+
+            # 6. 커밋
             self.db.commit()
+
+            # 7. 사용자 역할/접근 가능 공정 캐시 무효화 (소속 사용자 전체에 영향)
+            get_two_tier_cache().invalidate(PERMISSIONS_NAMESPACE)
             
             logger.info(
                 "그룹 삭제 완료: group_id=%s, "
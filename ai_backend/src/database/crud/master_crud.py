@@ -7,6 +7,11 @@ from typing import Dict, List, Optional
 
 from sqlalchemy import desc
 from sqlalchemy.orm import Session
+from src.cache.two_tier_cache import (
+    MASTERS_NAMESPACE,
+    cache_key_for_ids,
+    get_two_tier_cache,
+)
 from src.database.models.master_models import (
     LineMaster,
     PlantMaster,
@@ -46,6 +51,7 @@ class PlantMasterCRUD:
             self.db.add(plant)
             self.db.commit()
             self.db.refresh(plant)
+            get_two_tier_cache().invalidate(MASTERS_NAMESPACE)
             return plant
         except Exception as e:
             self.db.rollback()
@@ -102,6 +108,7 @@ class PlantMasterCRUD:
                 if update_user:
                     plant.update_user = update_user
                 self.db.commit()
+                get_two_tier_cache().invalidate(MASTERS_NAMESPACE)
                 return True
             return False
         except Exception as e:
@@ -138,6 +145,7 @@ class ProcessMasterCRUD:
             self.db.add(process)
             self.db.commit()
             self.db.refresh(process)
+            get_two_tier_cache().invalidate(MASTERS_NAMESPACE)
             return process
         except Exception as e:
             self.db.rollback()
@@ -229,6 +237,7 @@ class ProcessMasterCRUD:
                 if update_user:
                     process.update_user = update_user
                 self.db.commit()
+                get_two_tier_cache().invalidate(MASTERS_NAMESPACE)
                 return True
             return False
         except Exception as e:
@@ -265,6 +274,7 @@ class LineMasterCRUD:
             self.db.add(line)
             self.db.commit()
             self.db.refresh(line)
+            get_two_tier_cache().invalidate(MASTERS_NAMESPACE)
             return line
         except Exception as e:
             self.db.rollback()
@@ -321,6 +331,7 @@ class LineMasterCRUD:
                 if update_user:
                     line.update_user = update_user
                 self.db.commit()
+                get_two_tier_cache().invalidate(MASTERS_NAMESPACE)
                 return True
             return False
         except Exception as e:
@@ -597,6 +608,7 @@ class MasterHierarchyCRUD:
         **마스터 테이블 기준 조회:**
         - 활성화된 마스터 데이터만 조회 (is_active=true)
         - 계층 구조 없이 단순 리스트로 반환
+        - 2단계 캐시 사용 (기준정보 생성/수정 시 무효화)
         
         Returns:
             Dict: {
@@ -611,6 +623,12 @@ class MasterHierarchyCRUD:
                 ]
             }
         """
+        return get_two_tier_cache().get_or_load(
+            MASTERS_NAMESPACE, "dropdown", self._load_all_masters_for_dropdown
+        )
+
+    def _load_all_masters_for_dropdown(self) -> Dict:
+        """드롭다운용 전체 마스터 데이터 DB 조회"""
         try:
             # 1. 활성화된 Plant 조회
             plants = (
@@ -671,6 +689,7 @@ class MasterHierarchyCRUD:
         PLC-PGM 매핑 화면용 드롭다운 데이터 조회 (권한 기반 공정 필터링)
         
         사용자 권한에 따라 접근 가능한 공정만 포함하여 반환합니다.
+        접근 가능한 공정 조합별로 2단계 캐시를 사용합니다 (기준정보 생성/수정 시 무효화).
         
         Args:
             accessible_process_ids: 접근 가능한 공정 ID 리스트 (None이면 모든 공정)
@@ -682,6 +701,16 @@ class MasterHierarchyCRUD:
                 "linesByProcess": {...}
             }
         """
+        return get_two_tier_cache().get_or_load(
+            MASTERS_NAMESPACE,
+            f"mapping_dropdown:{cache_key_for_ids(accessible_process_ids)}",
+            lambda: self._load_masters_for_mapping_dropdown(accessible_process_ids),
+        )
+
+    def _load_masters_for_mapping_dropdown(
+        self, accessible_process_ids: Optional[List[str]] = None
+    ) -> Dict:
+        """PLC-PGM 매핑 화면용 드롭다운 데이터 DB 조회"""
         try:
             # 1. 모든 Plant 조회
             plants = (
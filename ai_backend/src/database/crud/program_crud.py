@@ -199,61 +199,26 @@ class ProgramCRUD:
             user_id = "user3"
             groups = [group_system_admin, group_process_manager_001]
             → None (시스템 관리자 권한이 우선)
+
+        Note:
+            USER_EFFECTIVE_PERMISSIONS PK 조회 (2단계 캐시 사용, 그룹 변경 시 GroupCRUD가 갱신/무효화)
         """
         if not user_id:
             return None  # user_id가 없으면 모든 공정 접근 가능
 
         try:
-            from src.database.models.permission_group_models import (
-                GroupProcessPermission,
-                PermissionGroup,
-                UserGroupMapping,
+            from src.database.crud.effective_permission_crud import (
+                EffectivePermissionCRUD,
             )
 
-            # 사용자가 속한 활성 그룹 조회
-            groups = (
-                self.db.query(PermissionGroup)
-                .join(
-                    UserGroupMapping,
-                    PermissionGroup.group_id == UserGroupMapping.group_id,
-                )
-                .filter(UserGroupMapping.user_id == user_id)
-                .filter(UserGroupMapping.is_active.is_(True))
-                .filter(PermissionGroup.is_active.is_(True))
-                .all()
+            permissions = EffectivePermissionCRUD(self.db).get_effective_permissions(
+                user_id
             )
-
-            if not groups:
-                # 일반 사용자: 그룹에 속하지 않음 → 접근 불가
-                return []
-
-            # 1. 시스템 관리자 또는 공정 관리자(process_admin): 모든 공정 접근 가능
-            # 여러 그룹 중 하나라도 system_admin 또는 process_admin이 있으면
-            # 제일 넓은 권한인 "모든 공정 접근"이 적용됨
-            for group in groups:
-                if group.role_id in [
-                    PermissionGroup.ROLE_SYSTEM_ADMIN,
-                    PermissionGroup.ROLE_PROCESS_ADMIN,
-                ]:
-                    return None  # None = 모든 공정 접근 가능
-
-            # 2. 공정 관리자: GROUP_PROCESSES에 지정된 공정만 접근 가능
-            # 여러 공정 관리자 그룹에 속한 경우,
-            # 모든 그룹의 공정을 합집합으로 반환
-            accessible_process_ids = set()
-            for group in groups:
-                if group.role_id == PermissionGroup.ROLE_PROCESS_MANAGER:
-                    process_permissions = (
-                        self.db.query(GroupProcessPermission)
-                        .filter(GroupProcessPermission.group_id == group.group_id)
-                        .filter(GroupProcessPermission.is_active.is_(True))
-                        .all()
-                    )
-                    accessible_process_ids.update(
-                        [pp.process_id for pp in process_permissions]
-                    )
-
-            return list(accessible_process_ids) if accessible_process_ids else []
+            # 시스템 관리자 또는 공정 관리자(process_admin): 모든 공정 접근 가능
+            if permissions["is_super"]:
+                return None
+            # 공정 관리자: 소속 그룹 공정의 합집합, 일반 사용자: []
+            return list(permissions["process_ids"])
 
         except Exception as e:
             logger.error(f"접근 가능한 공정 조회 실패: {str(e)}")
@@ -5,9 +5,11 @@ from datetime import datetime
 from typing import List, Optional
 from zoneinfo import ZoneInfo
 
-from sqlalchemy import and_, desc
+from sqlalchemy import and_, desc, select
 from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.orm import Session
+from src.cache.two_tier_cache import USERS_NAMESPACE, get_two_tier_cache
 from src.database.models.user_models import User
 from src.types.response.exceptions import HandledException
 from src.types.response.response_code import ResponseCode
@@ -34,6 +36,7 @@ class UserCRUD:
             self.db.add(user)
             self.db.commit()
             self.db.refresh(user)
+            get_two_tier_cache().invalidate(USERS_NAMESPACE, user_id)
             return user
         except Exception as e:
             self.db.rollback()
@@ -48,6 +51,28 @@ class UserCRUD:
         except Exception as e:
             raise HandledException(ResponseCode.DATABASE_QUERY_ERROR, e=e)
     
+    def get_user_profile(self, user_id: str) -> Optional[dict]:
+        """
+        사용자 프로필 조회 (2단계 캐시, 사용자 생성/수정/삭제 시 무효화)
+
+        Returns:
+            Optional[dict]: {user_id, employee_id, name, is_active} - 없으면 None
+        """
+        return get_two_tier_cache().get_or_load(
+            USERS_NAMESPACE, user_id, lambda: self._load_user_profile(user_id)
+        )
+
+    def _load_user_profile(self, user_id: str) -> Optional[dict]:
+        user = self.get_user(user_id)
+        if not user:
+            return None
+        return {
+            "user_id": user.user_id,
+            "employee_id": user.employee_id,
+            "name": user.name,
+            "is_active": user.is_active,
+        }
+
     def get_user_by_employee_id(self, employee_id: str) -> Optional[User]:
         """사용자 조회 (사번으로)"""
         try:
@@ -101,6 +126,7 @@ class UserCRUD:
                 user.update_dt = datetime.now(ZoneInfo("Asia/Seoul"))
                 self.db.commit()
                 self.db.refresh(user)
+                get_two_tier_cache().invalidate(USERS_NAMESPACE, user_id)
             return user
         except Exception as e:
             self.db.rollback()
@@ -114,6 +140,7 @@ class UserCRUD:
                 user.is_active = False
                 user.update_dt = datetime.now(ZoneInfo("Asia/Seoul"))
                 self.db.commit()
+                get_two_tier_cache().invalidate(USERS_NAMESPACE, user_id)
                 return True
             return False
         except Exception as e:
@@ -128,6 +155,7 @@ class UserCRUD:
                 user.is_active = True
                 user.update_dt = datetime.now(ZoneInfo("Asia/Seoul"))
                 self.db.commit()
+                get_two_tier_cache().invalidate(USERS_NAMESPACE, user_id)
                 return True
             return False
         except Exception as e:
@@ -142,6 +170,7 @@ class UserCRUD:
                 user.is_deleted = True
                 user.update_dt = datetime.now(ZoneInfo("Asia/Seoul"))
                 self.db.commit()
+                get_two_tier_cache().invalidate(USERS_NAMESPACE, user_id)
                 return True
             return False
         except Exception as e:
@@ -173,3 +202,20 @@ class UserCRUD:
             return query.first() is not None
         except Exception as e:
             raise HandledException(ResponseCode.DATABASE_QUERY_ERROR, e=e)
+
+
+class AsyncUserCRUD:
+    """User 조회용 비동기 클래스 - AsyncSession(asyncpg) 기반 (스트리밍 채팅 경로용)"""
+    
+    def __init__(self, db: AsyncSession):
+        self.db = db
+    
+    async def get_user(self, user_id: str) -> Optional[User]:
+        """사용자 조회 (ID로)"""
+        try:
+            result = await self.db.execute(
+                select(User).where(and_(User.user_id == user_id, User.is_deleted == False))
+            )
+            return result.scalars().first()
+        except Exception as e:
+            raise HandledException(ResponseCode.DATABASE_QUERY_ERROR, e=e)
@@ -6,6 +6,7 @@ from sqlalchemy import (
     Column,
     DateTime,
     ForeignKey,
+    Index,
     Integer,
     String,
     Text,
@@ -43,6 +44,7 @@ class ChatMessage(Base):
     create_dt = Column('CREATE_DT', DateTime, nullable=False, server_default=func.now())
     is_deleted = Column('IS_DELETED', Boolean, nullable=False, server_default=false())
     is_cancelled = Column('IS_CANCELLED', Boolean, nullable=False, server_default=false())  # 취소된 메시지 표시
+    update_dt = Column('UPDATE_DT', DateTime, nullable=True)  # 마지막 체크포인트/완료 시각 (스트리밍 진행 여부 판단)
     
     # PLC 연결 (PLC 테이블의 PLC_UUID 참조)
     plc_uuid = Column(
@@ -78,6 +80,15 @@ class ChatMessage(Base):
     
     # External API 노드 처리 결과 저장용 (JSON)
     external_api_nodes = Column('EXTERNAL_API_NODES', JSON, nullable=True)
+    
+    # 메시지 저장 시 1회 계산한 토큰 수 (프롬프트 구성 시 재인코딩 방지)
+    token_count = Column('TOKEN_COUNT', Integer, nullable=True)
+
+    # 인덱스 정의 (조회 성능 향상)
+    __table_args__ = (
+        # 채팅별 최근 메시지 조회 (keyset 페이지네이션)
+        Index("idx_chat_messages_chat_deleted_create", "CHAT_ID", "IS_DELETED", "CREATE_DT"),
+    )
 
 
 class MessageRating(Base):
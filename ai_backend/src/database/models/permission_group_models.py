@@ -11,6 +11,7 @@ from sqlalchemy import (
     ForeignKey,
     Index,
     Integer,
+    JSON,
     String,
     Text,
     func,
@@ -336,3 +337,63 @@ class UserGroupMapping(Base):
             f"<UserGroupMapping(mapping_id='{self.mapping_id}', "
             f"user_id='{self.user_id}', group_id='{self.group_id}')>"
         )
+
+
+class UserEffectivePermission(Base):
+    """
+    사용자별 유효 권한 테이블 (USER_GROUPS × GROUPS × GROUP_PROCESSES 사전 계산 결과)
+
+    - 권한 체크는 이 테이블의 PK 조회 1번으로 처리 (매번 3개 테이블 조인하지 않음)
+    - USER_GROUPS / GROUPS / GROUP_PROCESSES 변경 시 DB 트리거가 영향받는 사용자 행을 같은 트랜잭션에서 갱신
+      (DB 직접 변경 포함, 트리거는 앱 시작 시 EffectivePermissionCRUD.install_triggers로 설치)
+    - 활성 매핑 + 활성 그룹만 반영
+    - 행이 없으면 원본 테이블에서 계산 (앱 시작 시 전체 재계산으로 채움)
+    """
+
+    __tablename__ = "USER_EFFECTIVE_PERMISSIONS"
+
+    # Primary Key
+    user_id = Column(
+        "USER_ID",
+        String(50),
+        ForeignKey("USERS.USER_ID"),
+        primary_key=True,
+        comment="사용자 ID (PK, FK)",
+    )
+
+    # 유효 권한
+    is_super = Column(
+        "IS_SUPER",
+        Boolean,
+        nullable=False,
+        server_default=false(),
+        comment="모든 공정 접근 가능 여부 (system_admin 또는 process_admin 그룹 소속)",
+    )
+    role_ids = Column(
+        "ROLE_IDS",
+        JSON,
+        nullable=False,
+        comment="소속 그룹의 Role ID 목록 (중복 제거)",
+    )
+    process_ids = Column(
+        "PROCESS_IDS",
+        JSON,
+        nullable=False,
+        comment="접근 가능한 공정 ID 목록 (process_manager 그룹 공정의 합집합, is_super면 빈 목록)",
+    )
+
+    # 시간 정보
+    update_dt = Column(
+        "UPDATE_DT",
+        DateTime,
+        nullable=False,
+        server_default=func.now(),
+        onupdate=func.now(),
+        comment="마지막 계산 일시",
+    )
+
+    def __repr__(self):
+        return (
+            f"<UserEffectivePermission(user_id='{self.user_id}', "
+            f"is_super={self.is_super}, role_ids={self.role_ids})>"
+        )
@@ -539,6 +539,42 @@ def create_app():
                 str(e),
             )
 
+        # 이전 워커 비정상 종료로 generating 상태에 남은 메시지 정리 (부분 응답은 유지)
+        try:
+            from src.database.crud.chat_crud import ChatCRUD
+            with get_database().session() as db:
+                recovered = ChatCRUD(db).mark_stale_generating_messages(
+                    settings.chat_stream_stale_after_seconds
+                )
+            if recovered:
+                logger.info("중단된 생성 메시지 정리 완료: %d건", recovered)
+        except Exception as e:
+            logger.warning("중단된 생성 메시지 정리 실패: %s", str(e))
+
+        # 사용자 유효 권한 유지 트리거 설치 + 전체 재계산 (트리거 설치 전 변경분 반영)
+        if settings.effective_permissions_rebuild_on_startup:
+            try:
+                from src.database.crud.effective_permission_crud import (
+                    EffectivePermissionCRUD,
+                )
+                with get_database().session() as db:
+                    effective_permission_crud = EffectivePermissionCRUD(db)
+                    effective_permission_crud.install_triggers()
+                    changed = effective_permission_crud.rebuild_all()
+                if changed:
+                    logger.info("사용자 유효 권한 재계산 완료: %d명 변경", changed)
+            except Exception as e:
+                logger.warning("사용자 유효 권한 재계산 실패: %s", str(e))
+
+        # 채팅 생성 취소 리스너 시작 (Redis pub/sub로 워커 간 취소 신호 전파)
+        from src.api.services.chat_cancel_registry import get_cancel_registry
+        from src.core.dependencies import get_async_redis_client, get_redis_client
+        get_cancel_registry().start(get_redis_client(), async_redis_client=get_async_redis_client())
+
+        # 참조 데이터 2단계 캐시 무효화 리스너 시작
+        from src.cache.two_tier_cache import get_two_tier_cache
+        get_two_tier_cache().start(get_redis_client())
+
         async def update_progress_periodically():
             """
             적응형 주기로 진행률 통계 업데이트
@@ -594,6 +630,22 @@ def create_app():
         asyncio.create_task(update_progress_periodically())
         logger.info("진행률 통계 업데이트 백그라운드 작업 시작됨")
 
+    @app.on_event("shutdown")
+    async def shutdown_background_tasks():
+        """백그라운드 작업 종료"""
+        from src.api.services.chat_cancel_registry import get_cancel_registry
+        from src.api.services.llm_client_registry import get_llm_client_registry
+        from src.api.services.stream_heartbeat_scheduler import get_heartbeat_scheduler
+        from src.api.services.title_generation_queue import get_title_generation_queue
+        from src.cache.two_tier_cache import get_two_tier_cache
+        from src.core.dependencies import close_async_resources
+        get_cancel_registry().stop()
+        get_two_tier_cache().stop()
+        await get_heartbeat_scheduler().stop()
+        await get_title_generation_queue().stop()
+        await get_llm_client_registry().aclose()
+        await close_async_resources()
+
     return app
 
 app = create_app()
@@ -42,6 +42,9 @@ class ConversationHistoryResponse(BaseModel):
     """대화 기록 응답 모델"""
     type: str = Field(default="conversation_history", description="응답 타입")
     history: List[Dict[str, Any]] = Field(..., description="대화 기록")
+    next_before: Optional[str] = Field(
+        default=None, description="이전 페이지 조회용 커서 (더 이전 메시지가 없으면 null)"
+    )
 
 
 class ConversationClearedResponse(BaseModel):
@@ -0,0 +1,26 @@
+# _*_ coding: utf-8 _*_
+"""ChatCancelRegistry 테스트"""
+import asyncio
+
+from src.api.services.chat_cancel_registry import ChatCancelRegistry
+
+
+def test_new_generation_is_not_cancelled_by_previous_cancel():
+    """이전 스트림에 대한 취소가 같은 채팅의 새 스트림을 멈추지 않아야 함"""
+
+    async def run():
+        registry = ChatCancelRegistry("test:cancel")
+        old_event = registry.register("chat-1")
+        await registry.cancel("chat-1")
+
+        new_event = registry.register("chat-1")
+        registry.unregister("chat-1")  # 취소된 이전 스트림 종료
+
+        assert old_event.is_set()
+        assert not new_event.is_set()
+        assert not registry.is_cancelled("chat-1")
+
+        await registry.cancel("chat-1")
+        assert new_event.is_set()
+
+    asyncio.run(run())
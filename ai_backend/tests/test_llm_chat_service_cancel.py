@@ -0,0 +1,45 @@
+# _*_ coding: utf-8 _*_
+"""LLMChatService 스트림 취소 테스트"""
+import asyncio
+import logging
+
+import pytest
+
+llm_chat_service = pytest.importorskip("src.api.services.llm_chat_service")
+
+
+def test_cancel_during_pending_anext_closes_upstream_stream(caplog):
+    """청크 대기 중 취소되면 업스트림 스트림(async generator)의 finally가 실행되고 aclose()가 성공해야 함"""
+    caplog.set_level(logging.DEBUG, logger=llm_chat_service.__name__)
+    service = llm_chat_service.LLMChatService.__new__(llm_chat_service.LLMChatService)
+    closed = asyncio.Event()
+    chunk_requested = asyncio.Event()
+
+    async def upstream():
+        try:
+            yield "first"
+            chunk_requested.set()
+            await asyncio.sleep(3600)  # 다음 청크를 기다리는 동안 취소
+            yield "never"
+        finally:
+            closed.set()
+
+    async def run():
+        cancel_event = asyncio.Event()
+        received = []
+
+        async def consume():
+            async for chunk in service._iterate_until_cancelled(upstream(), cancel_event):
+                received.append(chunk)
+
+        consumer = asyncio.ensure_future(consume())
+        await asyncio.wait_for(chunk_requested.wait(), timeout=1)
+        cancel_event.set()
+        await asyncio.wait_for(consumer, timeout=1)
+        return received
+
+    received = asyncio.run(run())
+
+    assert received == ["first"]
+    assert closed.is_set()
+    assert not [r for r in caplog.records if "Stream close failed" in r.getMessage()]
@@ -0,0 +1,60 @@
+# _*_ coding: utf-8 _*_
+"""StreamEventLog 재연결 테스트"""
+import asyncio
+from types import SimpleNamespace
+
+from src.api.services import stream_event_log
+from src.api.services.stream_event_log import StreamEventLog
+
+
+class _FakeRedis:
+    """이벤트 없이 한 번 대기한 뒤 생성이 끝나는 Redis Stream"""
+
+    def __init__(self):
+        self.blocks = []
+        self.exists_calls = 0
+
+    async def xrange(self, key, min="-"):
+        return []
+
+    async def xread(self, streams, count=None, block=None):
+        self.blocks.append(block)
+        return []
+
+    async def exists(self, *keys):
+        self.exists_calls += 1
+        return 1 if self.exists_calls == 1 else 0
+
+
+def _event_log(max_blocking_followers: int) -> StreamEventLog:
+    redis = _FakeRedis()
+    return StreamEventLog(
+        SimpleNamespace(redis_client=redis),
+        block_ms=1,
+        max_blocking_followers=max_blocking_followers,
+    )
+
+
+async def _drain(event_log: StreamEventLog):
+    return [item async for item in event_log.replay("chat-1", "1700000000000-0")]
+
+
+def test_is_valid_event_id():
+    assert StreamEventLog.is_valid_event_id("0")
+    assert StreamEventLog.is_valid_event_id("1700000000000-3")
+    assert not StreamEventLog.is_valid_event_id("abc")
+    assert not StreamEventLog.is_valid_event_id("1700000000000")
+    assert not StreamEventLog.is_valid_event_id("1-2-3")
+
+
+def test_followers_over_limit_poll_without_blocking():
+    """블로킹 follower 상한을 넘으면 XREAD BLOCK 없이 폴링하고, 종료 후 슬롯을 반환해야 함"""
+    blocking_log = _event_log(max_blocking_followers=1)
+    asyncio.run(_drain(blocking_log))
+    assert blocking_log.redis.blocks == [1, 1]
+    assert stream_event_log._blocking_followers == 0
+
+    polling_log = _event_log(max_blocking_followers=0)
+    asyncio.run(_drain(polling_log))
+    assert polling_log.redis.blocks == [None, None]
+    assert stream_event_log._blocking_followers == 0
@@ -0,0 +1,13 @@
+-- ============================================================================
+-- CHAT_MESSAGES 최근 메시지 조회용 복합 인덱스 추가
+-- ============================================================================
+-- 목적: 채팅별 최근 N개 메시지 조회 및 커서(before) 기반 페이지네이션을
+--       채팅 길이와 무관하게 인덱스 역순 스캔으로 처리
+--
+-- 참고:
+-- - 운영 환경에서는 테이블 잠금을 피하기 위해 CONCURRENTLY 옵션 사용
+-- - CONCURRENTLY는 트랜잭션 블록 안에서 실행할 수 없음
+-- ============================================================================
+
+CREATE INDEX CONCURRENTLY IF NOT EXISTS idx_chat_messages_chat_deleted_create
+    ON "CHAT_MESSAGES" ("CHAT_ID", "IS_DELETED", "CREATE_DT");
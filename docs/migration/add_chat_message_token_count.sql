@@ -0,0 +1,12 @@
+-- ============================================================================
+-- CHAT_MESSAGES 테이블 TOKEN_COUNT 컬럼 추가
+-- ============================================================================
+-- 목적: 메시지 저장 시 1회 계산한 토큰 수를 보관하여
+--       프롬프트 구성 시 히스토리 메시지를 매번 다시 인코딩하지 않도록 함
+--
+-- 참고:
+-- - 기존 메시지는 NULL로 남으며, 조회 시 필요한 경우에만 토큰 수를 계산함
+-- - 신규 메시지는 저장 시점에 자동으로 채워짐
+-- ============================================================================
+
+ALTER TABLE "CHAT_MESSAGES" ADD COLUMN IF NOT EXISTS "TOKEN_COUNT" INTEGER;
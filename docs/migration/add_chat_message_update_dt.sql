@@ -0,0 +1,12 @@
+-- ============================================================================
+-- CHAT_MESSAGES 테이블 UPDATE_DT 컬럼 추가
+-- ============================================================================
+-- 목적: 스트리밍 중인 AI 메시지의 마지막 체크포인트/완료 시각을 기록하여
+--       앱 시작 시 중단된 generating 메시지 정리가 다른 워커에서 진행 중인
+--       메시지를 건드리지 않도록 함
+--
+-- 참고:
+-- - 기존 메시지는 NULL로 남으며, 정리 시 CREATE_DT로 대체하여 판단함
+-- ============================================================================
+
+ALTER TABLE "CHAT_MESSAGES" ADD COLUMN IF NOT EXISTS "UPDATE_DT" TIMESTAMP;
@@ -0,0 +1,125 @@
+-- ============================================================================
+-- USER_EFFECTIVE_PERMISSIONS 테이블, 유지 트리거 추가 및 초기 데이터 채우기
+-- ============================================================================
+-- 목적: 사용자별 유효 권한(USER_GROUPS × GROUPS × GROUP_PROCESSES)을 미리 계산하여
+--       권한 체크를 PK 조회 1번으로 처리
+--
+-- 참고:
+-- - 앱 시작 시 Base.metadata.create_all로 테이블이 생성되고,
+--   EFFECTIVE_PERMISSIONS_REBUILD_ON_STARTUP=true(기본값)이면 트리거 설치 + 전체 재계산됨
+--   (EffectivePermissionCRUD.install_triggers / rebuild_all, 아래 SQL과 동일)
+-- - USER_GROUPS / GROUPS / GROUP_PROCESSES 변경 시 트리거가 같은 트랜잭션에서 해당 사용자 행을 재계산
+--   (DB에서 직접 변경해도 즉시 반영, 앱 캐시에는 PERMISSION_CACHE_TTL_SECONDS 안에 반영)
+-- - 활성 매핑 + 활성 그룹만 반영, 활성 매핑이 없는 사용자는 빈 권한으로 초기화
+-- - 대상 스키마를 search_path로 지정한 뒤 실행 (함수는 실행 시점 search_path로 고정)
+-- ============================================================================
+
+CREATE TABLE IF NOT EXISTS "USER_EFFECTIVE_PERMISSIONS" (
+    "USER_ID" VARCHAR(50) PRIMARY KEY REFERENCES "USERS" ("USER_ID"),
+    "IS_SUPER" BOOLEAN NOT NULL DEFAULT FALSE,
+    "ROLE_IDS" JSON NOT NULL,
+    "PROCESS_IDS" JSON NOT NULL,
+    "UPDATE_DT" TIMESTAMP NOT NULL DEFAULT now()
+);
+
+-- 유효 권한 재계산 함수 및 트리거
+CREATE OR REPLACE FUNCTION refresh_user_effective_permissions(p_user_id VARCHAR)
+RETURNS VOID LANGUAGE plpgsql SET search_path FROM CURRENT AS $$
+DECLARE
+    v_is_super BOOLEAN;
+    v_role_ids JSON;
+    v_process_ids JSON;
+BEGIN
+    -- 삭제된 사용자 (USERS 삭제로 매핑이 함께 삭제된 경우)
+    IF NOT EXISTS (SELECT 1 FROM "USERS" WHERE "USER_ID" = p_user_id) THEN
+        DELETE FROM "USER_EFFECTIVE_PERMISSIONS" WHERE "USER_ID" = p_user_id;
+        RETURN;
+    END IF;
+
+    SELECT
+        COALESCE(bool_or(g."ROLE_ID" IN ('system_admin', 'process_admin')), FALSE),
+        COALESCE(to_json(array_agg(DISTINCT g."ROLE_ID" ORDER BY g."ROLE_ID")), '[]'::json),
+        COALESCE(
+            to_json(
+                array_agg(DISTINCT gp."PROCESS_ID" ORDER BY gp."PROCESS_ID")
+                FILTER (WHERE g."ROLE_ID" = 'process_manager' AND gp."PROCESS_ID" IS NOT NULL)
+            ),
+            '[]'::json
+        )
+    INTO v_is_super, v_role_ids, v_process_ids
+    FROM "USER_GROUPS" ug
+    JOIN "GROUPS" g
+        ON g."GROUP_ID" = ug."GROUP_ID" AND g."IS_ACTIVE" = TRUE
+    LEFT JOIN "GROUP_PROCESSES" gp
+        ON gp."GROUP_ID" = g."GROUP_ID" AND gp."IS_ACTIVE" = TRUE
+    WHERE ug."USER_ID" = p_user_id AND ug."IS_ACTIVE" = TRUE;
+
+    IF v_is_super THEN
+        v_process_ids := '[]'::json;
+    END IF;
+
+    INSERT INTO "USER_EFFECTIVE_PERMISSIONS"
+        ("USER_ID", "IS_SUPER", "ROLE_IDS", "PROCESS_IDS", "UPDATE_DT")
+    VALUES (p_user_id, v_is_super, v_role_ids, v_process_ids, now())
+    ON CONFLICT ("USER_ID") DO UPDATE SET
+        "IS_SUPER" = EXCLUDED."IS_SUPER",
+        "ROLE_IDS" = EXCLUDED."ROLE_IDS",
+        "PROCESS_IDS" = EXCLUDED."PROCESS_IDS",
+        "UPDATE_DT" = EXCLUDED."UPDATE_DT";
+END
+$$;
+
+CREATE OR REPLACE FUNCTION trg_user_groups_effective_permissions()
+RETURNS TRIGGER LANGUAGE plpgsql SET search_path FROM CURRENT AS $$
+BEGIN
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM refresh_user_effective_permissions(NEW."USER_ID");
+    END IF;
+    IF TG_OP = 'DELETE' OR (TG_OP = 'UPDATE' AND OLD."USER_ID" IS DISTINCT FROM NEW."USER_ID") THEN
+        PERFORM refresh_user_effective_permissions(OLD."USER_ID");
+    END IF;
+    RETURN NULL;
+END
+$$;
+
+CREATE OR REPLACE FUNCTION trg_group_members_effective_permissions()
+RETURNS TRIGGER LANGUAGE plpgsql SET search_path FROM CURRENT AS $$
+BEGIN
+    -- GROUPS / GROUP_PROCESSES 변경: 해당 그룹 소속 사용자 전체 재계산
+    IF TG_OP IN ('INSERT', 'UPDATE') THEN
+        PERFORM refresh_user_effective_permissions(members."USER_ID")
+        FROM (SELECT DISTINCT "USER_ID" FROM "USER_GROUPS" WHERE "GROUP_ID" = NEW."GROUP_ID") members;
+    END IF;
+    IF TG_OP = 'DELETE' OR (TG_OP = 'UPDATE' AND OLD."GROUP_ID" IS DISTINCT FROM NEW."GROUP_ID") THEN
+        PERFORM refresh_user_effective_permissions(members."USER_ID")
+        FROM (SELECT DISTINCT "USER_ID" FROM "USER_GROUPS" WHERE "GROUP_ID" = OLD."GROUP_ID") members;
+    END IF;
+    RETURN NULL;
+END
+$$;
+
+DROP TRIGGER IF EXISTS trg_user_groups_effective_permissions ON "USER_GROUPS";
+
+CREATE TRIGGER trg_user_groups_effective_permissions
+AFTER INSERT OR UPDATE OR DELETE ON "USER_GROUPS"
+FOR EACH ROW EXECUTE PROCEDURE trg_user_groups_effective_permissions();
+
+DROP TRIGGER IF EXISTS trg_groups_effective_permissions ON "GROUPS";
+
+CREATE TRIGGER trg_groups_effective_permissions
+AFTER UPDATE OR DELETE ON "GROUPS"
+FOR EACH ROW EXECUTE PROCEDURE trg_group_members_effective_permissions();
+
+DROP TRIGGER IF EXISTS trg_group_processes_effective_permissions ON "GROUP_PROCESSES";
+
+CREATE TRIGGER trg_group_processes_effective_permissions
+AFTER INSERT OR UPDATE OR DELETE ON "GROUP_PROCESSES"
+FOR EACH ROW EXECUTE PROCEDURE trg_group_members_effective_permissions();
+
+-- 초기 데이터 채우기 (매핑이 있는 사용자 + 기존 행이 있는 사용자 모두 재계산)
+SELECT refresh_user_effective_permissions(u."USER_ID")
+FROM (
+    SELECT "USER_ID" FROM "USER_GROUPS"
+    UNION
+    SELECT "USER_ID" FROM "USER_EFFECTIVE_PERMISSIONS"
+) u;